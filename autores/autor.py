@@ -1,17 +1,27 @@
-from fastapi import APIRouter, Query
-from typing import Optional
-from db.database import sessionDep
-from .schemas import CrearAutor, ActualizarAutor
+from fastapi import APIRouter, Depends, Query, Request, Response
+from typing import Annotated, Optional, List
+from db.database import asyncSessionDep, readSessionDep
+from db.paginacion import limitQuery, afterQuery, cursorQuery, sortQuery, countQuery, CABECERA_TOTAL, LIMITE_POR_DEFECTO
+from db.exportacion import formatoQuery
+from db.proyeccion import fieldsQuery
+from db.condicional import condicional, TABLAS_CATALOGO, TABLAS_DEPOSITO
+from .schemas import CrearAutor, ActualizarAutor, ConsultarAutores, FiltrarAutores
 from .crud import (
-    ingresar_autor,
-    ver_autores,
-    ver_autor_libros,
-    ver_autor_por_id,
-    actualizar_autor_existente,
-    mover_a_deposito,
-    ver_deposito,
-    buscar_autor_en_deposito,
-    sacar_de_deposito
+    ingresar_autor_async,
+    ingresar_autores_en_lote_async,
+    ver_autores_async,
+    contar_autores_async,
+    ver_autor_libros_async,
+    ver_autor_por_id_async,
+    consultar_autores_async,
+    actualizar_autor_existente_async,
+    mover_a_deposito_async,
+    ver_deposito_async,
+    contar_deposito_async,
+    buscar_autor_en_deposito_async,
+    sacar_de_deposito_async,
+    sacar_de_deposito_en_lote_async,
+    exportar_autores
 )
 
 router = APIRouter(
@@ -20,55 +30,141 @@ router = APIRouter(
     responses={404: {"description": "No encontrado"}},
 )
 
+
+def filtros_autores(
+    pais: Optional[str] = Query(default=None, description="Filtrar por país de origen"),
+    nacimiento_desde: Optional[int] = Query(default=None, description="Nacidos desde este año (inclusive)"),
+    nacimiento_hasta: Optional[int] = Query(default=None, description="Nacidos hasta este año (inclusive)"),
+) -> FiltrarAutores:
+    return FiltrarAutores(pais=pais, nacimiento_desde=nacimiento_desde, nacimiento_hasta=nacimiento_hasta)
+
+
+filtrosAutoresDep = Annotated[FiltrarAutores, Depends(filtros_autores)]
+
+
 # 1. Crear autor
 @router.post("/", summary="Crear un nuevo autor")
-def crear_autor(data: CrearAutor, session: sessionDep):
-    return ingresar_autor(data, session)
+async def crear_autor(data: CrearAutor, session: asyncSessionDep):
+    return await ingresar_autor_async(data, session)
 
 
-#2. Ver todos los autores o filtrar por país
-@router.get("/", summary="Listar autores")
-def listar_autores(
-    session: sessionDep,
-    pais: Optional[str] = Query(default=None, description="Filtrar por país de origen")
+# Crear autores en lote
+@router.post("/bulk", summary="Crear muchos autores en una sola petición")
+async def crear_autores_en_lote(
+    data: List[CrearAutor],
+    session: asyncSessionDep,
+    actualizar: bool = Query(default=False, description="Actualizar los autores que ya existen en lugar de omitirlos")
 ):
-    return ver_autores(session, pais)
+    return await ingresar_autores_en_lote_async(data, session, actualizar)
+
+
+#2. Ver todos los autores, filtrar por país y año de nacimiento y ordenar
+@router.get("/", summary="Listar autores", dependencies=[condicional("autor")])
+async def listar_autores(
+    session: readSessionDep,
+    response: Response,
+    filtros: filtrosAutoresDep,
+    limit: limitQuery = LIMITE_POR_DEFECTO,
+    after: cursorQuery = None,
+    fields: fieldsQuery = None,
+    sort: sortQuery = None,
+    count: countQuery = False
+):
+    pagina = await ver_autores_async(session, filtros, limit, after, fields, sort)
+    if count:
+        response.headers[CABECERA_TOTAL] = str(await contar_autores_async(session, filtros))
+    return pagina
+
+
+@router.head("/", summary="Total de autores que cumplen los filtros (X-Total-Count), sin cuerpo",
+             dependencies=[condicional("autor")])
+async def contar_autores(request: Request, session: readSessionDep, filtros: filtrosAutoresDep):
+    total = await contar_autores_async(session, filtros)
+    return Response(headers={CABECERA_TOTAL: str(total), "ETag": request.state.etag})
+
+
+# Consultar varios autores a la vez
+@router.post("/lookup", summary="Buscar varios autores por nombre o id en una sola petición")
+async def consultar_varios_autores(data: ConsultarAutores, session: readSessionDep):
+    return await consultar_autores_async(data, session)
+
+
+# Exportar catálogo completo (antes de /{nombre_apellidos} para no ser capturada por ella)
+@router.get("/export", summary="Exportar todos los autores en NDJSON o CSV", dependencies=[condicional(*TABLAS_CATALOGO)])
+def exportar_catalogo_autores(request: Request, formato: formatoQuery = "ndjson", fields: fieldsQuery = None):
+    respuesta = exportar_autores(formato, fields=fields)
+    respuesta.headers["ETag"] = request.state.etag
+    return respuesta
 
 
 # 3. Ver autor y sus libros
-@router.get("/{nombre_apellidos}", summary="Buscar un autor por nombre")
-def obtener_autor(nombre_apellidos: str, session: sessionDep):
-    return ver_autor_libros(nombre_apellidos, session)
+@router.get("/{nombre_apellidos}", summary="Buscar un autor por nombre", dependencies=[condicional(*TABLAS_CATALOGO)])
+async def obtener_autor(nombre_apellidos: str, request: Request, session: readSessionDep):
+    return await ver_autor_libros_async(nombre_apellidos, session, request.state.etag)
 
-@router.get("/{id_autor}", summary="Buscar un autor por id")
-def obtener_por_id(id_autor: str, session: sessionDep):
-    return ver_autor_por_id(id_autor, session)
+@router.get("/id/{id_autor}", summary="Buscar un autor por id", dependencies=[condicional(*TABLAS_CATALOGO)])
+async def obtener_por_id(id_autor: int, session: readSessionDep):
+    return await ver_autor_por_id_async(id_autor, session)
 
 #4. Actualizar autor existente
 @router.put("/{nombre_apellidos}", summary="Actualizar datos del autor")
-def actualizar_autor(nombre_apellidos: str, data: ActualizarAutor, session: sessionDep):
-    return actualizar_autor_existente(session, data, nombre_apellidos)
+async def actualizar_autor(nombre_apellidos: str, data: ActualizarAutor, session: asyncSessionDep):
+    return await actualizar_autor_existente_async(session, data, nombre_apellidos)
 
 
 #5. DEPÓSITO: Mover autores#
 @router.delete("/deposito/{nombre_apellidos}", summary="Mover autor al depósito")
-def eliminar_autor(nombre_apellidos: str, session: sessionDep):
-    return mover_a_deposito(nombre_apellidos, session)
+async def eliminar_autor(nombre_apellidos: str, session: asyncSessionDep):
+    return await mover_a_deposito_async(nombre_apellidos, session)
 
 
 #6. DEPÓSITO: Ver todos
-@router.get("/deposito/", summary="Listar autores en el depósito")
-def listar_autores_deposito(session: sessionDep):
-    return ver_deposito(session)
+@router.get("/deposito/", summary="Listar autores en el depósito", dependencies=[condicional("depositoautores")])
+async def listar_autores_deposito(
+    session: readSessionDep,
+    response: Response,
+    pais: Optional[str] = Query(default=None, description="Filtrar por país de origen"),
+    limit: limitQuery = LIMITE_POR_DEFECTO,
+    after: afterQuery = None,
+    fields: fieldsQuery = None,
+    count: countQuery = False
+):
+    pagina = await ver_deposito_async(session, pais, limit, after, fields)
+    if count:
+        response.headers[CABECERA_TOTAL] = str(await contar_deposito_async(session, pais))
+    return pagina
+
+
+@router.head("/deposito/", summary="Total de autores en el depósito (X-Total-Count), sin cuerpo",
+             dependencies=[condicional("depositoautores")])
+async def contar_autores_deposito(
+    request: Request,
+    session: readSessionDep,
+    pais: Optional[str] = Query(default=None, description="Filtrar por país de origen")
+):
+    total = await contar_deposito_async(session, pais)
+    return Response(headers={CABECERA_TOTAL: str(total), "ETag": request.state.etag})
+
+
+@router.get("/deposito/export", summary="Exportar los autores del depósito en NDJSON o CSV", dependencies=[condicional(*TABLAS_DEPOSITO)])
+def exportar_deposito_autores(request: Request, formato: formatoQuery = "ndjson", fields: fieldsQuery = None):
+    respuesta = exportar_autores(formato, deposito=True, fields=fields)
+    respuesta.headers["ETag"] = request.state.etag
+    return respuesta
 
 
 #7. DEPÓSITO: Buscar un autor
-@router.get("/deposito/buscar/{nombre_apellidos}", summary="Buscar autor en el depósito")
-def buscar_autor_deposito(nombre_apellidos: str, session: sessionDep):
-    return buscar_autor_en_deposito(nombre_apellidos, session)
+@router.get("/deposito/buscar/{nombre_apellidos}", summary="Buscar autor en el depósito", dependencies=[condicional(*TABLAS_DEPOSITO)])
+async def buscar_autor_deposito(nombre_apellidos: str, session: readSessionDep):
+    return await buscar_autor_en_deposito_async(nombre_apellidos, session)
 
 
 #8. Restaurar autor
 @router.post("/deposito/restaurar/{nombre_apellidos}", summary="Restaurar autor al catálogo")
-def restaurar_autor(nombre_apellidos: str, session: sessionDep):
-    return sacar_de_deposito(nombre_apellidos, session)
\ No newline at end of file
+async def restaurar_autor(nombre_apellidos: str, session: asyncSessionDep):
+    return await sacar_de_deposito_async(nombre_apellidos, session)
+
+
+@router.post("/deposito/restaurar", summary="Restaurar varios autores al catálogo")
+async def restaurar_autores(nombres: List[str], session: asyncSessionDep):
+    return await sacar_de_deposito_en_lote_async(nombres, session)
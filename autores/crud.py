@@ -9,16 +9,34 @@ Permite gestionar autores activos en el catálogo y aquellos que se han
 movido temporalmente al depósito.
 """
 
-from typing import Optional
+import logging
+import time
+from itertools import islice
+from typing import Iterable, List, Optional, Union
 from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload
 from sqlmodel import select
 from db.models import (
     Autor, Libro,
     DepositoAutores, DepositoLibro,
-    LinkAutorLibro, LinkAutorLibroDeposito
+    LinkAutorLibro, LinkAutorLibroDeposito,
+    año_nacimiento_numerico
 )
-from db.database import sessionDep
-from .schemas import CrearAutor, ActualizarAutor
+from db.database import sessionDep, version_asincrona
+from db import paginacion
+from db.paginacion import paginar, LIMITE_POR_DEFECTO
+from db import proyeccion
+from db.exportacion import exportar, Formato
+from db.normalizacion import normalizar
+from db import deposito
+from db import cache
+from db import estadisticas
+from .schemas import CrearAutor, ActualizarAutor, ConsultarAutores, FiltrarAutores
+
+logger = logging.getLogger(__name__)
 
 
 def ingresar_autor(data: CrearAutor, session: sessionDep):
@@ -36,7 +54,7 @@ def ingresar_autor(data: CrearAutor, session: sessionDep):
         HTTPException: Si el autor ya existe en el catálogo.
     """
     autor_existente = session.exec(
-        select(Autor).where(Autor.nombre_apellidos == data.nombre_apellidos)
+        select(Autor).where(Autor.clave_nombre == normalizar(data.nombre_apellidos))
     ).first()
 
     if autor_existente:
@@ -46,42 +64,164 @@ def ingresar_autor(data: CrearAutor, session: sessionDep):
     session.add(autor)
     session.commit()
     session.refresh(autor)
+    cache.invalidar(autores=[autor.clave_nombre])
     return {"message": f"El autor {autor.nombre_apellidos} fue creado correctamente"}
 
 
-def ver_autores(session: sessionDep, pais: Optional[str] = None):
+TAMANO_LOTE_INGRESO = 5000
+
+
+def ingresar_autores_en_lote(datos: Iterable[CrearAutor], session: sessionDep, actualizar: bool = False):
+    """
+    Registra muchos autores en transacciones grandes.
+
+    Cada lote de `TAMANO_LOTE_INGRESO` autores se inserta con un único
+    `INSERT ... ON CONFLICT (clave_nombre)` ejecutado como executemany,
+    de modo que los duplicados se resuelven en la misma sentencia sin
+    consultas previas. Se confirma una vez por lote.
+
+    Args:
+        datos (Iterable[CrearAutor]): Autores ya validados; puede ser un generador.
+        session (Session): Sesión activa.
+        actualizar (bool): Si es True los autores existentes se actualizan
+            (upsert); si es False se omiten.
+
+    Returns:
+        dict: Autores procesados, escritos (insertados o actualizados),
+        omitidos por duplicados, tiempo empleado y filas por segundo.
+    """
+    tabla = Autor.__table__
+    sentencia = sqlite_insert(tabla)
+    if actualizar:
+        sentencia = sentencia.on_conflict_do_update(
+            index_elements=[tabla.c.clave_nombre],
+            set_={
+                columna.name: sentencia.excluded[columna.name]
+                for columna in tabla.columns
+                if columna.name not in ("id", "nombre_apellidos", "clave_nombre")
+            },
+        )
+    else:
+        sentencia = sentencia.on_conflict_do_nothing(index_elements=[tabla.c.clave_nombre])
+
+    inicio = time.perf_counter()
+    procesados = afectados = 0
+    iterador = iter(datos)
+    while lote := list(islice(iterador, TAMANO_LOTE_INGRESO)):
+        resultado = session.exec(sentencia, params=[autor.model_dump() for autor in lote])
+        session.commit()
+        procesados += len(lote)
+        afectados += resultado.rowcount
+
+        claves = {normalizar(autor.nombre_apellidos) for autor in lote}
+        libros = cache.vinculados(session, Autor.clave_nombre.in_(claves))[0] if actualizar else ()
+        cache.invalidar(libros=libros, autores=claves)
+
+    segundos = time.perf_counter() - inicio
+    return {
+        "message": f"{procesados} autores procesados",
+        "procesados": procesados,
+        "escritos": afectados,
+        "omitidos": procesados - afectados,
+        "segundos": round(segundos, 3),
+        "filas_por_segundo": round(procesados / segundos) if segundos else procesados,
+    }
+
+
+# Campos de `sort=`: cada uno tiene un índice que empieza por su expresión.
+ORDEN_AUTORES = {
+    "nombre_apellidos": (Autor.clave_nombre, False),
+    "pais_origen": (Autor.pais_origen, False),
+    "año_nacimiento": (año_nacimiento_numerico, False),
+}
+
+
+def filtrar_autores(query, filtros: Optional[FiltrarAutores]):
+    """Agrega a la consulta las condiciones de los filtros indicados."""
+    if filtros is None:
+        return query
+    if filtros.pais:
+        query = query.where(Autor.pais_origen == filtros.pais)
+    if filtros.nacimiento_desde is not None:
+        query = query.where(año_nacimiento_numerico >= filtros.nacimiento_desde)
+    if filtros.nacimiento_hasta is not None:
+        query = query.where(año_nacimiento_numerico <= filtros.nacimiento_hasta)
+    return query
+
+
+def ver_autores(
+    session: sessionDep,
+    filtros: Optional[FiltrarAutores] = None,
+    limit: int = LIMITE_POR_DEFECTO,
+    after: Optional[Union[int, str]] = None,
+    fields: Optional[str] = None,
+    sort: Optional[str] = None
+):
     """
-    Lista todos los autores del catálogo o filtra por país de origen.
+    Lista los autores del catálogo paginados, filtrados por país y año de
+    nacimiento y ordenados en SQL.
 
     Args:
         session (Session): Sesión activa de la base de datos.
-        pais (Optional[str]): País de origen para filtrar (opcional).
+        filtros (Optional[FiltrarAutores]): País y rango de años de nacimiento (opcional).
+        limit (int): Cantidad máxima de autores por página.
+        after (Optional[Union[int, str]]): Cursor devuelto por la página anterior.
+        fields (Optional[str]): Columnas a devolver separadas por coma (por defecto todas).
+        sort (Optional[str]): Campo de `ORDEN_AUTORES`, con `-` para descendente (por defecto el id).
 
     Returns:
-        list[Autor]: Lista de autores encontrados.
+        dict: Autores de la página (`items`) y cursor de la siguiente (`next_cursor`).
 
     Raises:
-        HTTPException: Si no se encuentran autores.
+        HTTPException: Si algún campo, el orden o el cursor no son válidos, o no se encuentran autores.
     """
-    query = select(Autor)
-    if pais:
-        query = query.where(Autor.pais_origen == pais)
+    orden = paginacion.orden(ORDEN_AUTORES, sort)
+    query = filtrar_autores(select(*proyeccion.columnas(Autor, fields)[0]), filtros)
 
-    autores = session.exec(query).all()
+    pagina = paginar(session, query, Autor.id, limit, after, orden)
 
-    if not autores:
+    if not pagina["items"]:
+        pais = filtros.pais if filtros else None
         raise HTTPException(status_code=404, detail=f"No se encontraron autores{f' de {pais}' if pais else ''}")
 
-    return autores
+    return pagina
+
 
+def contar_autores(session: sessionDep, filtros: Optional[FiltrarAutores] = None) -> int:
+    """
+    Cuenta los autores que cumplen los filtros, sin leer sus filas.
+
+    Sin filtros (o solo con `pais`) el total sale de los contadores que
+    mantienen los triggers de `db/estadisticas.py`; con un rango de años se usa
+    `COUNT(*)` con las mismas condiciones que el listado.
 
-def ver_autor_libros(nombre_apellidos: str, session: sessionDep):
+    Args:
+        session (Session): Sesión activa de la base de datos.
+        filtros (Optional[FiltrarAutores]): Los mismos filtros del listado.
+
+    Returns:
+        int: Cantidad de autores.
+    """
+    indicados = filtros.model_dump(exclude_none=True) if filtros else {}
+    if not indicados:
+        return estadisticas.contador(session, "autores")
+    if indicados.keys() == {"pais"}:
+        return estadisticas.contador(session, "autores_por_pais", filtros.pais)
+    return session.exec(filtrar_autores(select(func.count()).select_from(Autor), filtros)).one()
+
+
+def ver_autor_libros(nombre_apellidos: str, session: sessionDep, version: Optional[str] = None):
     """
     Muestra los libros asociados a un autor por su nombre y apellidos.
 
+    La respuesta se sirve desde `cache.detalles` mientras ninguna escritura
+    afecte al autor o a sus libros y la versión del catálogo no cambie.
+
     Args:
         nombre_apellidos (str): Nombre completo del autor.
         session (Session): Sesión activa.
+        version (Optional[str]): ETag de la petición; una entrada en caché
+            calculada con otra versión no se reutiliza.
 
     Returns:
         dict: Información del autor y sus libros.
@@ -89,13 +229,24 @@ def ver_autor_libros(nombre_apellidos: str, session: sessionDep):
     Raises:
         HTTPException: Si el autor no existe.
     """
+    clave = normalizar(nombre_apellidos)
+    return cache.detalles.obtener_o_calcular(
+        cache.clave_autor(clave), lambda: _detalle_autor(clave, nombre_apellidos, session), version
+    )
+
+
+def _detalle_autor(clave: str, nombre_apellidos: str, session: sessionDep):
     autor = session.exec(
-        select(Autor).where(Autor.nombre_apellidos == nombre_apellidos)
+        select(Autor).options(selectinload(Autor.libros)).where(Autor.clave_nombre == clave)
     ).first()
 
     if not autor:
         raise HTTPException(status_code=404, detail=f"{nombre_apellidos} no existe")
 
+    return _serializar_autor(autor)
+
+
+def _serializar_autor(autor: Autor) -> dict:
     libros = autor.libros
     return {
         "autor": autor.nombre_apellidos,
@@ -104,12 +255,12 @@ def ver_autor_libros(nombre_apellidos: str, session: sessionDep):
     }
 
 
-def ver_autor_por_id(id_autor: str, session: sessionDep):
+def ver_autor_por_id(id_autor: int, session: sessionDep):
     """
     Obtiene la información de un autor y sus libros a partir de su ID.
 
     Args:
-        id_autor (str): Identificador único del autor.
+        id_autor (int): Identificador único del autor.
         session (Session): Sesión activa.
 
     Returns:
@@ -118,15 +269,49 @@ def ver_autor_por_id(id_autor: str, session: sessionDep):
     Raises:
         HTTPException: Si el autor no se encuentra.
     """
-    autor = session.exec(select(Autor).where(Autor.id == id_autor)).first()
+    autor = session.exec(
+        select(Autor).options(selectinload(Autor.libros)).where(Autor.id == id_autor)
+    ).first()
     if not autor:
         raise HTTPException(status_code=404, detail=f"{id_autor} no existe")
 
-    libros = autor.libros
+    return _serializar_autor(autor)
+
+
+def consultar_autores(datos: ConsultarAutores, session: sessionDep):
+    """
+    Busca en bloque varios autores por nombre y por id.
+
+    Todos los autores se resuelven con un solo `IN` sobre `clave_nombre` e
+    `id`, y sus libros con una única carga `selectinload`, en lugar de una
+    consulta de detalle por autor.
+
+    Args:
+        datos (ConsultarAutores): Nombres e ids a buscar.
+        session (Session): Sesión activa.
+
+    Returns:
+        dict: Por cada nombre (`nombres`) e id (`ids`) pedido, el detalle del
+              autor como en `ver_autor_libros`, o `None` si no existe; y en
+              `no_encontrados` los nombres e ids sin resultado.
+    """
+    claves = {nombre: normalizar(nombre) for nombre in datos.nombres}
+    autores = session.exec(
+        select(Autor)
+        .options(selectinload(Autor.libros))
+        .where(Autor.clave_nombre.in_(set(claves.values())) | Autor.id.in_(set(datos.ids)))
+    ).all() if claves or datos.ids else []
+
+    detalles = {autor.id: _serializar_autor(autor) for autor in autores}
+    por_clave = {autor.clave_nombre: detalles[autor.id] for autor in autores}
+
     return {
-        "autor": autor.nombre_apellidos,
-        "libros": [{"titulo": l.titulo, "ISBN": l.ISBN} for l in libros],
-        "cantidad": len(libros)
+        "nombres": {nombre: por_clave.get(clave) for nombre, clave in claves.items()},
+        "ids": {id_autor: detalles.get(id_autor) for id_autor in datos.ids},
+        "no_encontrados": {
+            "nombres": [nombre for nombre, clave in claves.items() if clave not in por_clave],
+            "ids": [id_autor for id_autor in dict.fromkeys(datos.ids) if id_autor not in detalles],
+        },
     }
 
 
@@ -146,7 +331,7 @@ def actualizar_autor_existente(session: sessionDep, data: ActualizarAutor, nombr
         HTTPException: Si el autor no existe.
     """
     autor = session.exec(
-        select(Autor).where(Autor.nombre_apellidos == nombre_apellidos)
+        select(Autor).where(Autor.clave_nombre == normalizar(nombre_apellidos))
     ).first()
 
     if not autor:
@@ -156,15 +341,21 @@ def actualizar_autor_existente(session: sessionDep, data: ActualizarAutor, nombr
     autor.año_muerte = data.año_muerte or autor.año_muerte
     session.add(autor)
     session.commit()
+    libros, _ = cache.vinculados(session, LinkAutorLibro.id_autor == autor.id)
+    cache.invalidar(libros=libros, autores=[autor.clave_nombre])
     return {"message": f"El autor {nombre_apellidos} fue actualizado correctamente"}
 
 
 def mover_a_deposito(nombre_apellidos: str, session: sessionDep):
     """
-    Mueve un autor y sus libros asociados al depósito.
+    Mueve un autor al depósito junto con una copia de sus libros asociados.
 
-    Si el autor ya está en el depósito, no se duplica, pero se agregan los
-    libros faltantes para mantener las relaciones consistentes.
+    Todo el traslado es una sola unidad de trabajo: el autor y sus libros se
+    copian con `INSERT ... SELECT`, los vínculos se replican en
+    `LinkAutorLibroDeposito` y el autor se elimina del catálogo con `DELETE`
+    por conjuntos, confirmando una única vez. Si el autor o alguno de sus
+    libros ya está en el depósito, no se duplica: se reutiliza y solo se
+    agregan los vínculos faltantes.
 
     Args:
         nombre_apellidos (str): Nombre completo del autor.
@@ -174,80 +365,92 @@ def mover_a_deposito(nombre_apellidos: str, session: sessionDep):
         dict: Mensaje de resultado.
 
     Raises:
-        HTTPException: Si el autor no se encuentra en el catálogo.
+        HTTPException: 404 si el autor no se encuentra en el catálogo, 409 si
+            el traslado viola una restricción del depósito y 500 ante otro
+            error (que se registra en el log). En ambos errores no se aplica
+            ningún cambio.
     """
-    autor_deposito = session.exec(
-        select(DepositoAutores).where(DepositoAutores.nombre_apellidos == nombre_apellidos)
+    id_autor = session.exec(
+        select(Autor.id).where(Autor.clave_nombre == normalizar(nombre_apellidos))
     ).first()
-    Deposito = False
-    if not autor_deposito:
-        autor = session.exec(
-            select(Autor).where(Autor.nombre_apellidos == nombre_apellidos)
-        ).first()
-        Deposito = True
-        if not autor:
-            raise HTTPException(status_code=404, detail="Autor no encontrado")
-
-    for libro in autor.libros:
-        libro_en_deposito = session.exec(
-            select(DepositoLibro).where(DepositoLibro.id_libro_original == libro.id)
-        ).first()
-
-        if not libro_en_deposito:
-            libro_deposito = DepositoLibro(
-                id_libro_original=libro.id,
-                titulo=libro.titulo,
-                resumen=libro.resumen,
-                numero_paginas=libro.numero_paginas,
-                editorial=libro.editorial,
-                año_publicacion=libro.año_publicacion,
-                copias_disponibles=libro.copias_disponibles,
-                ISBN=libro.ISBN
-            )
-            session.add(libro_deposito)
-            session.commit()
-            session.refresh(libro_deposito)
-        else:
-            libro_deposito = libro_en_deposito
-
-        session.add(
-            LinkAutorLibroDeposito(
-                id_libro_deposito=libro_deposito.id,
-                id_autor_deposito=autor_deposito.id
-            )
+    if id_autor is None:
+        raise HTTPException(status_code=404, detail="Autor no encontrado")
+
+    libros_del_autor = select(LinkAutorLibro.id_libros).where(LinkAutorLibro.id_autor == id_autor)
+    libros_afectados, _ = cache.vinculados(session, LinkAutorLibro.id_autor == id_autor)
+    try:
+        deposito.copiar_autores_a_deposito(session, Autor.id == id_autor)
+        deposito.copiar_libros_a_deposito(session, Libro.id.in_(libros_del_autor))
+        deposito.vincular_en_deposito(session, LinkAutorLibro.id_autor == id_autor)
+        deposito.eliminar_del_catalogo(session, Autor, LinkAutorLibro.id_autor == id_autor, Autor.id == id_autor)
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail=f"El traslado del autor {nombre_apellidos} choca con el contenido actual del depósito; vuelva a intentarlo",
         )
+    except Exception:
+        session.rollback()
+        logger.exception("Falló el traslado al depósito del autor %s", nombre_apellidos)
+        raise HTTPException(status_code=500, detail=f"No se pudo mover el autor {nombre_apellidos} al depósito")
 
-    if Deposito:
-        session.delete(autor)
-        session.commit()
+    cache.invalidar(libros=libros_afectados, autores=[normalizar(nombre_apellidos)])
 
     return {"message": f"El autor {nombre_apellidos} y sus libros fueron movidos al depósito correctamente"}
 
 
-def ver_deposito(session: sessionDep, pais: Optional[str] = None):
+def ver_deposito(
+    session: sessionDep,
+    pais: Optional[str] = None,
+    limit: int = LIMITE_POR_DEFECTO,
+    after: Optional[int] = None,
+    fields: Optional[str] = None
+):
     """
-    Lista los autores almacenados en el depósito o filtra por país.
+    Lista los autores almacenados en el depósito paginados por id, o filtra por país.
 
     Args:
         session (Session): Sesión activa.
         pais (Optional[str]): País de origen (opcional).
+        limit (int): Cantidad máxima de autores por página.
+        after (Optional[int]): Cursor devuelto por la página anterior.
+        fields (Optional[str]): Columnas a devolver separadas por coma (por defecto todas).
 
     Returns:
-        list[DepositoAutores]: Lista de autores del depósito.
+        dict: Autores del depósito (`items`) y cursor de la siguiente página (`next_cursor`).
 
     Raises:
-        HTTPException: Si no se encuentran autores.
+        HTTPException: Si algún campo no existe o no se encuentran autores.
     """
-    query = select(DepositoAutores)
+    query = select(*proyeccion.columnas(DepositoAutores, fields)[0])
     if pais:
-        query = query.where(Autor.pais_origen == pais)
+        query = query.where(DepositoAutores.pais_origen == pais)
 
-    autores = session.exec(query).all()
+    pagina = paginar(session, query, DepositoAutores.id, limit, after)
 
-    if not autores:
+    if not pagina["items"]:
         raise HTTPException(status_code=404, detail=f"No se encontraron autores{f' de {pais}' if pais else ''}")
 
-    return autores
+    return pagina
+
+
+def contar_deposito(session: sessionDep, pais: Optional[str] = None) -> int:
+    """
+    Cuenta los autores del depósito, opcionalmente de un país, sin leer sus filas.
+
+    Args:
+        session (Session): Sesión activa.
+        pais (Optional[str]): País de origen (opcional).
+
+    Returns:
+        int: Cantidad de autores; sin país se lee del contador mantenido.
+    """
+    if not pais:
+        return estadisticas.contador(session, "deposito_autores")
+    return session.exec(
+        select(func.count()).select_from(DepositoAutores).where(DepositoAutores.pais_origen == pais)
+    ).one()
 
 
 def buscar_autor_en_deposito(nombre_apellidos: str, session: sessionDep):
@@ -265,7 +468,9 @@ def buscar_autor_en_deposito(nombre_apellidos: str, session: sessionDep):
         HTTPException: Si el autor no está en el depósito.
     """
     autor = session.exec(
-        select(DepositoAutores).where(DepositoAutores.nombre_apellidos == nombre_apellidos)
+        select(DepositoAutores)
+        .options(selectinload(DepositoAutores.libros))
+        .where(DepositoAutores.clave_nombre == normalizar(nombre_apellidos))
     ).first()
 
     if not autor:
@@ -286,10 +491,40 @@ def buscar_autor_en_deposito(nombre_apellidos: str, session: sessionDep):
     }
 
 
+def _restaurar_desde_deposito(ids: list[int], session: sessionDep):
+    """
+    Restaura al catálogo los autores del depósito indicados y sus libros.
+
+    Autores, libros y vínculos se insertan con `INSERT ... SELECT`; los libros
+    cuyo ISBN o título ya está en el catálogo no se duplican, solo se vinculan.
+    No confirma la transacción.
+    """
+    vinculos = LinkAutorLibroDeposito.id_autor_deposito.in_(ids)
+    # Sin DISTINCT: solo alimenta un IN, y deduplicar los vínculos del lote en Python
+    # evita ordenarlos en una tabla temporal.
+    ids_libros = set(session.exec(select(LinkAutorLibroDeposito.id_libro_deposito).where(vinculos)).all())
+
+    deposito.restaurar_autores(session, DepositoAutores.id.in_(ids))
+    deposito.restaurar_libros(session, DepositoLibro.id.in_(ids_libros))
+    deposito.vincular_en_catalogo(session, vinculos)
+    deposito.eliminar_del_deposito(session, DepositoAutores, vinculos, DepositoAutores.id.in_(ids))
+    deposito.limpiar_libros_huerfanos(session, ids_libros)
+
+
+def _invalidar_restaurados(session: sessionDep, claves: list[str]):
+    """Invalida en caché los autores restaurados y los libros con los que quedaron vinculados."""
+    libros, _ = cache.vinculados(session, Autor.clave_nombre.in_(claves))
+    cache.invalidar(libros=libros, autores=claves)
+
+
 def sacar_de_deposito(nombre: str, session: sessionDep):
     """
     Restaura un autor y sus libros desde el depósito al catálogo principal.
 
+    Todo se hace en una única transacción con sentencias por conjuntos. Los
+    libros que ya existen en el catálogo (mismo ISBN o título) no se duplican:
+    solo se vuelven a vincular con el autor.
+
     Args:
         nombre (str): Nombre del autor a restaurar.
         session (Session): Sesión activa.
@@ -298,52 +533,111 @@ def sacar_de_deposito(nombre: str, session: sessionDep):
         dict: Mensaje de confirmación.
 
     Raises:
-        HTTPException: Si el autor no está en el depósito.
+        HTTPException: Si el autor no está en el depósito o si falla la restauración.
     """
-    autor_deposito = session.exec(
-        select(DepositoAutores).where(DepositoAutores.nombre_apellidos == nombre)
+    id_deposito = session.exec(
+        select(DepositoAutores.id).where(DepositoAutores.clave_nombre == normalizar(nombre))
     ).first()
 
-    if not autor_deposito:
+    if id_deposito is None:
         raise HTTPException(status_code=404, detail=f"{nombre} no está en el depósito")
 
-    nuevo_autor = Autor(
-        nombre_apellidos=autor_deposito.nombre_apellidos,
-        pais_origen=autor_deposito.pais_origen,
-        descripcion=autor_deposito.descripcion,
-        año_nacimiento=autor_deposito.año_nacimiento,
-        año_muerte=autor_deposito.año_muerte,
-    )
-    session.add(nuevo_autor)
-    session.commit()
-    session.refresh(nuevo_autor)
+    try:
+        _restaurar_desde_deposito([id_deposito], session)
+        session.commit()
+    except Exception as error:
+        session.rollback()
+        raise HTTPException(status_code=500, detail=f"No se pudo restaurar a {nombre}: {error}")
 
-    relaciones = session.exec(
-        select(LinkAutorLibroDeposito).where(LinkAutorLibroDeposito.id_autor_deposito == autor_deposito.id)
+    _invalidar_restaurados(session, [normalizar(nombre)])
+
+    return {"message": f"El autor {nombre} y sus libros fueron restaurados al catálogo correctamente"}
+
+
+def sacar_de_deposito_en_lote(nombres: List[str], session: sessionDep):
+    """
+    Restaura varios autores (y sus libros) desde el depósito en una sola transacción.
+
+    Args:
+        nombres (List[str]): Nombres de los autores a restaurar.
+        session (Session): Sesión activa.
+
+    Returns:
+        dict: Autores restaurados y nombres que no se encontraron en el depósito.
+
+    Raises:
+        HTTPException: Si falla la restauración (no se aplica ningún cambio).
+    """
+    claves = {normalizar(nombre): nombre for nombre in nombres}
+    encontrados = session.exec(
+        select(DepositoAutores.clave_nombre, DepositoAutores.id, DepositoAutores.nombre_apellidos)
+        .where(DepositoAutores.clave_nombre.in_(claves))
     ).all()
+    no_encontrados = [claves[c] for c in claves.keys() - {fila.clave_nombre for fila in encontrados}]
 
-    for rel in relaciones:
-        libro_deposito = session.exec(
-            select(DepositoLibro).where(DepositoLibro.id == rel.id_libro_deposito)
-        ).first()
-
-        if libro_deposito:
-            libro_restaurado = Libro(
-                titulo=libro_deposito.titulo,
-                resumen=libro_deposito.resumen,
-                numero_paginas=libro_deposito.numero_paginas,
-                editorial=libro_deposito.editorial,
-                año_publicacion=libro_deposito.año_publicacion,
-                copias_disponibles=libro_deposito.copias_disponibles,
-                ISBN=libro_deposito.ISBN
-            )
-            session.add(libro_restaurado)
+    if encontrados:
+        try:
+            _restaurar_desde_deposito([fila.id for fila in encontrados], session)
             session.commit()
-            session.refresh(libro_restaurado)
+        except Exception as error:
+            session.rollback()
+            raise HTTPException(status_code=500, detail=f"No se pudo restaurar los autores: {error}")
 
-            session.add(LinkAutorLibro(id_autor=nuevo_autor.id, id_libros=libro_restaurado.id))
+        _invalidar_restaurados(session, [fila.clave_nombre for fila in encontrados])
 
-    session.delete(autor_deposito)
-    session.commit()
+    return {
+        "message": f"{len(encontrados)} autores restaurados al catálogo",
+        "restaurados": [fila.nombre_apellidos for fila in encontrados],
+        "no_encontrados": no_encontrados,
+    }
 
-    return {"message": f"El autor {nombre} y sus libros fueron restaurados al catálogo correctamente"}
\ No newline at end of file
+
+def exportar_autores(formato: Formato = "ndjson", deposito: bool = False, fields: Optional[str] = None):
+    """
+    Exporta en streaming todos los autores del catálogo o del depósito.
+
+    Cada fila incluye los ISBN de sus libros, resueltos por lotes a partir de
+    `LinkAutorLibro` (o `LinkAutorLibroDeposito` en el depósito).
+
+    Args:
+        formato (Formato): `ndjson` o `csv`.
+        deposito (bool): Si es True exporta los autores del depósito.
+        fields (Optional[str]): Campos a exportar separados por coma (columnas
+            y/o `libros`). Por defecto todos.
+
+    Returns:
+        StreamingResponse: Respuesta que emite los autores lote por lote.
+    """
+    if deposito:
+        def libros_de(ids):
+            return (
+                select(LinkAutorLibroDeposito.id_autor_deposito, DepositoLibro.ISBN)
+                .join(DepositoLibro, DepositoLibro.id == LinkAutorLibroDeposito.id_libro_deposito)
+                .where(LinkAutorLibroDeposito.id_autor_deposito.in_(ids))
+            )
+        return exportar(DepositoAutores, libros_de, "libros", formato, "deposito_autores", fields)
+
+    def libros_de(ids):
+        return (
+            select(LinkAutorLibro.id_autor, Libro.ISBN)
+            .join(Libro, Libro.id == LinkAutorLibro.id_libros)
+            .where(LinkAutorLibro.id_autor.in_(ids))
+        )
+    return exportar(Autor, libros_de, "libros", formato, "autores", fields)
+
+
+# Versiones asíncronas (AsyncSession) usadas por las rutas.
+ingresar_autor_async = version_asincrona(ingresar_autor)
+ingresar_autores_en_lote_async = version_asincrona(ingresar_autores_en_lote)
+ver_autores_async = version_asincrona(ver_autores)
+contar_autores_async = version_asincrona(contar_autores)
+ver_autor_libros_async = version_asincrona(ver_autor_libros)
+ver_autor_por_id_async = version_asincrona(ver_autor_por_id)
+consultar_autores_async = version_asincrona(consultar_autores)
+actualizar_autor_existente_async = version_asincrona(actualizar_autor_existente)
+mover_a_deposito_async = version_asincrona(mover_a_deposito)
+ver_deposito_async = version_asincrona(ver_deposito)
+contar_deposito_async = version_asincrona(contar_deposito)
+buscar_autor_en_deposito_async = version_asincrona(buscar_autor_en_deposito)
+sacar_de_deposito_async = version_asincrona(sacar_de_deposito)
+sacar_de_deposito_en_lote_async = version_asincrona(sacar_de_deposito_en_lote)
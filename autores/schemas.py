@@ -1,5 +1,6 @@
 from typing import Optional, List
 from sqlmodel import Field, SQLModel
+from db.paginacion import MAXIMO_CONSULTA_LOTE
 
 
 class CrearAutor(SQLModel):
@@ -18,4 +19,16 @@ class CrearAutor(SQLModel):
 
 class ActualizarAutor(SQLModel):
     descripcion: Optional[str] = Field(default=None, min_length=2, max_length=200)
-    año_muerte: Optional[str] = Field(default=None, max_length=50)
\ No newline at end of file
+    año_muerte: Optional[str] = Field(default=None, max_length=50)
+
+
+class ConsultarAutores(SQLModel):
+    nombres: List[str] = Field(default_factory=list, max_length=MAXIMO_CONSULTA_LOTE)
+    ids: List[int] = Field(default_factory=list, max_length=MAXIMO_CONSULTA_LOTE)
+
+
+class FiltrarAutores(SQLModel):
+    """Filtros del listado de autores; se combinan con AND y se resuelven en SQL."""
+    pais: Optional[str] = None
+    nacimiento_desde: Optional[int] = None
+    nacimiento_hasta: Optional[int] = None
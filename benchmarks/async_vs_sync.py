@@ -0,0 +1,125 @@
+"""Compara la ruta asíncrona (AsyncSession + aiosqlite) con la síncrona.
+
+Levanta la aplicación en el mismo proceso sobre una base temporal, genera un
+catálogo pequeño y lanza `--clientes` peticiones concurrentes contra rutas de
+lectura, primero con las rutas reales (async) y luego con una copia de esas
+rutas escrita como antes (`def` + `sessionDep`, que ocupan un hilo del
+threadpool mientras esperan a SQLite). Informa throughput y latencias p50/p99.
+
+La caché de detalles se desactiva (`CATALOGO_CACHE_ENTRADAS=0`) para que ambas
+variantes lean de SQLite en cada petición, y la app asíncrona se ejecuta dentro
+de su `lifespan`, como bajo uvicorn.
+
+Uso:
+    python benchmarks/async_vs_sync.py --clientes 500 --peticiones 5000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# El motor lee la ruta del archivo al importarse: se fija antes de importar la app.
+DIRECTORIO = Path(tempfile.mkdtemp(prefix="bench_catalogo_"))
+os.environ["CATALOGO_DB_ARCHIVO"] = str(DIRECTORIO / "catalogo.db")
+os.environ["CATALOGO_SQL_ECHO"] = "false"
+os.environ["CATALOGO_CACHE_ENTRADAS"] = "0"
+
+import httpx
+from fastapi import FastAPI
+from sqlmodel import Session
+
+from db import database
+from db.database import engine, sessionDep
+from autores.crud import ingresar_autores_en_lote, ver_autor_libros
+from autores.schemas import CrearAutor
+from libros.crud import ingresar_libros_en_lote, ver_libro_titulo
+from libros.schemas import CrearLibro
+import main
+
+
+def app_sincrona() -> FastAPI:
+    """Copia de las rutas de lectura con el estilo síncrono anterior."""
+    app = FastAPI()
+
+    @app.get("/autores/{nombre_apellidos}")
+    def obtener_autor(nombre_apellidos: str, session: sessionDep):
+        return ver_autor_libros(nombre_apellidos, session)
+
+    @app.get("/libros/{titulo}")
+    def obtener_libro(titulo: str, session: sessionDep):
+        return ver_libro_titulo(titulo, session)
+
+    return app
+
+
+def poblar(autores: int, libros: int):
+    database.create_database()
+    with Session(engine) as session:
+        ingresar_autores_en_lote(
+            (CrearAutor(nombre_apellidos=f"Autor {i}", pais_origen="Colombia", año_nacimiento="1950")
+             for i in range(autores)),
+            session,
+        )
+        ingresar_libros_en_lote(
+            [CrearLibro(titulo=f"Libro {i}", ISBN=f"isbn-{i}", nombre_autores=[f"Autor {i % autores}"])
+             for i in range(libros)],
+            session,
+        )
+
+
+async def medir(app: FastAPI, clientes: int, peticiones: int, autores: int, libros: int) -> dict:
+    transporte = httpx.ASGITransport(app=app)
+    latencias = []
+    semaforo = asyncio.Semaphore(clientes)
+
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        async def una(i: int):
+            url = f"/libros/Libro {i % libros}" if i % 2 else f"/autores/Autor {i % autores}"
+            async with semaforo:
+                inicio = time.perf_counter()
+                respuesta = await cliente.get(url)
+                latencias.append(time.perf_counter() - inicio)
+                respuesta.raise_for_status()
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(una(i) for i in range(peticiones)))
+        total = time.perf_counter() - inicio
+
+    # Las conexiones aiosqlite quedan ligadas a este event loop (el lifespan de
+    # la app asíncrona ya las cierra; la síncrona no tiene lifespan propio).
+    for motor in (database.async_engine, database.async_read_engine):
+        await motor.dispose()
+
+    cuantiles = statistics.quantiles(latencias, n=100)
+    return {
+        "peticiones_por_segundo": round(peticiones / total, 1),
+        "p50_ms": round(cuantiles[49] * 1000, 2),
+        "p99_ms": round(cuantiles[98] * 1000, 2),
+    }
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=500)
+    parser.add_argument("--peticiones", type=int, default=5000)
+    parser.add_argument("--autores", type=int, default=1000)
+    parser.add_argument("--libros", type=int, default=5000)
+    args = parser.parse_args()
+
+    poblar(args.autores, args.libros)
+
+    for nombre, app in (("sincrono", app_sincrona()), ("asincrono", main.app)):
+        resultado = asyncio.run(medir(app, args.clientes, args.peticiones, args.autores, args.libros))
+        print(nombre, resultado)
+
+
+if __name__ == "__main__":
+    main_benchmark()
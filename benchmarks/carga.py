@@ -0,0 +1,276 @@
+"""Prueba de carga de todas las rutas de la API sobre un catálogo sintético.
+
+Genera un catálogo con `catalogo_sintetico.generar_catalogo` en un directorio
+temporal y recorre cada ruta de los routers en el mismo proceso, con un
+cliente ASGI (`httpx.ASGITransport`) y una concurrencia fija de `--concurrencia`
+peticiones en vuelo. Antes de cada ruta se restaura la base generada y se
+vacía la caché de detalles, así cada medición parte del mismo estado y las
+rutas de escritura no afectan a las siguientes.
+
+El resultado es un JSON con, por ruta, las peticiones hechas, los códigos de
+estado obtenidos, las peticiones por segundo y las latencias p50/p95/p99.
+
+Uso:
+    python benchmarks/carga.py --autores 2000 --libros 10000 --concurrencia 32
+    python benchmarks/carga.py --rutas "GET /libros" --salida resultado.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# El motor lee la ruta del archivo al importarse: se fija antes de importar la app.
+DIRECTORIO = Path(tempfile.mkdtemp(prefix="bench_carga_"))
+os.environ["CATALOGO_DB_ARCHIVO"] = str(DIRECTORIO / "catalogo.db")
+os.environ["CATALOGO_SQL_ECHO"] = "false"
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks.catalogo_sintetico import generar_catalogo, PAISES, EDITORIALES
+from db import cache, database
+import main
+
+
+@dataclass
+class Ruta:
+    """Ruta a medir y cómo construir su i-ésima petición."""
+    metodo: str
+    plantilla: str
+    peticion: Callable[[int], tuple[str, object]]  # i -> (url, cuerpo JSON o None)
+    maximo: int | None = None  # objetivos distintos disponibles (rutas destructivas)
+
+
+def rutas(catalogo: dict, aleatorio: random.Random, lote: int) -> list[Ruta]:
+    """Todas las rutas de `autores` y `libros`, con objetivos tomados del catálogo."""
+    autores = catalogo["autores"]
+    libros = catalogo["libros"]
+    deposito_autores = catalogo["deposito_autores"]
+    deposito_libros = catalogo["deposito_libros"]
+    ids_autores = catalogo["ids_autores"]
+
+    def cualquiera(valores):
+        return lambda i: aleatorio.choice(valores)
+
+    autor, libro = cualquiera(autores), cualquiera(libros)
+    autor_deposito, libro_deposito = cualquiera(deposito_autores), cualquiera(deposito_libros)
+
+    def nuevo_autor(i):
+        return {"nombre_apellidos": f"Autor Carga {i:07d}", "pais_origen": "Colombia", "año_nacimiento": "1960"}
+
+    def nuevo_libro(i):
+        return {"titulo": f"Libro Carga {i:07d}", "ISBN": f"carga-{i:07d}", "nombre_autores": [autor(i)]}
+
+    def tandas(valores):
+        return lambda i: valores[i * lote:(i + 1) * lote]
+
+    return [
+        # Lecturas
+        Ruta("GET", "/autores/", lambda i: (f"/autores/?after={aleatorio.choice(ids_autores)}", None)),
+        Ruta("GET", "/autores/{nombre_apellidos}", lambda i: (f"/autores/{autor(i)}", None)),
+        Ruta("GET", "/autores/?pais", lambda i: (f"/autores/?pais={aleatorio.choice(PAISES)}", None)),
+        Ruta("GET", "/autores/?pais&sort", lambda i: (
+            f"/autores/?pais={aleatorio.choice(PAISES)}&nacimiento_desde=1900&sort=-año_nacimiento", None)),
+        Ruta("GET", "/autores/?sort", lambda i: ("/autores/?sort=nombre_apellidos", None)),
+        Ruta("GET", "/autores/id/{id_autor}", lambda i: (f"/autores/id/{aleatorio.choice(ids_autores)}", None)),
+        Ruta("GET", "/autores/deposito/", lambda i: ("/autores/deposito/", None)),
+        Ruta("GET", "/autores/deposito/?pais", lambda i: (f"/autores/deposito/?pais={aleatorio.choice(PAISES)}", None)),
+        Ruta("GET", "/autores/deposito/buscar/{nombre_apellidos}",
+             lambda i: (f"/autores/deposito/buscar/{autor_deposito(i)}", None)),
+        Ruta("GET", "/autores/export", lambda i: ("/autores/export", None)),
+        Ruta("GET", "/autores/deposito/export", lambda i: ("/autores/deposito/export?formato=csv", None)),
+        Ruta("GET", "/libros/", lambda i: (f"/libros/?after={aleatorio.randint(0, len(libros))}", None)),
+        Ruta("GET", "/libros/?fields", lambda i: ("/libros/?fields=id,titulo&limit=500", None)),
+        Ruta("GET", "/libros/?año_publicacion",
+             lambda i: (f"/libros/?año_publicacion={aleatorio.randint(1850, 2025)}", None)),
+        Ruta("GET", "/libros/?año&sort", lambda i: (
+            f"/libros/?año_desde={aleatorio.randint(1850, 2000)}&año_hasta=2025&sort=año_publicacion", None)),
+        Ruta("GET", "/libros/?editorial&sort", lambda i: (
+            f"/libros/?editorial={aleatorio.choice(EDITORIALES)}&disponible=true&sort=-año_publicacion", None)),
+        Ruta("GET", "/libros/?pais_autor", lambda i: (f"/libros/?pais_autor={aleatorio.choice(PAISES)}", None)),
+        Ruta("HEAD", "/libros/", lambda i: ("/libros/", None)),
+        Ruta("HEAD", "/libros/?editorial", lambda i: (
+            f"/libros/?editorial={aleatorio.choice(EDITORIALES)}&disponible=true", None)),
+        Ruta("GET", "/libros/?count", lambda i: (
+            f"/libros/?año_publicacion={aleatorio.randint(1850, 2025)}&count=true", None)),
+        Ruta("HEAD", "/autores/?pais", lambda i: (f"/autores/?pais={aleatorio.choice(PAISES)}", None)),
+        Ruta("GET", "/libros/buscar", lambda i: (f"/libros/buscar?q={aleatorio.choice(catalogo['palabras'])}", None)),
+        Ruta("GET", "/libros/{titulo}", lambda i: (f"/libros/{libro(i)}", None)),
+        Ruta("GET", "/libros/deposito/", lambda i: ("/libros/deposito/", None)),
+        Ruta("GET", "/libros/deposito/{titulo}", lambda i: (f"/libros/deposito/{libro_deposito(i)}", None)),
+        Ruta("GET", "/libros/export", lambda i: ("/libros/export", None)),
+        Ruta("GET", "/libros/deposito/export", lambda i: ("/libros/deposito/export?formato=csv", None)),
+        Ruta("GET", "/libros/export?fields", lambda i: ("/libros/export?formato=csv&fields=id,titulo", None)),
+        Ruta("POST", "/autores/lookup", lambda i: ("/autores/lookup", {
+            "nombres": aleatorio.sample(autores, min(lote, len(autores))),
+            "ids": aleatorio.sample(ids_autores, min(lote, len(ids_autores))),
+        })),
+        Ruta("POST", "/libros/lookup", lambda i: ("/libros/lookup", {
+            "ISBN": aleatorio.sample(catalogo["isbns"], min(lote, len(libros))),
+            "titulos": aleatorio.sample(libros, min(lote, len(libros))),
+        })),
+        Ruta("GET", "/estadisticas", lambda i: ("/estadisticas", None)),
+        Ruta("GET", "/cambios", lambda i: (f"/cambios?after={aleatorio.randint(0, len(libros))}&limit=500", None)),
+        Ruta("GET", "/cache", lambda i: ("/cache", None)),
+        # Escrituras
+        Ruta("POST", "/autores/", lambda i: ("/autores/", nuevo_autor(i))),
+        Ruta("POST", "/autores/bulk",
+             lambda i: ("/autores/bulk", [nuevo_autor(i * lote + j) for j in range(lote)])),
+        Ruta("PUT", "/autores/{nombre_apellidos}",
+             lambda i: (f"/autores/{autor(i)}", {"descripcion": f"Descripción {i}"})),
+        Ruta("DELETE", "/autores/deposito/{nombre_apellidos}",
+             lambda i: (f"/autores/deposito/{autores[i]}", None), len(autores)),
+        Ruta("POST", "/autores/deposito/restaurar/{nombre_apellidos}",
+             lambda i: (f"/autores/deposito/restaurar/{deposito_autores[i]}", None), len(deposito_autores)),
+        Ruta("POST", "/autores/deposito/restaurar",
+             lambda i: ("/autores/deposito/restaurar", tandas(deposito_autores)(i)),
+             -(-len(deposito_autores) // lote)),
+        Ruta("POST", "/libros/", lambda i: ("/libros/", nuevo_libro(i))),
+        Ruta("POST", "/libros/bulk",
+             lambda i: ("/libros/bulk", [nuevo_libro(i * lote + j) for j in range(lote)])),
+        Ruta("PUT", "/libros/{titulo}", lambda i: (f"/libros/{libro(i)}", {"copias_disponibles": i % 10})),
+        Ruta("POST", "/libros/{isbn}/prestar",
+             lambda i: (f"/libros/{aleatorio.choice(catalogo['isbns'])}/prestar", None)),
+        Ruta("POST", "/libros/{isbn}/devolver",
+             lambda i: (f"/libros/{aleatorio.choice(catalogo['isbns'])}/devolver", None)),
+        Ruta("DELETE", "/libros/deposito/{titulo}",
+             lambda i: (f"/libros/deposito/{libros[i]}", None), len(libros)),
+        Ruta("POST", "/libros/deposito/sacar/{titulo}",
+             lambda i: (f"/libros/deposito/sacar/{deposito_libros[i]}", None), len(deposito_libros)),
+        Ruta("POST", "/libros/deposito/restaurar",
+             lambda i: ("/libros/deposito/restaurar", tandas(deposito_libros)(i)),
+             -(-len(deposito_libros) // lote)),
+    ]
+
+
+async def restaurar_base(plantilla: Path):
+    """Cierra las conexiones y vuelve a copiar la base generada."""
+    for motor in (database.async_engine, database.async_read_engine):
+        await motor.dispose()
+    for motor in (database.engine, database.read_engine):
+        motor.dispose()
+
+    archivo = Path(database.perfil.archivo)
+    for sufijo in ("-wal", "-shm"):
+        Path(f"{archivo}{sufijo}").unlink(missing_ok=True)
+    shutil.copyfile(plantilla, archivo)
+    cache.detalles.limpiar()
+
+
+def _percentil(cuantiles: list[float], p: int) -> float:
+    return round(cuantiles[p - 1] * 1000, 2)
+
+
+async def medir(cliente: httpx.AsyncClient, ruta: Ruta, peticiones: int, concurrencia: int) -> dict:
+    """Lanza las peticiones de una ruta con `concurrencia` trabajadores."""
+    total = min(peticiones, ruta.maximo) if ruta.maximo is not None else peticiones
+    pendientes = iter(range(total))
+    latencias = []
+    estados = {}
+
+    async def trabajador():
+        for i in pendientes:
+            url, cuerpo = ruta.peticion(i)
+            inicio = time.perf_counter()
+            respuesta = await cliente.request(ruta.metodo, url, json=cuerpo)
+            await respuesta.aread()
+            latencias.append(time.perf_counter() - inicio)
+            estados[respuesta.status_code] = estados.get(respuesta.status_code, 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    segundos = time.perf_counter() - inicio
+
+    resultado = {
+        "ruta": f"{ruta.metodo} {ruta.plantilla}",
+        "peticiones": total,
+        "estados": {str(codigo): n for codigo, n in sorted(estados.items())},
+        "errores": sum(n for codigo, n in estados.items() if codigo >= 400),
+        "segundos": round(segundos, 3),
+        "peticiones_por_segundo": round(total / segundos, 1) if segundos else None,
+    }
+    if len(latencias) >= 2:
+        cuantiles = statistics.quantiles(latencias, n=100, method="inclusive")
+        resultado.update(p50_ms=_percentil(cuantiles, 50), p95_ms=_percentil(cuantiles, 95), p99_ms=_percentil(cuantiles, 99))
+    return resultado
+
+
+async def ejecutar(args, catalogo: dict, plantilla: Path) -> list[dict]:
+    aleatorio = random.Random(args.semilla)
+    seleccion = [
+        ruta for ruta in rutas(catalogo, aleatorio, args.lote)
+        if not args.rutas or any(filtro in f"{ruta.metodo} {ruta.plantilla}" for filtro in args.rutas)
+    ]
+
+    resultados = []
+    transporte = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://carga", timeout=None) as cliente:
+        for ruta in seleccion:
+            await restaurar_base(plantilla)
+            # La plantilla puede llevar una variante de consulta (`/libros/export?fields`).
+            es_export = urlsplit(ruta.plantilla).path.endswith("/export")
+            peticiones = args.peticiones_export if es_export else args.peticiones
+            resultado = await medir(cliente, ruta, peticiones, args.concurrencia)
+            print(json.dumps(resultado, ensure_ascii=False), file=sys.stderr)
+            resultados.append(resultado)
+
+    for motor in (database.async_engine, database.async_read_engine):
+        await motor.dispose()
+    return resultados
+
+
+def main_carga():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--autores", type=int, default=2000)
+    parser.add_argument("--libros", type=int, default=10000)
+    parser.add_argument("--vinculos", type=float, default=2.0, help="Autores promedio por libro")
+    parser.add_argument("--deposito", type=float, default=0.1, help="Fracción del catálogo en el depósito")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--concurrencia", type=int, default=32, help="Peticiones en vuelo por ruta")
+    parser.add_argument("--peticiones", type=int, default=500, help="Peticiones por ruta")
+    parser.add_argument("--peticiones-export", type=int, default=10, help="Peticiones por ruta de exportación")
+    parser.add_argument("--lote", type=int, default=100, help="Elementos por petición en las rutas en lote")
+    parser.add_argument("--rutas", nargs="*", help="Medir solo las rutas que contengan alguno de estos textos")
+    parser.add_argument("--salida", type=Path, help="Archivo donde guardar el JSON (por defecto, stdout)")
+    args = parser.parse_args()
+
+    database.create_database()
+    catalogo = generar_catalogo(
+        database.engine, args.autores, args.libros, args.vinculos, args.deposito, args.semilla
+    )
+    with database.engine.connect() as conexion:
+        conexion.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    database.engine.dispose()
+    plantilla = DIRECTORIO / "plantilla.db"
+    shutil.copyfile(database.perfil.archivo, plantilla)
+
+    resultados = asyncio.run(ejecutar(args, catalogo, plantilla))
+    informe = {
+        "configuracion": {
+            clave: valor for clave, valor in vars(args).items() if clave != "salida"
+        },
+        "rutas": resultados,
+    }
+    salida = json.dumps(informe, ensure_ascii=False, indent=2)
+    if args.salida:
+        args.salida.write_text(salida, encoding="utf-8")
+    else:
+        print(salida)
+    shutil.rmtree(DIRECTORIO, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main_carga()
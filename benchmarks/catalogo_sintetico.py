@@ -0,0 +1,197 @@
+"""Genera catálogos sintéticos reproducibles directamente en el esquema de `db/models.py`.
+
+Crea autores y libros en el catálogo y en el depósito, con sus vínculos N:M,
+usando inserciones por lotes (executemany) sin pasar por las rutas. El tamaño,
+la densidad de vínculos y la fracción que queda en el depósito son
+configurables; con la misma semilla se obtiene siempre el mismo catálogo.
+
+Uso:
+    python benchmarks/catalogo_sintetico.py catalogo.db --autores 2000 --libros 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, UTC
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+# Solo modelos: `db.database` se importa después de fijar CATALOGO_DB_ARCHIVO.
+from db.models import (
+    Autor, Libro,
+    DepositoAutores, DepositoLibro,
+    LinkAutorLibro, LinkAutorLibroDeposito
+)
+
+TAMANO_LOTE = 5000
+
+PAISES = ["Colombia", "México", "Argentina", "Chile", "Perú", "España", "Uruguay", "Cuba"]
+EDITORIALES = ["Planeta", "Alfaguara", "Anagrama", "Tusquets", "Norma", "Sudamericana", "Siruela"]
+PALABRAS = [
+    "mar", "ciudad", "guerra", "memoria", "familia", "río", "selva", "amor", "exilio", "noche",
+    "tiempo", "viaje", "silencio", "frontera", "montaña", "infancia", "muerte", "jardín", "casa",
+    "revolución", "isla", "desierto", "sueño", "pueblo", "lluvia", "espejo", "biblioteca", "tren",
+]
+
+
+def _autor(aleatorio: random.Random, i: int) -> dict:
+    nacimiento = aleatorio.randint(1800, 1990)
+    return {
+        "nombre_apellidos": f"Autor Sintético {i:07d}",
+        "pais_origen": aleatorio.choice(PAISES),
+        "descripcion": " ".join(aleatorio.choices(PALABRAS, k=8)),
+        "año_nacimiento": str(nacimiento),
+        "año_muerte": str(nacimiento + aleatorio.randint(30, 90)) if nacimiento < 1940 else None,
+    }
+
+
+def _libro(aleatorio: random.Random, i: int) -> dict:
+    return {
+        "titulo": f"{' '.join(aleatorio.choices(PALABRAS, k=3)).capitalize()} {i:07d}",
+        "resumen": " ".join(aleatorio.choices(PALABRAS, k=30)),
+        "numero_paginas": aleatorio.randint(60, 900),
+        "editorial": aleatorio.choice(EDITORIALES),
+        "año_publicacion": aleatorio.randint(1850, 2025),
+        "copias_disponibles": aleatorio.randint(0, 12),
+        "ISBN": f"978{i:010d}",
+    }
+
+
+def _insertar(session, modelo, filas: list[dict]) -> list[int]:
+    """Inserta las filas por lotes y devuelve sus ids en el mismo orden."""
+    ids = []
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        lote = filas[inicio:inicio + TAMANO_LOTE]
+        ids += session.exec(
+            insert(modelo).returning(modelo.id, sort_by_parameter_order=True), params=lote
+        ).scalars().all()
+    return ids
+
+
+def _insertar_vinculos(session, modelo, filas: list[dict]):
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        session.exec(insert(modelo), params=filas[inicio:inicio + TAMANO_LOTE])
+
+
+def _vinculos(aleatorio: random.Random, ids_libros, ids_autores, densidad: float):
+    """Asigna a cada libro entre 1 y `2 * densidad - 1` autores (media `densidad`)."""
+    maximo = max(1, round(2 * densidad - 1))
+    for id_libro in ids_libros:
+        cantidad = min(aleatorio.randint(1, maximo), len(ids_autores))
+        for id_autor in aleatorio.sample(ids_autores, cantidad):
+            yield id_libro, id_autor
+
+
+def generar_catalogo(
+    motor,
+    autores: int,
+    libros: int,
+    vinculos_por_libro: float = 2.0,
+    fraccion_deposito: float = 0.1,
+    semilla: int = 0,
+) -> dict:
+    """
+    Llena una base de datos vacía con un catálogo sintético.
+
+    Una fracción `fraccion_deposito` de los autores y de los libros se crea
+    directamente en el depósito, vinculados solo entre sí, como si se hubieran
+    movido allí desde el catálogo.
+
+    Args:
+        motor (Engine): Motor de la base de datos (ya creada con `create_database`).
+        autores (int): Cantidad total de autores.
+        libros (int): Cantidad total de libros.
+        vinculos_por_libro (float): Autores promedio por libro.
+        fraccion_deposito (float): Fracción de autores y libros en el depósito.
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        dict: Nombres, títulos e ids generados en el catálogo y en el depósito,
+        para que quien lo use pueda elegir objetivos de las peticiones.
+    """
+    aleatorio = random.Random(semilla)
+    filas_autores = [_autor(aleatorio, i) for i in range(autores)]
+    filas_libros = [_libro(aleatorio, i) for i in range(libros)]
+    corte_autores = autores - round(autores * fraccion_deposito)
+    corte_libros = libros - round(libros * fraccion_deposito)
+    ahora = datetime.now(UTC)
+
+    with Session(motor) as session:
+        ids_autores = _insertar(session, Autor, filas_autores[:corte_autores])
+        ids_libros = _insertar(session, Libro, filas_libros[:corte_libros])
+        vinculos = [
+            {"id_libros": id_libro, "id_autor": id_autor}
+            for id_libro, id_autor in _vinculos(aleatorio, ids_libros, ids_autores, vinculos_por_libro)
+        ]
+        _insertar_vinculos(session, LinkAutorLibro, vinculos)
+
+        ids_deposito_autores = _insertar(session, DepositoAutores, [
+            {**fila, "id_autor_original": autores + i, "timestamp": ahora}
+            for i, fila in enumerate(filas_autores[corte_autores:])
+        ])
+        ids_deposito_libros = _insertar(session, DepositoLibro, [
+            {**fila, "id_libro_original": libros + i, "timestamp": ahora}
+            for i, fila in enumerate(filas_libros[corte_libros:])
+        ])
+        vinculos_deposito = [
+            {"id_libro_deposito": id_libro, "id_autor_deposito": id_autor, "timestamp": ahora}
+            for id_libro, id_autor in _vinculos(
+                aleatorio, ids_deposito_libros, ids_deposito_autores, vinculos_por_libro
+            )
+        ] if ids_deposito_autores else []
+        _insertar_vinculos(session, LinkAutorLibroDeposito, vinculos_deposito)
+        session.commit()
+
+    return {
+        "autores": [fila["nombre_apellidos"] for fila in filas_autores[:corte_autores]],
+        "ids_autores": ids_autores,
+        "libros": [fila["titulo"] for fila in filas_libros[:corte_libros]],
+        "isbns": [fila["ISBN"] for fila in filas_libros[:corte_libros]],
+        "deposito_autores": [fila["nombre_apellidos"] for fila in filas_autores[corte_autores:]],
+        "deposito_libros": [fila["titulo"] for fila in filas_libros[corte_libros:]],
+        "vinculos": len(vinculos),
+        "vinculos_deposito": len(vinculos_deposito),
+        "palabras": PALABRAS,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("archivo", type=Path, help="Archivo SQLite a crear (no debe existir)")
+    parser.add_argument("--autores", type=int, default=2000)
+    parser.add_argument("--libros", type=int, default=10000)
+    parser.add_argument("--vinculos", type=float, default=2.0, help="Autores promedio por libro")
+    parser.add_argument("--deposito", type=float, default=0.1, help="Fracción en el depósito")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.archivo.exists():
+        parser.error(f"{args.archivo} ya existe")
+
+    # El motor lee la ruta del archivo al importarse.
+    os.environ["CATALOGO_DB_ARCHIVO"] = str(args.archivo)
+    os.environ.setdefault("CATALOGO_SQL_ECHO", "false")
+    from db import database
+
+    inicio = time.perf_counter()
+    database.create_database()
+    resultado = generar_catalogo(
+        database.engine, args.autores, args.libros, args.vinculos, args.deposito, args.semilla
+    )
+    print(
+        f"{len(resultado['autores'])} autores, {len(resultado['libros'])} libros y "
+        f"{resultado['vinculos']} vínculos en el catálogo; "
+        f"{len(resultado['deposito_autores'])} autores, {len(resultado['deposito_libros'])} libros y "
+        f"{resultado['vinculos_deposito']} vínculos en el depósito "
+        f"({time.perf_counter() - inicio:.1f} s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Prueba de la difusión en vivo (`/stream`) con miles de suscriptores.
+
+En una base temporal, mide los préstamos por segundo (`POST /libros/{isbn}/prestar`)
+sin suscriptores y con `--inactivos` suscriptores conectados que filtran por
+un ISBN sin actividad, más `--activos` que siguen al libro prestado y uno que
+nunca lee su cola. Comprueba que:
+
+- cada suscriptor activo recibe todos los eventos del libro, en orden y sin duplicados;
+- el suscriptor que no lee se descarta en cuanto su cola supera el máximo;
+- los inactivos no reciben nada.
+
+Informa la memoria por suscriptor inactivo (tracemalloc) y la latencia desde
+la respuesta del préstamo hasta que el evento llega a los suscriptores.
+
+Termina con código 1 si no se cumple alguna comprobación.
+
+Uso:
+    python benchmarks/difusion.py --inactivos 5000 --activos 10 --prestamos 300
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# El motor lee la ruta del archivo al importarse: se fija antes de importar la app.
+DIRECTORIO = Path(tempfile.mkdtemp(prefix="bench_difusion_"))
+os.environ["CATALOGO_DB_ARCHIVO"] = str(DIRECTORIO / "catalogo.db")
+os.environ["CATALOGO_SQL_ECHO"] = "false"
+
+import httpx
+
+from db import database
+from db.difusion import difusor, Filtro
+import main
+
+ISBN = "9780000000001"
+TITULO = "Libro de mostrador"
+
+
+async def _prestar(cliente: httpx.AsyncClient, prestamos: int, momentos: list) -> dict:
+    """Presta `prestamos` copias, de a una, y guarda cuándo respondió cada préstamo."""
+    inicio = time.perf_counter()
+    for _ in range(prestamos):
+        respuesta = await cliente.post(f"/libros/{ISBN}/prestar")
+        respuesta.raise_for_status()
+        momentos.append(time.perf_counter())
+    segundos = time.perf_counter() - inicio
+    return {"segundos": round(segundos, 3), "prestamos_por_segundo": round(prestamos / segundos, 1)}
+
+
+async def _consumir(filtro: Filtro, recibidos: list):
+    async for evento in difusor.eventos(filtro):
+        if evento is not None:
+            recibidos.append((evento, time.perf_counter()))
+
+
+async def ejecutar(inactivos: int, activos: int, prestamos: int) -> tuple[dict, list[str]]:
+    transporte = httpx.ASGITransport(app=main.app)
+    problemas = []
+    informe = {"inactivos": inactivos, "activos": activos, "prestamos": prestamos, "maximo_cola": difusor.maximo_cola}
+    tarea_difusor = asyncio.create_task(difusor.ejecutar())
+
+    async with httpx.AsyncClient(transport=transporte, base_url="http://difusion", timeout=None) as cliente:
+        respuesta = await cliente.post("/libros/", json={
+            "titulo": TITULO, "ISBN": ISBN, "copias_disponibles": 2 * prestamos,
+        })
+        respuesta.raise_for_status()
+
+        informe["sin_suscriptores"] = await _prestar(cliente, prestamos, [])
+
+        tracemalloc.start()
+        antes = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        silenciosos = [[] for _ in range(inactivos)]
+        tareas = [asyncio.create_task(_consumir(Filtro.crear(isbn=["sin-actividad"]), r)) for r in silenciosos]
+        await asyncio.sleep(0)
+        while len(difusor.suscriptores) < inactivos:
+            await asyncio.sleep(0.01)
+        informe["memoria_por_inactivo_kb"] = round((tracemalloc.get_traced_memory()[0] - antes) / max(inactivos, 1) / 1024, 2)
+        informe["segundos_para_conectar"] = round(time.perf_counter() - inicio, 3)
+        tracemalloc.stop()
+
+        recibidos = [[] for _ in range(activos)]
+        tareas += [asyncio.create_task(_consumir(Filtro.crear(isbn=[ISBN]), r)) for r in recibidos]
+        lento = await difusor.suscribir(Filtro.crear(isbn=[ISBN]))
+        while len(difusor.suscriptores) < inactivos + activos + 1:
+            await asyncio.sleep(0.01)
+
+        momentos = []
+        informe["con_suscriptores"] = await _prestar(cliente, prestamos, momentos)
+        limite = time.perf_counter() + 10
+        while any(len(r) < prestamos for r in recibidos) and time.perf_counter() < limite:
+            await asyncio.sleep(0.05)
+
+    for r in recibidos:
+        ids = [evento["id"] for evento, _ in r]
+        if len(r) != prestamos or ids != sorted(set(ids)):
+            problemas.append(f"un suscriptor activo recibió {len(r)} eventos de {prestamos} (o desordenados)")
+            break
+    if any(silenciosos):
+        problemas.append("un suscriptor inactivo recibió eventos de otro ISBN")
+    if not lento.descartado:
+        problemas.append("el suscriptor que no lee su cola no se descartó")
+
+    # Latencia de entrega: desde la respuesta del préstamo k hasta la llegada del evento k.
+    latencias = sorted(llegada - momento for r in recibidos for (_, llegada), momento in zip(r, momentos))
+    if len(latencias) >= 2:
+        cuantiles = statistics.quantiles(latencias, n=100, method="inclusive")
+        informe["entrega_p50_ms"] = round(cuantiles[49] * 1000, 1)
+        informe["entrega_p99_ms"] = round(cuantiles[98] * 1000, 1)
+    informe["difusor"] = difusor.estadisticas()
+
+    for tarea in [*tareas, tarea_difusor]:
+        tarea.cancel()
+    await asyncio.gather(*tareas, tarea_difusor, return_exceptions=True)
+    for motor in (database.async_engine, database.async_read_engine):
+        await motor.dispose()
+    return informe, problemas
+
+
+def main_difusion():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inactivos", type=int, default=5000, help="Suscriptores que no reciben eventos")
+    parser.add_argument("--activos", type=int, default=10, help="Suscriptores que siguen al libro prestado")
+    parser.add_argument("--prestamos", type=int, default=300)
+    args = parser.parse_args()
+
+    database.create_database()
+    try:
+        informe, problemas = asyncio.run(ejecutar(args.inactivos, args.activos, args.prestamos))
+    finally:
+        shutil.rmtree(DIRECTORIO, ignore_errors=True)
+
+    print(json.dumps(informe, ensure_ascii=False, indent=2))
+    for problema in problemas:
+        print(f"ERROR: {problema}", file=sys.stderr)
+    sys.exit(1 if problemas else 0)
+
+
+if __name__ == "__main__":
+    main_difusion()
@@ -0,0 +1,99 @@
+"""Mide el rendimiento de lectura mientras hay escrituras concurrentes.
+
+Compara el perfil anterior del motor (journal DELETE, synchronous FULL, sin
+mmap ni caché ampliada) con el perfil actual (`PerfilMotor`, modo WAL). En
+cada caso se crea una base temporal, se lanzan `--lectores` hilos que leen
+libros por id y un hilo escritor que actualiza y confirma sin pausa, y se
+cuentan las lecturas completadas durante `--segundos`.
+
+Uso:
+    python benchmarks/lecturas_con_escrituras.py --lectores 8 --segundos 5
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+from sqlmodel import SQLModel
+
+from db.configuracion import PerfilMotor
+from db.database import crear_motor
+import db.models  # noqa: F401  registra las tablas en SQLModel.metadata
+
+PERFIL_LEGADO = PerfilMotor(
+    journal_mode="DELETE",
+    synchronous="FULL",
+    mmap_size=0,
+    cache_size_kb=2000,
+)
+
+
+def medir(perfil: PerfilMotor, lectores: int, segundos: float, libros: int) -> dict:
+    archivo = Path(tempfile.mkdtemp(prefix="bench_wal_")) / "catalogo.db"
+    perfil = replace(perfil, archivo=str(archivo), echo=False, pool_size=lectores + 1)
+    motor = crear_motor(perfil)
+    SQLModel.metadata.create_all(motor)
+    with motor.begin() as conexion:
+        conexion.execute(
+            text("INSERT INTO libro (titulo, clave_titulo, ISBN, copias_disponibles) VALUES (:t, :t, :i, 1)"),
+            [{"t": f"libro {i}", "i": f"isbn-{i}"} for i in range(libros)],
+        )
+
+    fin = time.perf_counter() + segundos
+    lecturas = [0] * lectores
+    escrituras = [0]
+
+    def leer(n: int):
+        with motor.connect() as conexion:
+            while time.perf_counter() < fin:
+                conexion.execute(
+                    text("SELECT * FROM libro WHERE id = :id"), {"id": random.randint(1, libros)}
+                ).first()
+                conexion.rollback()
+                lecturas[n] += 1
+
+    def escribir():
+        with motor.connect() as conexion:
+            while time.perf_counter() < fin:
+                conexion.execute(
+                    text("UPDATE libro SET copias_disponibles = copias_disponibles + 1 WHERE id = :id"),
+                    {"id": random.randint(1, libros)},
+                )
+                conexion.commit()
+                escrituras[0] += 1
+
+    hilos = [threading.Thread(target=leer, args=(n,)) for n in range(lectores)]
+    hilos.append(threading.Thread(target=escribir))
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    motor.dispose()
+
+    return {
+        "lecturas_por_segundo": round(sum(lecturas) / segundos),
+        "escrituras_por_segundo": round(escrituras[0] / segundos),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lectores", type=int, default=8)
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--libros", type=int, default=10000)
+    args = parser.parse_args()
+
+    for nombre, perfil in (("antes", PERFIL_LEGADO), ("despues", PerfilMotor())):
+        print(nombre, medir(perfil, args.lectores, args.segundos, args.libros))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Audita los planes de ejecución de todas las sentencias que emiten los CRUD.
+
+Genera un catálogo sintético, recorre cada ruta de `benchmarks/carga.py` unas
+pocas veces y captura el SQL que llega a los motores de `db/database.py`.
+Luego ejecuta `EXPLAIN QUERY PLAN` sobre cada sentencia distinta y señala las
+que recorren una tabla completa (`SCAN tabla` sin índice) a pesar de filtrar
+con `WHERE` o `JOIN`: son las que suelen necesitar un índice. Los recorridos
+de sentencias sin filtro (exportaciones, primera página de un listado) se
+listan aparte como esperados. También informa las sentencias que ordenan en
+una tabla temporal (cualquier `USE TEMP B-TREE ...`: `ORDER BY`, su parte
+derecha, `DISTINCT` o `GROUP BY`), es decir, sin un índice que coincida con su
+filtro y su orden.
+
+Los planes aceptados a propósito están en `RECORRIDOS_PERMITIDOS` y
+`ORDENES_PERMITIDOS`, cada uno con su motivo, y se listan aparte.
+
+Termina con código 1 si encuentra recorridos u ordenamientos en tabla temporal
+no esperados ni permitidos.
+
+Uso:
+    python benchmarks/plan_consultas.py
+    python benchmarks/plan_consultas.py --rutas "/libros" --todas
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import shutil
+import sqlite3
+import sys
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Importar `carga` fija la base temporal antes de que se cree el motor.
+from benchmarks.carga import DIRECTORIO, Ruta, rutas, restaurar_base
+from benchmarks.catalogo_sintetico import generar_catalogo
+from db import database
+import httpx
+from sqlalchemy import event
+import main
+
+# `SCAN tabla` o `SCAN tabla AS alias`, sin índice: recorrido completo de la tabla.
+# SQLAlchemy nombra los alias como `tabla_1`; se agrupan con la tabla.
+RECORRIDO_COMPLETO = re.compile(r"^SCAN (\w+?)(?:_\d+)?(?: AS \w+)?$")
+FILTRA = re.compile(r"\b(WHERE|JOIN)\b", re.IGNORECASE)
+# `USE TEMP B-TREE FOR ORDER BY`, `... FOR RIGHT PART OF ORDER BY`, `... FOR DISTINCT`, etc.
+ORDEN_TEMPORAL = "USE TEMP B-TREE"
+# Tablas cuyo recorrido completo es aceptable aunque la sentencia filtre -> motivo.
+RECORRIDOS_PERMITIDOS = {
+    "estadistica": "tabla resumen de O(grupos) filas; `GET /estadisticas` la lee completa",
+    "sqlite_sequence": "una fila por tabla con AUTOINCREMENT; `cambios.leer_estado` toma la de `cambio`",
+}
+# Fragmento del SQL cuyo ordenamiento en tabla temporal es aceptable -> motivo.
+ORDENES_PERMITIDOS = {
+    "bm25(": "el puntaje de FTS5 se calcula en cada búsqueda y ningún índice lo ordena; "
+             "solo se ordenan las coincidencias del MATCH",
+}
+# Listas `IN (?, ?, ...)` de distinto largo son la misma consulta.
+LISTA_PARAMETROS = re.compile(r"\?(?:, \?)+")
+
+
+@contextmanager
+def capturar_sql():
+    """Como `db.consultas.contar_consultas`, pero guarda también los parámetros."""
+    capturadas = []
+    motores = (
+        database.engine, database.async_engine.sync_engine,
+        database.read_engine, database.async_read_engine.sync_engine,
+    )
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        capturadas.append((statement, parameters))
+
+    for motor in motores:
+        event.listen(motor, "before_cursor_execute", registrar)
+    try:
+        yield capturadas
+    finally:
+        for motor in motores:
+            event.remove(motor, "before_cursor_execute", registrar)
+
+
+async def capturar(seleccion: list[Ruta], repeticiones: int, plantilla: Path) -> dict:
+    """Ejecuta las rutas y devuelve, por sentencia, sus parámetros y las rutas que la emiten."""
+    sentencias = {}
+    transporte = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://plan") as cliente:
+        for ruta in seleccion:
+            await restaurar_base(plantilla)
+            total = min(repeticiones, ruta.maximo) if ruta.maximo is not None else repeticiones
+            with capturar_sql() as capturadas:
+                for i in range(total):
+                    url, cuerpo = ruta.peticion(i)
+                    await cliente.request(ruta.metodo, url, json=cuerpo)
+            for sql, parametros in capturadas:
+                clave = LISTA_PARAMETROS.sub("?, ...", " ".join(sql.split()))
+                entrada = sentencias.setdefault(clave, {"sql": sql, "parametros": parametros, "rutas": set()})
+                entrada["rutas"].add(f"{ruta.metodo} {ruta.plantilla}")
+
+    for motor in (database.async_engine, database.async_read_engine):
+        await motor.dispose()
+    return sentencias
+
+
+def planes(archivo: str, sentencias: dict) -> list[dict]:
+    """Ejecuta `EXPLAIN QUERY PLAN` sobre cada sentencia capturada."""
+    resultado = []
+    conexion = sqlite3.connect(archivo)
+    try:
+        for clave, datos in sentencias.items():
+            sql = datos["sql"]
+            if not sql.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")):
+                continue
+            parametros = datos["parametros"]
+            if isinstance(parametros, list):  # executemany: basta con la primera fila
+                parametros = parametros[0] if parametros else ()
+            filas = conexion.execute(f"EXPLAIN QUERY PLAN {sql}", parametros).fetchall()
+            detalles = [fila[3] for fila in filas]
+            tablas = sorted({m.group(1) for d in detalles if (m := RECORRIDO_COMPLETO.match(d))})
+            orden_temporal = any(d.startswith(ORDEN_TEMPORAL) for d in detalles)
+            permitidos = [RECORRIDOS_PERMITIDOS[t] for t in tablas if t in RECORRIDOS_PERMITIDOS]
+            if orden_temporal:
+                permitidos += [motivo for fragmento, motivo in ORDENES_PERMITIDOS.items() if fragmento in sql]
+            resultado.append({
+                "sql": clave,
+                "rutas": sorted(datos["rutas"]),
+                "plan": detalles,
+                "recorridos": tablas,
+                "orden_temporal": orden_temporal,
+                "esperado": not FILTRA.search(sql),
+                "recorridos_a_revisar": [t for t in tablas if t not in RECORRIDOS_PERMITIDOS],
+                "orden_a_revisar": orden_temporal and not any(f in sql for f in ORDENES_PERMITIDOS),
+                "permitidos": permitidos,
+            })
+    finally:
+        conexion.close()
+    return resultado
+
+
+def main_plan():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--autores", type=int, default=500)
+    parser.add_argument("--libros", type=int, default=2000)
+    parser.add_argument("--repeticiones", type=int, default=3, help="Peticiones por ruta")
+    parser.add_argument("--rutas", nargs="*", help="Auditar solo las rutas que contengan alguno de estos textos")
+    parser.add_argument("--todas", action="store_true", help="Mostrar también las sentencias sin recorridos")
+    parser.add_argument("--json", action="store_true", help="Imprimir el informe como JSON")
+    args = parser.parse_args()
+
+    database.create_database()
+    catalogo = generar_catalogo(database.engine, args.autores, args.libros)
+    database.engine.dispose()
+    plantilla = DIRECTORIO / "plantilla.db"
+    shutil.copyfile(database.perfil.archivo, plantilla)
+
+    seleccion = [
+        ruta for ruta in rutas(catalogo, random.Random(0), lote=10)
+        if not args.rutas or any(filtro in f"{ruta.metodo} {ruta.plantilla}" for filtro in args.rutas)
+    ]
+    sentencias = asyncio.run(capturar(seleccion, args.repeticiones, plantilla))
+    informe = planes(database.perfil.archivo, sentencias)
+    problemas = [s for s in informe if s["recorridos_a_revisar"] and not s["esperado"]]
+    ordenamientos = [s for s in informe if s["orden_a_revisar"]]
+
+    if args.json:
+        print(json.dumps(informe if args.todas else [s for s in informe if s["recorridos"]], ensure_ascii=False, indent=2))
+    else:
+        por_tabla = defaultdict(list)
+        for sentencia in problemas:
+            for tabla in sentencia["recorridos_a_revisar"]:
+                por_tabla[tabla].append(sentencia)
+        for tabla, lista in sorted(por_tabla.items()):
+            print(f"\n== Recorrido completo de '{tabla}' en {len(lista)} sentencias con filtro")
+            for sentencia in lista:
+                print(f"  {', '.join(sentencia['rutas'])}\n    {sentencia['sql']}")
+                for paso in sentencia["plan"]:
+                    print(f"      {paso}")
+        if ordenamientos:
+            print(f"\n== Ordenamiento en tabla temporal en {len(ordenamientos)} sentencias")
+            for sentencia in ordenamientos:
+                print(f"  {', '.join(sentencia['rutas'])}\n    {sentencia['sql']}")
+        permitidas = [s for s in informe if s["permitidos"]]
+        if permitidas:
+            print(f"\n== Planes permitidos en {len(permitidas)} sentencias")
+            for sentencia in permitidas:
+                print(f"  {', '.join(sentencia['rutas'])}\n    {sentencia['sql']}")
+                for motivo in sentencia["permitidos"]:
+                    print(f"      permitido: {motivo}")
+        esperados = [s for s in informe if s["recorridos"] and s["esperado"]]
+        print(
+            f"\n{len(informe)} sentencias auditadas: {len(problemas)} con recorridos completos a revisar, "
+            f"{len(ordenamientos)} con ordenamiento en tabla temporal a revisar, "
+            f"{len(esperados)} recorridos esperados (sentencias sin filtro), "
+            f"{len(permitidas)} con planes permitidos."
+        )
+        if args.todas:
+            for sentencia in informe:
+                print(f"\n{sentencia['sql']}\n  " + "\n  ".join(sentencia["plan"]))
+
+    shutil.rmtree(DIRECTORIO, ignore_errors=True)
+    sys.exit(1 if problemas or ordenamientos else 0)
+
+
+if __name__ == "__main__":
+    main_plan()
@@ -0,0 +1,158 @@
+"""Prueba de estrés de préstamos simultáneos de un mismo título.
+
+Crea un libro con `--copias` copias en una base temporal y lanza a la vez
+`--prestamos` peticiones `POST /libros/{isbn}/prestar` (más que copias) con un
+cliente ASGI en el mismo proceso. Luego devuelve todas las copias prestadas,
+también a la vez. Comprueba que:
+
+- se prestan exactamente `--copias` copias y el resto recibe 400;
+- el inventario termina en 0 tras los préstamos y vuelve a `--copias` tras
+  las devoluciones;
+- ninguna petición falla con 5xx (bloqueos de SQLite, timeouts del pool).
+
+Para comparar, repite los préstamos con el patrón anterior (leer el libro y
+guardar `copias_disponibles - 1` con `PUT /libros/{titulo}`) y cuenta los
+préstamos que se pierden.
+
+Termina con código 1 si no se cumple alguna comprobación de los endpoints nuevos.
+
+Uso:
+    python benchmarks/prestamos_concurrentes.py --copias 100 --prestamos 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# El motor lee la ruta del archivo al importarse: se fija antes de importar la app.
+DIRECTORIO = Path(tempfile.mkdtemp(prefix="bench_prestamos_"))
+os.environ["CATALOGO_DB_ARCHIVO"] = str(DIRECTORIO / "catalogo.db")
+os.environ["CATALOGO_SQL_ECHO"] = "false"
+
+import httpx
+
+from db import database
+import main
+
+ISBN = "9780000000001"
+TITULO = "Libro muy solicitado"
+
+
+async def _lanzar(cliente: httpx.AsyncClient, peticiones: list[tuple[str, str, object]]) -> dict:
+    """Lanza todas las peticiones a la vez y resume estados y latencias."""
+    async def una(metodo, url, cuerpo):
+        inicio = time.perf_counter()
+        respuesta = await cliente.request(metodo, url, json=cuerpo)
+        return respuesta.status_code, time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*(una(*p) for p in peticiones))
+    segundos = time.perf_counter() - inicio
+    latencias = sorted(latencia for _, latencia in resultados)
+    cuantiles = statistics.quantiles(latencias, n=100, method="inclusive") if len(latencias) >= 2 else latencias * 99
+    return {
+        "estados": dict(sorted(Counter(str(estado) for estado, _ in resultados).items())),
+        "segundos": round(segundos, 3),
+        "peticiones_por_segundo": round(len(resultados) / segundos, 1),
+        "p50_ms": round(cuantiles[49] * 1000, 2),
+        "p99_ms": round(cuantiles[98] * 1000, 2),
+    }
+
+
+async def _copias(cliente: httpx.AsyncClient) -> int:
+    respuesta = await cliente.get(f"/libros/{TITULO}")
+    return respuesta.json()["copias_disponibles"]
+
+
+async def _fijar_copias(cliente: httpx.AsyncClient, copias: int):
+    respuesta = await cliente.put(f"/libros/{TITULO}", json={"copias_disponibles": copias})
+    respuesta.raise_for_status()
+
+
+async def _prestamo_legado(cliente: httpx.AsyncClient) -> int:
+    """Préstamo con lectura y escritura separadas, como se hacía con `PUT`."""
+    copias = await _copias(cliente)
+    if copias <= 0:
+        return 400
+    respuesta = await cliente.put(f"/libros/{TITULO}", json={"copias_disponibles": copias - 1})
+    return respuesta.status_code
+
+
+async def ejecutar(copias: int, prestamos: int) -> tuple[dict, list[str]]:
+    transporte = httpx.ASGITransport(app=main.app)
+    problemas = []
+    informe = {"copias": copias, "prestamos": prestamos}
+
+    async with httpx.AsyncClient(transport=transporte, base_url="http://estres", timeout=None) as cliente:
+        respuesta = await cliente.post("/libros/", json={
+            "titulo": TITULO, "resumen": "", "numero_paginas": 100, "editorial": "Planeta",
+            "año_publicacion": 2000, "copias_disponibles": copias, "ISBN": ISBN,
+        })
+        respuesta.raise_for_status()
+
+        informe["prestar"] = await _lanzar(cliente, [("POST", f"/libros/{ISBN}/prestar", None)] * prestamos)
+        informe["copias_tras_prestar"] = await _copias(cliente)
+        prestadas = informe["prestar"]["estados"].get("200", 0)
+        if prestadas != min(copias, prestamos):
+            problemas.append(f"se prestaron {prestadas} copias de {copias}")
+        if informe["copias_tras_prestar"] != copias - prestadas:
+            problemas.append(f"quedaron {informe['copias_tras_prestar']} copias tras prestar {prestadas}")
+
+        informe["devolver"] = await _lanzar(cliente, [("POST", f"/libros/{ISBN}/devolver", None)] * prestadas)
+        informe["copias_tras_devolver"] = await _copias(cliente)
+        if informe["copias_tras_devolver"] != copias:
+            problemas.append(f"quedaron {informe['copias_tras_devolver']} copias tras devolver todas")
+
+        for fase in ("prestar", "devolver"):
+            fallos = sum(n for estado, n in informe[fase]["estados"].items() if estado.startswith("5"))
+            if fallos:
+                problemas.append(f"{fallos} respuestas 5xx al {fase}")
+
+        # Patrón anterior: leer y escribir el total en peticiones separadas.
+        await _fijar_copias(cliente, copias)
+        inicio = time.perf_counter()
+        estados = await asyncio.gather(*(_prestamo_legado(cliente) for _ in range(prestamos)))
+        exitosos = estados.count(200)
+        restantes = await _copias(cliente)
+        informe["legado"] = {
+            "segundos": round(time.perf_counter() - inicio, 3),
+            "prestamos_confirmados": exitosos,
+            "copias_restantes": restantes,
+            "prestamos_perdidos": exitosos - (copias - restantes),
+        }
+
+    for motor in (database.async_engine, database.async_read_engine):
+        await motor.dispose()
+    return informe, problemas
+
+
+def main_estres():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copias", type=int, default=100)
+    parser.add_argument("--prestamos", type=int, default=500, help="Préstamos simultáneos")
+    args = parser.parse_args()
+
+    database.create_database()
+    try:
+        informe, problemas = asyncio.run(ejecutar(args.copias, args.prestamos))
+    finally:
+        shutil.rmtree(DIRECTORIO, ignore_errors=True)
+
+    print(json.dumps(informe, ensure_ascii=False, indent=2))
+    for problema in problemas:
+        print(f"ERROR: {problema}", file=sys.stderr)
+    sys.exit(1 if problemas else 0)
+
+
+if __name__ == "__main__":
+    main_estres()
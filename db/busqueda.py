@@ -0,0 +1,115 @@
+"""
+busqueda.py
+-----------
+Búsqueda de texto completo sobre los libros del catálogo usando SQLite FTS5.
+
+La tabla virtual `libro_fts` indexa `titulo`, `resumen` y `editorial` como
+tabla de contenido externo sobre `libro`: no duplica el texto, solo el índice
+invertido. Se mantiene sincronizada mediante triggers, por lo que cualquier
+INSERT, UPDATE o DELETE sobre `libro` (creación, actualización, movimiento al
+depósito o restauración, individual o en lote) queda reflejado sin código
+adicional en los CRUD.
+"""
+
+import re
+from sqlalchemy import text
+
+# Peso de cada columna en bm25: una coincidencia en el título pesa más que en el resumen.
+PESOS_BM25 = (10.0, 1.0, 2.0)
+
+_DDL_INDICE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS libro_fts USING fts5(
+        titulo, resumen, editorial,
+        content='libro', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS libro_fts_ai AFTER INSERT ON libro BEGIN
+        INSERT INTO libro_fts(rowid, titulo, resumen, editorial)
+        VALUES (new.id, new.titulo, new.resumen, new.editorial);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS libro_fts_ad AFTER DELETE ON libro BEGIN
+        INSERT INTO libro_fts(libro_fts, rowid, titulo, resumen, editorial)
+        VALUES ('delete', old.id, old.titulo, old.resumen, old.editorial);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS libro_fts_au AFTER UPDATE OF titulo, resumen, editorial ON libro BEGIN
+        INSERT INTO libro_fts(libro_fts, rowid, titulo, resumen, editorial)
+        VALUES ('delete', old.id, old.titulo, old.resumen, old.editorial);
+        INSERT INTO libro_fts(rowid, titulo, resumen, editorial)
+        VALUES (new.id, new.titulo, new.resumen, new.editorial);
+    END
+    """,
+]
+
+
+def crear_indice_busqueda(conexion):
+    """
+    Crea la tabla FTS5 y sus triggers si no existen.
+
+    Si la tabla se crea sobre una base de datos con libros previos, el índice
+    se reconstruye a partir de `libro`.
+
+    Args:
+        conexion (Connection): Conexión dentro de una transacción abierta.
+    """
+    existia = conexion.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'libro_fts'")
+    ).first()
+
+    for ddl in _DDL_INDICE:
+        conexion.execute(text(ddl))
+
+    if not existia:
+        conexion.execute(text("INSERT INTO libro_fts(libro_fts) VALUES ('rebuild')"))
+
+
+def expresion_fts(consulta: str) -> str:
+    """
+    Convierte el texto del usuario en una expresión FTS5 segura.
+
+    Cada palabra se cita para que caracteres especiales de la sintaxis de
+    FTS5 (comillas, `*`, `:`, `-`, operadores) no produzcan errores; las
+    palabras se combinan con AND implícito.
+
+    Args:
+        consulta (str): Texto libre escrito por el usuario.
+
+    Returns:
+        str: Expresión lista para `MATCH`, vacía si no hay palabras.
+    """
+    palabras = re.findall(r"\w+", consulta)
+    return " ".join(f'"{palabra}"' for palabra in palabras)
+
+
+def buscar(session, consulta: str, limit: int, offset: int = 0):
+    """
+    Ejecuta la búsqueda ordenada por relevancia (bm25).
+
+    Args:
+        session (Session): Sesión activa de la base de datos.
+        consulta (str): Expresión FTS5 generada con `expresion_fts`.
+        limit (int): Cantidad máxima de resultados.
+        offset (int): Resultados a omitir.
+
+    Returns:
+        list[Row]: Filas con los datos básicos del libro, un fragmento
+        resaltado del resumen y su puntaje (menor es más relevante).
+    """
+    pesos = ", ".join(str(peso) for peso in PESOS_BM25)
+    sql = text(f"""
+        SELECT libro.id, libro.titulo, libro.ISBN, libro.editorial, libro.año_publicacion,
+               snippet(libro_fts, 1, '[', ']', '…', 12) AS fragmento,
+               bm25(libro_fts, {pesos}) AS puntaje
+        FROM libro_fts
+        JOIN libro ON libro.id = libro_fts.rowid
+        WHERE libro_fts MATCH :consulta
+        ORDER BY puntaje
+        LIMIT :limit OFFSET :offset
+    """)
+    return session.exec(sql, params={"consulta": consulta, "limit": limit, "offset": offset}).all()
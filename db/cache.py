@@ -0,0 +1,194 @@
+"""
+cache.py
+--------
+Caché en memoria (LRU con expiración) de las respuestas de detalle de libros y
+autores: `GET /libros/{titulo}` y `GET /autores/{nombre_apellidos}`.
+
+Se guarda la respuesta ya serializada (`jsonable_encoder`), indexada por la
+clave normalizada del libro o del autor. El tamaño está acotado por cantidad de
+entradas y por bytes aproximados (longitud del JSON). Cada escritura que cambia
+un libro o un autor invalida su entrada y las de los autores o libros
+vinculados, porque el detalle de uno incluye datos del otro.
+
+La caché vive en cada proceso: con varios workers cada uno mantiene la suya, y
+una escritura solo invalida las entradas del worker que la atendió. Por eso
+cada entrada guarda además el `ETag` con el que se calculó (las versiones de
+`version_tabla` que `db/condicional.py` ya leyó para la petición, compartidas
+por todos los workers) y solo se sirve mientras coincida con el de la
+petición: una escritura en otro worker cambia las versiones y la entrada se
+vuelve a calcular.
+
+El costo de esa validación es su granularidad: las versiones son por tabla,
+no por fila, así que cualquier escritura del catálogo (también un préstamo o
+una devolución) deja obsoletas todas las entradas de detalle, no solo las
+afectadas. Con escrituras frecuentes la tasa de aciertos baja en consecuencia
+(`GET /cache` la informa); a cambio ningún worker sirve un detalle desactualizado
+sin depender de mensajes entre procesos.
+
+Variables de entorno (opcionales):
+
+    CATALOGO_CACHE_ENTRADAS  máximo de respuestas guardadas (0 la desactiva)
+    CATALOGO_CACHE_MB        memoria aproximada máxima en MiB
+    CATALOGO_CACHE_TTL       segundos de vida de cada entrada
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import select
+
+from db.models import Autor, Libro, LinkAutorLibro
+
+
+class CacheLRU:
+    """Caché LRU acotada por entradas y bytes, con expiración por entrada.
+
+    Es segura entre hilos. Las rutas asíncronas ejecutan los CRUD con
+    `run_sync`, en un greenlet sobre el hilo del event loop, y no compiten
+    entre sí; el candado protege a quien la usa desde otros hilos (rutas `def`
+    en el threadpool de FastAPI, scripts y benchmarks).
+    """
+
+    def __init__(self, max_entradas: int, max_bytes: int, ttl: float):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # clave -> (expira, bytes, valor, version)
+        self._bytes = 0
+        self._generacion = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def obtener_o_calcular(self, clave, calcular: Callable, version: Optional[str] = None):
+        """
+        Devuelve la respuesta guardada para `clave` o la calcula y la guarda.
+
+        Si alguna invalidación ocurre mientras se calcula, el resultado se
+        devuelve pero no se guarda, porque pudo leerse antes de la escritura.
+
+        Args:
+            clave (tuple): Identificador de la respuesta.
+            calcular (Callable): Función sin argumentos que produce la respuesta.
+            version (Optional[str]): Versión de los datos leída antes de
+                calcular (el `ETag` de la petición). Una entrada guardada con
+                otra versión se descarta y se vuelve a calcular.
+
+        Returns:
+            dict: Respuesta serializada.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada and entrada[0] > time.monotonic() and entrada[3] == version:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[2]
+            if entrada:
+                self._quitar(clave)
+            self.fallos += 1
+            generacion = self._generacion
+
+        valor = jsonable_encoder(calcular())
+        tamano = len(json.dumps(valor, ensure_ascii=False, default=str))
+
+        with self._lock:
+            if generacion == self._generacion and 0 < tamano <= self.max_bytes and self.max_entradas:
+                if clave in self._entradas:
+                    self._quitar(clave)
+                self._entradas[clave] = (time.monotonic() + self.ttl, tamano, valor, version)
+                self._bytes += tamano
+                while len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes:
+                    self._quitar(next(iter(self._entradas)))
+        return valor
+
+    def invalidar(self, claves: Iterable):
+        """Elimina las entradas indicadas, existan o no."""
+        with self._lock:
+            self._generacion += 1
+            for clave in claves:
+                if clave in self._entradas:
+                    self._quitar(clave)
+                    self.invalidaciones += 1
+
+    def limpiar(self):
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._generacion += 1
+            self._entradas.clear()
+            self._bytes = 0
+            self.aciertos = self.fallos = self.invalidaciones = 0
+
+    def estadisticas(self) -> dict:
+        """Contadores de aciertos, fallos e invalidaciones y ocupación actual."""
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+                "invalidaciones": self.invalidaciones,
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+            }
+
+    def _quitar(self, clave):
+        _, tamano, _, _ = self._entradas.pop(clave)
+        self._bytes -= tamano
+
+
+detalles = CacheLRU(
+    max_entradas=int(os.getenv("CATALOGO_CACHE_ENTRADAS", 1024)),
+    max_bytes=int(float(os.getenv("CATALOGO_CACHE_MB", 16)) * 1024 * 1024),
+    ttl=float(os.getenv("CATALOGO_CACHE_TTL", 300)),
+)
+
+
+def clave_libro(clave_titulo: str) -> tuple:
+    return ("libro", clave_titulo)
+
+
+def clave_autor(clave_nombre: str) -> tuple:
+    return ("autor", clave_nombre)
+
+
+def invalidar(libros: Iterable[str] = (), autores: Iterable[str] = ()):
+    """
+    Invalida el detalle de los libros y autores indicados.
+
+    Args:
+        libros (Iterable[str]): Claves normalizadas de títulos.
+        autores (Iterable[str]): Claves normalizadas de nombres.
+    """
+    detalles.invalidar(
+        [clave_libro(c) for c in libros] + [clave_autor(c) for c in autores]
+    )
+
+
+def vinculados(session, condicion) -> tuple[set[str], set[str]]:
+    """
+    Claves de los libros y autores del catálogo unidos por los vínculos que
+    cumplen `condicion`.
+
+    Args:
+        session (Session): Sesión activa.
+        condicion (ColumnElement): Filtro sobre `LinkAutorLibro`, `Libro` o `Autor`.
+
+    Returns:
+        tuple[set[str], set[str]]: Claves de títulos y claves de nombres.
+    """
+    filas = session.exec(
+        select(Libro.clave_titulo, Autor.clave_nombre)
+        .select_from(LinkAutorLibro)
+        .join(Libro, Libro.id == LinkAutorLibro.id_libros)
+        .join(Autor, Autor.id == LinkAutorLibro.id_autor)
+        .where(condicion)
+    ).all()
+    return {fila.clave_titulo for fila in filas}, {fila.clave_nombre for fila in filas}
@@ -0,0 +1,237 @@
+"""
+cambios.py
+----------
+Registro ordenado de cambios (change data capture) para sincronizar sistemas
+externos sin volver a descargar los listados.
+
+Cada inserción, actualización o eliminación en las tablas del catálogo y del
+depósito agrega un evento a la tabla `cambio` mediante triggers de SQLite,
+dentro de la misma transacción de la escritura (igual que `db/versiones.py`):
+los CRUD individuales, en lote y las operaciones por conjuntos de
+`db/deposito.py` quedan registrados sin código adicional.
+
+Cada evento tiene un `id` creciente (AUTOINCREMENT, nunca se reutiliza), la
+tabla, la operación, el id de la fila y su clave natural (ISBN, nombre del
+autor o, en los vínculos, el id del autor). Los consumidores leen
+`GET /cambios?after=<id>` y guardan el último id recibido.
+
+Para que el registro no crezca sin límite, `mantener` se ejecuta
+periódicamente y:
+
+- compacta los eventos anteriores a `COMPACTACION` segundos, dejando solo el
+  último de cada fila (un consumidor atrasado igual llega al estado final);
+- purga los anteriores a `RETENCION` segundos y guarda hasta qué id se purgó.
+  Un consumidor con un cursor anterior recibe `410 Gone` y debe volver a
+  sincronizar desde una exportación completa.
+
+Variables de entorno (opcionales):
+
+    CATALOGO_CAMBIOS_RETENCION    segundos que se conservan los eventos (7 días)
+    CATALOGO_CAMBIOS_COMPACTACION antigüedad en segundos a partir de la cual se compactan (1 hora)
+    CATALOGO_CAMBIOS_INTERVALO    segundos entre dos mantenimientos (5 min)
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import column, select, table, text
+
+from db.paginacion import paginar, LIMITE_POR_DEFECTO
+
+RETENCION = float(os.getenv("CATALOGO_CAMBIOS_RETENCION", 7 * 24 * 3600))
+COMPACTACION = float(os.getenv("CATALOGO_CAMBIOS_COMPACTACION", 3600))
+INTERVALO = float(os.getenv("CATALOGO_CAMBIOS_INTERVALO", 300))
+
+logger = logging.getLogger(__name__)
+
+cambio = table(
+    "cambio",
+    column("id"), column("tabla"), column("operacion"), column("id_fila"), column("clave"), column("momento"),
+)
+
+_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS cambio (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tabla TEXT NOT NULL,
+        operacion TEXT NOT NULL,
+        id_fila INTEGER NOT NULL,
+        clave TEXT,
+        momento TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cambio_estado (
+        clave TEXT PRIMARY KEY,
+        valor INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+]
+
+# Tabla -> (columna con el id de la fila, expresión de la clave natural).
+_TABLAS = {
+    "autor": ("id", "{fila}.nombre_apellidos"),
+    "libro": ("id", "{fila}.ISBN"),
+    "linkautorlibro": ("id_libros", "CAST({fila}.id_autor AS TEXT)"),
+    "depositoautores": ("id", "{fila}.nombre_apellidos"),
+    "depositolibro": ("id", "{fila}.ISBN"),
+    "linkautorlibrodeposito": ("id_libro_deposito", "CAST({fila}.id_autor_deposito AS TEXT)"),
+}
+
+_EVENTOS = {
+    "ai": ("INSERT", "insercion", "new"),
+    "au": ("UPDATE", "actualizacion", "new"),
+    "ad": ("DELETE", "eliminacion", "old"),
+}
+
+_DDL_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS cambio_{tabla}_{sufijo} AFTER {evento} ON {tabla} BEGIN
+        INSERT INTO cambio (tabla, operacion, id_fila, clave)
+        VALUES ('{tabla}', '{operacion}', {fila}.{columna_id}, {clave});
+    END
+"""
+
+
+def crear_registro_cambios(conexion):
+    """
+    Crea las tablas del registro de cambios y sus triggers si no existen.
+
+    Args:
+        conexion (Connection): Conexión dentro de una transacción abierta.
+    """
+    for ddl in _DDL:
+        conexion.execute(text(ddl))
+    for tabla, (columna_id, clave) in _TABLAS.items():
+        for sufijo, (evento, operacion, fila) in _EVENTOS.items():
+            conexion.execute(text(_DDL_TRIGGER.format(
+                tabla=tabla, sufijo=sufijo, evento=evento, operacion=operacion,
+                fila=fila, columna_id=columna_id, clave=clave.format(fila=fila),
+            )))
+
+
+def leer_estado(session) -> dict:
+    """
+    Lee hasta qué id se purgó el registro (`purgado`) y el último id asignado (`ultimo`).
+
+    Args:
+        session (Session): Sesión activa.
+
+    Returns:
+        dict: Las claves presentes; faltan mientras no haya purgas o eventos.
+    """
+    return dict(session.exec(text(
+        "SELECT 'purgado', valor FROM cambio_estado WHERE clave = 'purgado_hasta' "
+        "UNION ALL SELECT 'ultimo', seq FROM sqlite_sequence WHERE name = 'cambio'"
+    )).all())
+
+
+def verificar_cursor(estado: dict, after: Optional[int]):
+    """
+    Comprueba que los eventos posteriores al cursor se conservan.
+
+    Args:
+        estado (dict): Resultado de `leer_estado`.
+        after (Optional[int]): Último id recibido por el consumidor.
+
+    Raises:
+        HTTPException: 410 si los eventos posteriores a `after` ya se purgaron.
+    """
+    if after is not None and after < estado.get("purgado", 0):
+        raise HTTPException(
+            status_code=410,
+            detail=(
+                f"Los cambios hasta el {estado['purgado']} ya se purgaron; "
+                "vuelva a sincronizar desde /libros/export y /autores/export"
+            ),
+        )
+
+
+def ver_cambios(session, limit: int = LIMITE_POR_DEFECTO, after: Optional[int] = None):
+    """
+    Devuelve los eventos posteriores al cursor, en orden.
+
+    Args:
+        session (Session): Sesión activa.
+        limit (int): Cantidad máxima de eventos.
+        after (Optional[int]): Último id recibido; `None` empieza por el
+            evento más antiguo que se conserva.
+
+    Returns:
+        dict: Eventos (`items`), cursor de la siguiente página (`next_cursor`,
+        `None` si no hay más por ahora) y el id del último evento registrado
+        (`ultimo`), útil para empezar a seguir el registro tras una exportación.
+
+    Raises:
+        HTTPException: 410 si los eventos posteriores a `after` ya se purgaron.
+    """
+    estado = leer_estado(session)
+    verificar_cursor(estado, after)
+
+    pagina = paginar(session, select(*cambio.c), cambio.c.id, limit, after)
+    pagina["ultimo"] = estado.get("ultimo", 0)
+    return pagina
+
+
+def mantener(conexion, retencion: float = RETENCION, compactacion: float = COMPACTACION) -> dict:
+    """
+    Compacta y purga el registro de cambios.
+
+    Args:
+        conexion (Connection): Conexión dentro de una transacción abierta.
+        retencion (float): Segundos que se conservan los eventos.
+        compactacion (float): Antigüedad en segundos a partir de la cual solo
+            se conserva el último evento de cada fila.
+
+    Returns:
+        dict: Eventos eliminados por compactación (`compactados`) y por
+        antigüedad (`purgados`).
+    """
+    def limite(segundos: float) -> str:
+        return conexion.execute(
+            text("SELECT strftime('%Y-%m-%dT%H:%M:%fZ', 'now', :desfase)"), {"desfase": f"-{segundos} seconds"}
+        ).scalar()
+
+    compactados = conexion.execute(text("""
+        DELETE FROM cambio
+        WHERE momento < :limite
+          AND id NOT IN (SELECT MAX(id) FROM cambio GROUP BY tabla, id_fila, clave)
+    """), {"limite": limite(compactacion)}).rowcount
+
+    purgado_hasta = conexion.execute(
+        text("SELECT MAX(id) FROM cambio WHERE momento < :limite"), {"limite": limite(retencion)}
+    ).scalar()
+    purgados = 0
+    if purgado_hasta is not None:
+        purgados = conexion.execute(text("DELETE FROM cambio WHERE id <= :id"), {"id": purgado_hasta}).rowcount
+        conexion.execute(text("""
+            INSERT INTO cambio_estado (clave, valor) VALUES ('purgado_hasta', :id)
+            ON CONFLICT (clave) DO UPDATE SET valor = MAX(valor, excluded.valor)
+        """), {"id": purgado_hasta})
+
+    return {"compactados": compactados, "purgados": purgados}
+
+
+async def mantener_periodicamente(motor, intervalo: float = INTERVALO):
+    """
+    Ejecuta `mantener` cada `intervalo` segundos hasta que se cancele la tarea.
+
+    Los errores de una pasada se registran en el log y no detienen la tarea.
+
+    Args:
+        motor (Engine): Motor síncrono de escritura.
+        intervalo (float): Segundos entre dos mantenimientos.
+    """
+    def una_vez():
+        with motor.begin() as conexion:
+            mantener(conexion)
+
+    while True:
+        try:
+            await asyncio.to_thread(una_vez)
+        except Exception:
+            # Un error puntual (por ejemplo `database is locked` bajo carga de
+            # escritura) no detiene el mantenimiento: se reintenta en el próximo intervalo.
+            logger.exception("Falló el mantenimiento del registro de cambios")
+        await asyncio.sleep(intervalo)
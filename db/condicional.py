@@ -0,0 +1,60 @@
+"""
+condicional.py
+--------------
+GET condicionales (`ETag` / `If-None-Match`) para las rutas de lectura.
+
+`condicional(*tablas)` crea una dependencia que lee las versiones de las
+tablas de las que depende la ruta (ver `db/versiones.py`). Si el cliente envía
+un `If-None-Match` que coincide, responde `304 Not Modified` antes de que se
+ejecute la ruta: no se hace la consulta principal ni se serializa nada. Si no,
+agrega el `ETag` a la respuesta (y lo deja en `request.state.etag`).
+
+La dependencia usa la misma sesión de solo lectura que la ruta, pero pysqlite
+no abre una transacción para los SELECT: la versión y los datos no se leen
+necesariamente de la misma instantánea. Como la versión se lee primero, el
+`ETag` nunca es más nuevo que el cuerpo; si una escritura se cuela entre ambas
+lecturas, el cliente recibe datos nuevos con el `ETag` anterior y, en la
+siguiente petición, el `ETag` ya no coincide y los vuelve a recibir.
+"""
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from db.database import readSessionDep
+from db import versiones
+
+# Respuestas que combinan autores, libros y sus vínculos.
+TABLAS_CATALOGO = ("autor", "libro", "linkautorlibro")
+TABLAS_DEPOSITO = ("depositoautores", "depositolibro", "linkautorlibrodeposito")
+
+
+def _coincide(if_none_match: str, etag: str) -> bool:
+    """Comparación débil de ETag (RFC 9110): se ignora el prefijo `W/`."""
+    if if_none_match.strip() == "*":
+        return True
+    actual = etag.removeprefix("W/")
+    return any(
+        candidato.strip().removeprefix("W/") == actual
+        for candidato in if_none_match.split(",")
+    )
+
+
+def condicional(*tablas: str):
+    """
+    Dependencia de ruta que agrega `ETag` y responde 304 si no hubo cambios.
+
+    Args:
+        *tablas (str): Tablas de las que depende la respuesta de la ruta.
+
+    Returns:
+        Depends: Dependencia para el parámetro `dependencies` del decorador.
+    """
+    async def verificar(request: Request, response: Response, session: readSessionDep):
+        etag = await session.run_sync(lambda sesion: versiones.etag(sesion, tablas))
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _coincide(if_none_match, etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        # Las rutas que devuelven su propio `Response` (exportaciones) lo copian de aquí.
+        request.state.etag = etag
+
+    return Depends(verificar)
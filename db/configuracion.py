@@ -0,0 +1,94 @@
+"""
+configuracion.py
+----------------
+Perfil del motor de base de datos configurable por variables de entorno.
+
+Define la ruta del archivo SQLite, el registro de SQL, el tamaño del pool de
+conexiones y los PRAGMA que se aplican a cada conexión nueva (modo WAL,
+`synchronous`, `mmap_size`, `cache_size` y `busy_timeout`). Si está instalado
+`python-dotenv`, también se leen las variables de un archivo `.env`.
+
+Variables reconocidas (todas opcionales):
+
+    CATALOGO_ENTORNO            desarrollo | produccion (por defecto produccion)
+    CATALOGO_DB_ARCHIVO         ruta del archivo SQLite
+    CATALOGO_SQL_ECHO           true/false; por defecto solo en desarrollo
+    CATALOGO_POOL_SIZE          conexiones permanentes del pool
+    CATALOGO_POOL_MAX_OVERFLOW  conexiones extra permitidas en picos
+    CATALOGO_POOL_TIMEOUT       segundos de espera por una conexión libre
+    CATALOGO_POOL_LECTURA_SIZE  conexiones del pool de solo lectura (rutas GET)
+    CATALOGO_SQLITE_JOURNAL     modo de journal (WAL, DELETE, ...)
+    CATALOGO_SQLITE_SYNCHRONOUS OFF | NORMAL | FULL
+    CATALOGO_SQLITE_MMAP        bytes mapeados en memoria
+    CATALOGO_SQLITE_CACHE_KB    KiB de caché de páginas por conexión
+    CATALOGO_SQLITE_BUSY_MS     milisegundos de espera ante un bloqueo
+"""
+
+import os
+from dataclasses import dataclass
+
+try:
+    from dotenv import load_dotenv
+except ImportError:  # python-dotenv es opcional
+    load_dotenv = None
+
+
+def _booleano(valor: str) -> bool:
+    return valor.strip().lower() in ("1", "true", "si", "sí", "yes", "on")
+
+
+@dataclass(frozen=True)
+class PerfilMotor:
+    """Parámetros del motor SQLite y de su pool de conexiones."""
+    archivo: str = "./databaseCatalogo.db"
+    echo: bool = False
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_lectura_size: int = 20
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size_kb: int = 64 * 1024
+    busy_timeout_ms: int = 5000
+
+    @classmethod
+    def desde_entorno(cls) -> "PerfilMotor":
+        """Construye el perfil a partir de las variables `CATALOGO_*`."""
+        if load_dotenv:
+            load_dotenv()
+
+        entorno = os.getenv("CATALOGO_ENTORNO", "produccion").lower()
+        echo = os.getenv("CATALOGO_SQL_ECHO")
+        return cls(
+            archivo=os.getenv("CATALOGO_DB_ARCHIVO", cls.archivo),
+            echo=_booleano(echo) if echo is not None else entorno == "desarrollo",
+            pool_size=int(os.getenv("CATALOGO_POOL_SIZE", cls.pool_size)),
+            max_overflow=int(os.getenv("CATALOGO_POOL_MAX_OVERFLOW", cls.max_overflow)),
+            pool_timeout=float(os.getenv("CATALOGO_POOL_TIMEOUT", cls.pool_timeout)),
+            pool_lectura_size=int(os.getenv("CATALOGO_POOL_LECTURA_SIZE", cls.pool_lectura_size)),
+            journal_mode=os.getenv("CATALOGO_SQLITE_JOURNAL", cls.journal_mode),
+            synchronous=os.getenv("CATALOGO_SQLITE_SYNCHRONOUS", cls.synchronous),
+            mmap_size=int(os.getenv("CATALOGO_SQLITE_MMAP", cls.mmap_size)),
+            cache_size_kb=int(os.getenv("CATALOGO_SQLITE_CACHE_KB", cls.cache_size_kb)),
+            busy_timeout_ms=int(os.getenv("CATALOGO_SQLITE_BUSY_MS", cls.busy_timeout_ms)),
+        )
+
+    def pragmas(self, solo_lectura: bool = False) -> list[str]:
+        """PRAGMA que se ejecutan al abrir cada conexión.
+
+        Las conexiones de solo lectura no pueden cambiar el modo de journal y
+        no escriben, así que omiten `journal_mode` y `synchronous`.
+        """
+        comunes = [
+            f"PRAGMA mmap_size={self.mmap_size}",
+            # Un valor negativo indica el tamaño en KiB en lugar de en páginas.
+            f"PRAGMA cache_size=-{self.cache_size_kb}",
+            f"PRAGMA busy_timeout={self.busy_timeout_ms}",
+        ]
+        if solo_lectura:
+            return comunes + ["PRAGMA query_only=1"]
+        return [
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+        ] + comunes
@@ -0,0 +1,101 @@
+"""
+consultas.py
+------------
+Herramientas para contar las sentencias SQL que ejecuta cada petición y
+verificar que las rutas respetan su presupuesto de consultas.
+
+Sirve para detectar cargas perezosas (N+1): si una ruta empieza a recorrer
+una relación sin `selectinload`, el número de sentencias crece con los datos
+y supera el presupuesto fijo declarado en `PRESUPUESTOS`. `tests/test_presupuestos.py`
+ejecuta cada entrada contra una base temporal.
+"""
+
+from contextlib import contextmanager
+from sqlalchemy import event
+
+from db.database import engine, async_engine, read_engine, async_read_engine
+
+# Máximo de sentencias por petición exitosa, independiente de la cantidad de filas.
+# Incluye la lectura de versiones para el ETag (ver `db/condicional.py`).
+PRESUPUESTOS = {
+    ("GET", "/autores/{nombre_apellidos}"): 3,
+    ("GET", "/autores/id/{id_autor}"): 3,
+    ("GET", "/autores/deposito/buscar/{nombre_apellidos}"): 3,
+    ("GET", "/libros/{titulo}"): 3,
+    ("GET", "/libros/deposito/{titulo}"): 3,
+    # Con `sort` sobre un campo que admite NULL, la página puede cruzar del tramo
+    # con valores al tramo NULL (ver `db/paginacion.py`): una sentencia más.
+    # Con `count=true`, una más para el total (contador mantenido o COUNT(*)).
+    ("GET", "/autores/"): 3,
+    ("GET", "/libros/"): 4,
+    ("GET", "/autores/deposito/"): 3,
+    ("GET", "/libros/deposito/"): 3,
+    # HEAD de los listados: versiones para el ETag y el total, sin leer filas.
+    ("HEAD", "/autores/"): 2,
+    ("HEAD", "/libros/"): 2,
+    ("HEAD", "/autores/deposito/"): 2,
+    ("HEAD", "/libros/deposito/"): 2,
+    ("GET", "/estadisticas"): 2,
+    ("GET", "/cambios"): 3,
+    # Consultas en bloque: un IN y una carga de la relación, sin importar cuántas claves.
+    ("POST", "/autores/lookup"): 2,
+    ("POST", "/libros/lookup"): 2,
+    # Préstamo y devolución: un único UPDATE condicional, sin SELECT previo.
+    ("POST", "/libros/{isbn}/prestar"): 1,
+    ("POST", "/libros/{isbn}/devolver"): 1,
+}
+
+
+@contextmanager
+def contar_consultas(motores=(engine, async_engine.sync_engine, read_engine, async_read_engine.sync_engine)):
+    """
+    Registra las sentencias ejecutadas sobre los motores mientras dura el bloque.
+
+    Args:
+        motores (tuple[Engine]): Motores a observar. Por defecto todos los de
+            la aplicación (escritura y solo lectura, síncronos y asíncronos).
+
+    Yields:
+        list[str]: Lista que se va llenando con el SQL de cada sentencia.
+    """
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    for motor in motores:
+        event.listen(motor, "before_cursor_execute", registrar)
+    try:
+        yield sentencias
+    finally:
+        for motor in motores:
+            event.remove(motor, "before_cursor_execute", registrar)
+
+
+def verificar_presupuesto(cliente, metodo: str, ruta: str, url: str, **kwargs):
+    """
+    Ejecuta una petición y falla si supera el presupuesto de su ruta.
+
+    Args:
+        cliente (TestClient): Cliente de pruebas de la aplicación.
+        metodo (str): Método HTTP.
+        ruta (str): Plantilla de la ruta, clave en `PRESUPUESTOS`.
+        url (str): URL concreta a solicitar.
+        **kwargs: Argumentos adicionales para `cliente.request`.
+
+    Returns:
+        Response: Respuesta obtenida.
+
+    Raises:
+        AssertionError: Si la petición ejecutó más sentencias de las permitidas.
+    """
+    maximo = PRESUPUESTOS[(metodo, ruta)]
+    with contar_consultas() as sentencias:
+        respuesta = cliente.request(metodo, url, **kwargs)
+
+    if len(sentencias) > maximo:
+        detalle = "\n".join(f"  {i + 1}. {sql}" for i, sql in enumerate(sentencias))
+        raise AssertionError(
+            f"{metodo} {url} ejecutó {len(sentencias)} sentencias (presupuesto {maximo}):\n{detalle}"
+        )
+    return respuesta
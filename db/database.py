@@ -1,20 +1,121 @@
+import inspect
+from functools import wraps
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
 from typing import Annotated
 from fastapi import Depends
+import db.models  # noqa: F401  registra las tablas en SQLModel.metadata
+from db.busqueda import crear_indice_busqueda
+from db.migraciones import migrar
+from db.versiones import crear_contadores
+from db.estadisticas import crear_estadisticas
+from db.cambios import crear_registro_cambios
+from db.configuracion import PerfilMotor
+from db.metricas import instrumentar_motor
 
-url_database = "sqlite:///./databaseCatalogo.db"
+perfil = PerfilMotor.desde_entorno()
 
-engine = create_engine(
-    url_database,
-    echo=True,
-    connect_args={"check_same_thread": False}
-)
+
+def crear_motor(perfil: PerfilMotor, asincrono: bool = False, solo_lectura: bool = False):
+    """Crea un motor (síncrono o aiosqlite) configurado según el perfil.
+
+    Los PRAGMA del perfil se aplican en el evento `connect`, es decir, una vez
+    por cada conexión física que abre el pool. Con `solo_lectura` el archivo se
+    abre con la URI `mode=ro` de SQLite y el pool usa su propio tamaño, de modo
+    que las lecturas nunca compiten con las escrituras por una conexión.
+    """
+    if solo_lectura:
+        url = f"file:{perfil.archivo}?mode=ro&uri=true"
+        pool_size = perfil.pool_lectura_size
+    else:
+        url = perfil.archivo
+        pool_size = perfil.pool_size
+
+    opciones = dict(
+        echo=perfil.echo,
+        pool_size=pool_size,
+        max_overflow=perfil.max_overflow,
+        pool_timeout=perfil.pool_timeout,
+    )
+    if asincrono:
+        motor = create_async_engine(f"sqlite+aiosqlite:///{url}", **opciones)
+        motor_sincrono = motor.sync_engine
+    else:
+        motor = motor_sincrono = create_engine(
+            f"sqlite:///{url}",
+            connect_args={"check_same_thread": False},
+            **opciones
+        )
+
+    @event.listens_for(motor_sincrono, "connect")
+    def aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in perfil.pragmas(solo_lectura):
+            cursor.execute(pragma)
+        cursor.close()
+
+    instrumentar_motor(motor_sincrono)
+    return motor
+
+
+engine = crear_motor(perfil)
+
+# Motor asíncrono usado por las rutas: las consultas se ejecutan en el hilo de
+# aiosqlite y la petición no ocupa un hilo del threadpool de Starlette mientras espera.
+async_engine = crear_motor(perfil, asincrono=True)
+
+# Motores de solo lectura (mode=ro) para las rutas GET, con su propio pool.
+read_engine = crear_motor(perfil, solo_lectura=True)
+async_read_engine = crear_motor(perfil, asincrono=True, solo_lectura=True)
 
 def create_database():
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as conexion:
+        migrar(conexion)
+        crear_indice_busqueda(conexion)
+        crear_contadores(conexion)
+        crear_estadisticas(conexion)
+        crear_registro_cambios(conexion)
 
 def get_session():
     with Session(engine) as session:
         yield session
 
-sessionDep = Annotated[Session, Depends(get_session)]
\ No newline at end of file
+async def get_async_session():
+    # expire_on_commit=False: las respuestas se serializan fuera de la sesión y
+    # no deben disparar recargas perezosas después del commit.
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+async def get_read_session():
+    async with AsyncSession(async_read_engine, expire_on_commit=False) as session:
+        yield session
+
+sessionDep = Annotated[Session, Depends(get_session)]
+asyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+readSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+
+
+def version_asincrona(funcion):
+    """Crea la versión asíncrona de una función CRUD que recibe `session`.
+
+    La función original se ejecuta con `AsyncSession.run_sync`: recibe una
+    sesión síncrona enlazada a la conexión aiosqlite y cada consulta cede el
+    control al event loop mientras espera, en lugar de bloquear un hilo.
+    """
+    firma = inspect.signature(funcion)
+
+    @wraps(funcion)
+    async def asincrona(*args, **kwargs):
+        argumentos = firma.bind(*args, **kwargs)
+        session = argumentos.arguments["session"]
+
+        def ejecutar(sesion_sincrona):
+            argumentos.arguments["session"] = sesion_sincrona
+            return funcion(*argumentos.args, **argumentos.kwargs)
+
+        return await session.run_sync(ejecutar)
+
+    return asincrona
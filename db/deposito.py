@@ -0,0 +1,230 @@
+"""
+deposito.py
+-----------
+Operaciones por conjuntos para trasladar autores y libros entre el catálogo y
+el depósito, en ambos sentidos.
+
+Cada función emite una sola sentencia `INSERT ... SELECT` o `DELETE` que
+procesa todas las filas afectadas, sin cargarlas en Python. Ninguna confirma
+la transacción: quien las usa las combina y hace un único `commit()`, de modo
+que el traslado completo es atómico.
+"""
+
+from datetime import datetime, UTC
+from sqlalchemy import delete, exists, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import select
+
+from db.models import (
+    Autor, Libro,
+    DepositoAutores, DepositoLibro,
+    LinkAutorLibro, LinkAutorLibroDeposito
+)
+
+
+def _copiar(session, origen, destino, condicion, clave: str, id_original: str):
+    """
+    Copia a `destino` las filas de `origen` que cumplen `condicion`.
+
+    Las columnas con el mismo nombre se copian tal cual (incluida la clave
+    normalizada), el id de origen se guarda en `id_original` y las filas cuya
+    clave ya existe en el destino se omiten.
+    """
+    tabla_destino = destino.__table__
+    columnas = [
+        c.name for c in origen.__table__.columns
+        if c.name != "id" and c.name in tabla_destino.columns
+    ]
+    consulta = select(
+        *[origen.__table__.c[nombre] for nombre in columnas],
+        origen.id,
+        literal(datetime.now(UTC)),
+    ).where(condicion)
+
+    sentencia = (
+        sqlite_insert(tabla_destino)
+        .from_select(columnas + [id_original, "timestamp"], consulta)
+        .on_conflict_do_nothing(index_elements=[tabla_destino.c[clave]])
+    )
+    session.exec(sentencia)
+
+
+def copiar_autores_a_deposito(session, condicion):
+    """
+    Copia al depósito los autores del catálogo que cumplen `condicion`.
+
+    Args:
+        session (Session): Sesión activa.
+        condicion (ColumnElement): Filtro sobre `Autor`.
+    """
+    _copiar(session, Autor, DepositoAutores, condicion, "clave_nombre", "id_autor_original")
+
+
+def copiar_libros_a_deposito(session, condicion):
+    """
+    Copia al depósito los libros del catálogo que cumplen `condicion`.
+
+    Args:
+        session (Session): Sesión activa.
+        condicion (ColumnElement): Filtro sobre `Libro`.
+    """
+    _copiar(session, Libro, DepositoLibro, condicion, "clave_titulo", "id_libro_original")
+
+
+def vincular_en_deposito(session, condicion):
+    """
+    Replica en `LinkAutorLibroDeposito` los vínculos del catálogo que cumplen
+    `condicion`, enlazando las copias del depósito de cada libro y autor.
+
+    Args:
+        session (Session): Sesión activa.
+        condicion (ColumnElement): Filtro sobre `LinkAutorLibro`.
+    """
+    consulta = (
+        select(DepositoLibro.id, DepositoAutores.id, literal(datetime.now(UTC)))
+        .select_from(LinkAutorLibro)
+        .join(Libro, Libro.id == LinkAutorLibro.id_libros)
+        .join(DepositoLibro, DepositoLibro.clave_titulo == Libro.clave_titulo)
+        .join(Autor, Autor.id == LinkAutorLibro.id_autor)
+        .join(DepositoAutores, DepositoAutores.clave_nombre == Autor.clave_nombre)
+        .where(condicion)
+    )
+    sentencia = (
+        sqlite_insert(LinkAutorLibroDeposito.__table__)
+        .from_select(["id_libro_deposito", "id_autor_deposito", "timestamp"], consulta)
+        .on_conflict_do_nothing()
+    )
+    session.exec(sentencia)
+
+
+def eliminar_del_catalogo(session, modelo, condicion_vinculos, condicion):
+    """
+    Elimina del catálogo las filas de `modelo` y sus vínculos.
+
+    Args:
+        session (Session): Sesión activa.
+        modelo (SQLModel): `Autor` o `Libro`.
+        condicion_vinculos (ColumnElement): Filtro sobre `LinkAutorLibro`.
+        condicion (ColumnElement): Filtro sobre `modelo`.
+    """
+    session.exec(delete(LinkAutorLibro).where(condicion_vinculos))
+    session.exec(delete(modelo).where(condicion))
+
+
+def _restaurar(session, origen, destino, condicion):
+    """
+    Copia al catálogo (`destino`) las filas del depósito (`origen`) que cumplen
+    `condicion`. Las que chocan con cualquier restricción única del catálogo
+    (ISBN, título o nombre ya registrados) se omiten.
+    """
+    tabla_destino = destino.__table__
+    columnas = [
+        c.name for c in tabla_destino.columns
+        if c.name != "id" and c.name in origen.__table__.columns
+    ]
+    consulta = select(*[origen.__table__.c[nombre] for nombre in columnas]).where(condicion)
+    sentencia = (
+        sqlite_insert(tabla_destino)
+        .from_select(columnas, consulta)
+        .on_conflict_do_nothing()
+    )
+    session.exec(sentencia)
+
+
+def restaurar_autores(session, condicion):
+    """
+    Copia al catálogo los autores del depósito que cumplen `condicion`.
+
+    Args:
+        session (Session): Sesión activa.
+        condicion (ColumnElement): Filtro sobre `DepositoAutores`.
+    """
+    _restaurar(session, DepositoAutores, Autor, condicion)
+
+
+def restaurar_libros(session, condicion):
+    """
+    Copia al catálogo los libros del depósito que cumplen `condicion`.
+
+    Args:
+        session (Session): Sesión activa.
+        condicion (ColumnElement): Filtro sobre `DepositoLibro`.
+    """
+    _restaurar(session, DepositoLibro, Libro, condicion)
+
+
+def vincular_en_catalogo(session, condicion):
+    """
+    Replica en `LinkAutorLibro` los vínculos del depósito que cumplen
+    `condicion`, traduciendo cada copia del depósito a la fila del catálogo
+    correspondiente (libros por ISBN, autores por clave normalizada).
+
+    Args:
+        session (Session): Sesión activa.
+        condicion (ColumnElement): Filtro sobre `LinkAutorLibroDeposito`.
+    """
+    consulta = (
+        select(Libro.id, Autor.id)
+        .select_from(LinkAutorLibroDeposito)
+        .join(DepositoLibro, DepositoLibro.id == LinkAutorLibroDeposito.id_libro_deposito)
+        .join(Libro, Libro.ISBN == DepositoLibro.ISBN)
+        .join(DepositoAutores, DepositoAutores.id == LinkAutorLibroDeposito.id_autor_deposito)
+        .join(Autor, Autor.clave_nombre == DepositoAutores.clave_nombre)
+        .where(condicion)
+    )
+    sentencia = (
+        sqlite_insert(LinkAutorLibro.__table__)
+        .from_select(["id_libros", "id_autor"], consulta)
+        .on_conflict_do_nothing()
+    )
+    session.exec(sentencia)
+
+
+def eliminar_del_deposito(session, modelo, condicion_vinculos, condicion):
+    """
+    Elimina del depósito las filas de `modelo` y sus vínculos.
+
+    Args:
+        session (Session): Sesión activa.
+        modelo (SQLModel): `DepositoAutores` o `DepositoLibro`.
+        condicion_vinculos (ColumnElement): Filtro sobre `LinkAutorLibroDeposito`.
+        condicion (ColumnElement): Filtro sobre `modelo`.
+    """
+    session.exec(delete(LinkAutorLibroDeposito).where(condicion_vinculos))
+    session.exec(delete(modelo).where(condicion))
+
+
+def limpiar_libros_huerfanos(session, ids):
+    """
+    Elimina del depósito, entre los libros indicados, los que ya están de
+    nuevo en el catálogo y no conservan ningún vínculo en el depósito.
+
+    Args:
+        session (Session): Sesión activa.
+        ids (list[int]): Ids de `DepositoLibro` a revisar.
+    """
+    session.exec(
+        delete(DepositoLibro).where(
+            DepositoLibro.id.in_(ids),
+            exists().where(Libro.ISBN == DepositoLibro.ISBN),
+            ~exists().where(LinkAutorLibroDeposito.id_libro_deposito == DepositoLibro.id),
+        )
+    )
+
+
+def limpiar_autores_huerfanos(session, ids):
+    """
+    Elimina del depósito, entre los autores indicados, los que ya están de
+    nuevo en el catálogo y no conservan ningún vínculo en el depósito.
+
+    Args:
+        session (Session): Sesión activa.
+        ids (list[int]): Ids de `DepositoAutores` a revisar.
+    """
+    session.exec(
+        delete(DepositoAutores).where(
+            DepositoAutores.id.in_(ids),
+            exists().where(Autor.clave_nombre == DepositoAutores.clave_nombre),
+            ~exists().where(LinkAutorLibroDeposito.id_autor_deposito == DepositoAutores.id),
+        )
+    )
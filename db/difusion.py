@@ -0,0 +1,389 @@
+"""
+difusion.py
+-----------
+Difusión en vivo de los cambios del catálogo (`/stream`, por SSE o WebSocket).
+
+La fuente de eventos es el registro de `db/cambios.py`: los triggers ya
+anotan cada escritura (individual, en lote o por conjuntos desde
+`db/deposito.py`) dentro de su transacción, así que los CRUD no publican nada
+y ninguna escritura espera a un suscriptor. Una única tarea por proceso
+(`Difusor.ejecutar`) lee los eventos nuevos cada `INTERVALO` segundos mientras
+haya suscriptores, les agrega los datos que necesitan las pantallas (título,
+copias disponibles, autores) y los reparte en memoria:
+
+- cada suscriptor tiene su propia cola con como máximo `COLA` eventos; repartir
+  es un `put_nowait`, nunca una espera;
+- si la cola de un suscriptor está llena, se lo descarta: recibe los eventos
+  que ya tenía y la conexión se cierra. Al reconectar con `Last-Event-ID` (o
+  `after`) recupera lo perdido desde el registro, sin huecos;
+- un suscriptor inactivo solo ocupa su cola vacía y un latido cada `LATIDO`
+  segundos; sin suscriptores, la tarea no consulta la base.
+
+Los eventos de los vínculos autor-libro no se difunden (siguen en
+`GET /cambios`): los de libro ya incluyen sus autores.
+
+Variables de entorno (opcionales):
+
+    CATALOGO_STREAM_INTERVALO   segundos entre dos lecturas del registro (0.25)
+    CATALOGO_STREAM_COLA        eventos pendientes por suscriptor antes de descartarlo (100)
+    CATALOGO_STREAM_LATIDO      segundos sin eventos tras los que se envía un latido (15)
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Annotated, AsyncIterator, Iterable, List, Optional
+from fastapi import Query
+from sqlalchemy import select
+from sqlmodel import Session
+
+from db import cambios
+from db.database import read_engine
+from db.models import Autor, Libro, LinkAutorLibro, DepositoAutores, DepositoLibro, LinkAutorLibroDeposito
+from db.normalizacion import normalizar
+
+INTERVALO = float(os.getenv("CATALOGO_STREAM_INTERVALO", 0.25))
+COLA = int(os.getenv("CATALOGO_STREAM_COLA", 100))
+LATIDO = float(os.getenv("CATALOGO_STREAM_LATIDO", 15))
+
+LOTE = 1000
+
+# Espera máxima entre reintentos cuando la lectura del registro falla.
+ESPERA_MAXIMA = 30.0
+
+logger = logging.getLogger(__name__)
+
+# Tablas difundidas -> (campo del evento con la clave natural y, para los libros,
+# modelo, vínculo, columnas del libro y del autor en el vínculo y modelo de autor).
+_TABLAS = {
+    "libro": ("isbn", Libro, LinkAutorLibro, "id_libros", "id_autor", Autor),
+    "depositolibro": ("isbn", DepositoLibro, LinkAutorLibroDeposito,
+                      "id_libro_deposito", "id_autor_deposito", DepositoAutores),
+    "autor": ("autor", None, None, None, None, None),
+    "depositoautores": ("autor", None, None, None, None, None),
+}
+
+isbnStreamQuery = Annotated[List[str], Query(alias="isbn", description="ISBN a seguir (repetible)")]
+autorStreamQuery = Annotated[List[str], Query(alias="autor", description="Autor a seguir, incluidos sus libros (repetible)")]
+tipoStreamQuery = Annotated[
+    List[str],
+    Query(alias="tipo", description="Tipo de evento (`libro.actualizacion`) o tabla (`depositolibro`) (repetible)"),
+]
+
+# Marca que se encola al descartar a un suscriptor lento.
+DESCARTADO = object()
+
+
+@dataclass(frozen=True)
+class Filtro:
+    """
+    Criterios de un suscriptor. Dentro de cada criterio basta con que coincida
+    un valor; entre criterios deben coincidir todos. Un criterio vacío no filtra.
+
+    Attributes:
+        isbn (frozenset[str]): ISBN de los libros.
+        autores (frozenset[str]): Nombres de autor normalizados; coinciden con
+            los eventos del autor y con los de sus libros.
+        tipos (tuple[str, ...]): Tipos (`libro.actualizacion`) o tablas
+            (`libro`, que abarca todas sus operaciones).
+    """
+    isbn: frozenset = frozenset()
+    autores: frozenset = frozenset()
+    tipos: tuple = ()
+
+    @classmethod
+    def crear(cls, isbn: Iterable[str] = (), autores: Iterable[str] = (), tipos: Iterable[str] = ()) -> "Filtro":
+        return cls(frozenset(isbn), frozenset(normalizar(a) for a in autores), tuple(tipos))
+
+    def coincide(self, evento: dict, claves_autores: frozenset) -> bool:
+        if self.isbn and evento.get("isbn") not in self.isbn:
+            return False
+        if self.autores and self.autores.isdisjoint(claves_autores):
+            return False
+        if self.tipos and not any(
+            evento["tipo"] == tipo or evento["tabla"] == tipo for tipo in self.tipos
+        ):
+            return False
+        return True
+
+
+@dataclass(eq=False)
+class Suscriptor:
+    """Cola de eventos pendientes de un cliente conectado."""
+    filtro: Filtro
+    cola: asyncio.Queue = field(default_factory=asyncio.Queue)
+    descartado: bool = False
+
+
+def leer_eventos(motor, after: int, limite: int = LOTE) -> tuple[list[tuple[dict, frozenset]], int]:
+    """
+    Lee los eventos posteriores a `after` y les agrega los datos actuales de cada fila.
+
+    Args:
+        motor (Engine): Motor síncrono (de solo lectura).
+        after (int): Último id ya leído.
+        limite (int): Cantidad máxima de filas del registro a leer.
+
+    Returns:
+        tuple: Lista de pares (evento, nombres de autor normalizados) y el
+        último id leído (igual a `after` si no hubo eventos nuevos). El id
+        avanza también sobre los eventos que no se difunden.
+    """
+    with Session(motor) as session:
+        filas = session.execute(
+            select(*cambios.cambio.c).where(cambios.cambio.c.id > after).order_by(cambios.cambio.c.id).limit(limite)
+        ).mappings().all()
+        if not filas:
+            return [], after
+
+        # Una consulta por tabla para los datos actuales de las filas que siguen existiendo.
+        actuales: dict[tuple[str, int], dict] = {}
+        for tabla, (_, modelo, vinculo, col_libro, col_autor, modelo_autor) in _TABLAS.items():
+            if modelo is None:
+                continue
+            ids = {f["id_fila"] for f in filas if f["tabla"] == tabla and f["operacion"] != "eliminacion"}
+            if not ids:
+                continue
+            columnas = [modelo.id, modelo.titulo]
+            if hasattr(modelo, "copias_disponibles"):
+                columnas.append(modelo.copias_disponibles)
+            for fila in session.execute(select(*columnas).where(modelo.id.in_(ids))).mappings():
+                datos = {columna: valor for columna, valor in fila.items() if columna != "id"}
+                actuales[(tabla, fila["id"])] = {**datos, "autores": []}
+            for id_fila, nombre in session.execute(
+                select(getattr(vinculo, col_libro), modelo_autor.nombre_apellidos)
+                .join(modelo_autor, modelo_autor.id == getattr(vinculo, col_autor))
+                .where(getattr(vinculo, col_libro).in_(ids))
+            ):
+                if (tabla, id_fila) in actuales:
+                    actuales[(tabla, id_fila)]["autores"].append(nombre)
+
+        # Los libros que ya no están en el catálogo se buscan en el depósito, para
+        # que sus eventos (incluido el de eliminación) sigan llevando título y autores.
+        faltantes = {f["id_fila"] for f in filas if f["tabla"] == "libro"} - {i for t, i in actuales if t == "libro"}
+        if faltantes:
+            for id_original, titulo, nombre in session.execute(
+                select(DepositoLibro.id_libro_original, DepositoLibro.titulo, DepositoAutores.nombre_apellidos)
+                .outerjoin(LinkAutorLibroDeposito, LinkAutorLibroDeposito.id_libro_deposito == DepositoLibro.id)
+                .outerjoin(DepositoAutores, DepositoAutores.id == LinkAutorLibroDeposito.id_autor_deposito)
+                .where(DepositoLibro.id_libro_original.in_(faltantes))
+            ):
+                datos = actuales.setdefault(("libro", id_original), {"titulo": titulo, "autores": []})
+                if nombre is not None:
+                    datos["autores"].append(nombre)
+
+    eventos = []
+    for f in filas:
+        if f["tabla"] not in _TABLAS:
+            continue
+        campo_clave = _TABLAS[f["tabla"]][0]
+        evento = {
+            "id": f["id"],
+            "tipo": f"{f['tabla']}.{f['operacion']}",
+            "tabla": f["tabla"],
+            "operacion": f["operacion"],
+            "id_fila": f["id_fila"],
+            campo_clave: f["clave"],
+            "momento": f["momento"],
+        }
+        evento.update(actuales.get((f["tabla"], f["id_fila"]), {}))
+        nombres = evento.get("autores", [f["clave"]] if campo_clave == "autor" else [])
+        eventos.append((evento, frozenset(normalizar(n) for n in nombres if n)))
+    return eventos, filas[-1]["id"]
+
+
+class Difusor:
+    """
+    Reparte los eventos del registro de cambios entre los suscriptores del proceso.
+
+    Args:
+        motor (Engine): Motor síncrono desde el que se lee el registro.
+        intervalo (float): Segundos entre dos lecturas mientras haya suscriptores.
+        maximo_cola (int): Eventos pendientes por suscriptor antes de descartarlo.
+    """
+
+    def __init__(self, motor, intervalo: float = INTERVALO, maximo_cola: int = COLA):
+        self.motor = motor
+        self.intervalo = intervalo
+        self.maximo_cola = maximo_cola
+        self.suscriptores: set[Suscriptor] = set()
+        # Índices por ISBN y por autor: repartir un evento solo recorre los
+        # suscriptores que pueden coincidir, no todos los conectados.
+        self._por_isbn: dict[str, set[Suscriptor]] = defaultdict(set)
+        self._por_autor: dict[str, set[Suscriptor]] = defaultdict(set)
+        self._sin_indice: set[Suscriptor] = set()
+        # Último id repartido; `None` mientras no hay suscriptores (se resincroniza al llegar uno).
+        self.ultimo: Optional[int] = None
+        self.descartados = 0
+        self._hay_suscriptores = asyncio.Event()
+        self._candado = asyncio.Lock()
+
+    def _indices(self, filtro: Filtro) -> list[set]:
+        if filtro.isbn:
+            return [self._por_isbn[isbn] for isbn in filtro.isbn]
+        if filtro.autores:
+            return [self._por_autor[autor] for autor in filtro.autores]
+        return [self._sin_indice]
+
+    def _ultimo_id(self) -> int:
+        with Session(self.motor) as session:
+            return cambios.leer_estado(session).get("ultimo", 0)
+
+    async def suscribir(self, filtro: Filtro) -> Suscriptor:
+        """
+        Registra un suscriptor que recibirá los eventos posteriores a este momento.
+
+        Args:
+            filtro (Filtro): Criterios del suscriptor.
+
+        Returns:
+            Suscriptor: Suscriptor con su cola; debe liberarse con `cancelar`.
+        """
+        async with self._candado:
+            if self.ultimo is None:
+                self.ultimo = await asyncio.to_thread(self._ultimo_id)
+            suscriptor = Suscriptor(filtro)
+            self.suscriptores.add(suscriptor)
+            for indice in self._indices(filtro):
+                indice.add(suscriptor)
+            self._hay_suscriptores.set()
+        return suscriptor
+
+    def cancelar(self, suscriptor: Suscriptor):
+        self.suscriptores.discard(suscriptor)
+        for indice in self._indices(suscriptor.filtro):
+            indice.discard(suscriptor)
+        for indice in (self._por_isbn, self._por_autor):
+            for clave in suscriptor.filtro.isbn | suscriptor.filtro.autores:
+                if clave in indice and not indice[clave]:
+                    del indice[clave]
+
+    def publicar(self, evento: dict, claves_autores: frozenset):
+        """Encola el evento para cada suscriptor que coincide, sin esperar a ninguno."""
+        candidatos = set(self._sin_indice)
+        if evento.get("isbn") in self._por_isbn:
+            candidatos |= self._por_isbn[evento["isbn"]]
+        for autor in claves_autores:
+            if autor in self._por_autor:
+                candidatos |= self._por_autor[autor]
+
+        for suscriptor in candidatos:
+            if not suscriptor.filtro.coincide(evento, claves_autores):
+                continue
+            if suscriptor.cola.qsize() >= self.maximo_cola:
+                self.cancelar(suscriptor)
+                suscriptor.descartado = True
+                suscriptor.cola.put_nowait(DESCARTADO)
+                self.descartados += 1
+            else:
+                suscriptor.cola.put_nowait(evento)
+
+    async def ejecutar(self):
+        """
+        Lee y reparte los eventos nuevos hasta que se cancele la tarea.
+
+        Si una lectura falla, se registra en el log y se reintenta desde el
+        mismo cursor tras una espera que se duplica con cada fallo seguido
+        (hasta `ESPERA_MAXIMA`): los suscriptores no pierden eventos.
+        """
+        # El evento y el candado quedan ligados al event loop en que se usan: se
+        # recrean por si la app vuelve a arrancar en otro loop (como en las pruebas).
+        self._hay_suscriptores = asyncio.Event()
+        self._candado = asyncio.Lock()
+        espera = self.intervalo
+        while True:
+            if not self.suscriptores:
+                self.ultimo = None
+                self._hay_suscriptores.clear()
+                await self._hay_suscriptores.wait()
+                continue
+            anterior = self.ultimo
+            try:
+                eventos, ultimo = await asyncio.to_thread(leer_eventos, self.motor, anterior)
+            except Exception:
+                logger.exception("Falló la lectura del registro de cambios; reintento en %.2f s", espera)
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, ESPERA_MAXIMA)
+                continue
+            espera = self.intervalo
+            self.ultimo = ultimo
+            for evento, claves_autores in eventos:
+                self.publicar(evento, claves_autores)
+            # Con un lote completo quedan eventos pendientes: se sigue leyendo sin esperar.
+            if self.ultimo - anterior < LOTE:
+                await asyncio.sleep(self.intervalo)
+
+    async def eventos(self, filtro: Filtro, after: Optional[int] = None) -> AsyncIterator[Optional[dict]]:
+        """
+        Genera los eventos de un suscriptor.
+
+        Si se indica `after`, primero repite los eventos del registro
+        posteriores a ese id y luego sigue con los nuevos, sin huecos ni
+        duplicados. Termina si el suscriptor se descarta por lento.
+
+        Args:
+            filtro (Filtro): Criterios del suscriptor.
+            after (Optional[int]): Último id recibido en una conexión anterior.
+
+        Yields:
+            Optional[dict]: Cada evento, o `None` como latido tras `LATIDO`
+            segundos sin eventos.
+        """
+        suscriptor = await self.suscribir(filtro)
+        try:
+            visto = after if after is not None else 0
+            if after is not None:
+                while True:
+                    eventos, ultimo = await asyncio.to_thread(leer_eventos, self.motor, visto)
+                    for evento, claves_autores in eventos:
+                        if filtro.coincide(evento, claves_autores):
+                            yield evento
+                    if ultimo == visto:
+                        break
+                    visto = ultimo
+
+            while True:
+                try:
+                    evento = await asyncio.wait_for(suscriptor.cola.get(), LATIDO)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if evento is DESCARTADO:
+                    return
+                if evento["id"] > visto:
+                    yield evento
+        finally:
+            self.cancelar(suscriptor)
+
+    async def verificar(self, after: Optional[int]):
+        """
+        Comprueba, antes de abrir la conexión, que el cursor sigue en el registro.
+
+        Raises:
+            HTTPException: 410 si los eventos posteriores a `after` ya se purgaron.
+        """
+        if after is not None:
+            def estado():
+                with Session(self.motor) as session:
+                    return cambios.leer_estado(session)
+            cambios.verificar_cursor(await asyncio.to_thread(estado), after)
+
+    def estadisticas(self) -> dict:
+        return {
+            "suscriptores": len(self.suscriptores),
+            "pendientes": sum(s.cola.qsize() for s in self.suscriptores),
+            "descartados": self.descartados,
+            "ultimo": self.ultimo,
+        }
+
+
+def formato_sse(evento: dict) -> str:
+    """Serializa un evento como mensaje Server-Sent Events (`id`, `event`, `data`)."""
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n"
+
+
+# Difusor del proceso; `main.py` arranca su tarea en el ciclo de vida de la app.
+difusor = Difusor(read_engine)
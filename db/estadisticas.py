@@ -0,0 +1,223 @@
+"""
+estadisticas.py
+---------------
+Estadísticas del catálogo mantenidas de forma incremental.
+
+La tabla `estadistica` guarda un contador por (métrica, grupo):
+
+    libros_por_año       un grupo por año de publicación ('' si no tiene)
+    autores_por_pais     un grupo por país de origen
+    libros, autores, copias_disponibles, deposito_libros, deposito_autores
+                         un único grupo ''
+
+Igual que los contadores de `db/versiones.py`, la mantienen triggers de
+SQLite: cada escritura (individual, en lote o por conjuntos desde
+`db/deposito.py`) ajusta los contadores afectados dentro de su misma
+transacción, sin código adicional en los CRUD. Leer las estadísticas cuesta
+O(grupos), no O(filas).
+
+`desviaciones` y `reparar` recalculan todo con `GROUP BY` para detectar y
+corregir diferencias (ver `reconstruir_estadisticas.py`).
+"""
+
+from sqlalchemy import text
+
+_DDL_ESTADISTICAS = """
+    CREATE TABLE IF NOT EXISTS estadistica (
+        metrica TEXT NOT NULL,
+        grupo TEXT NOT NULL,
+        valor INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (metrica, grupo)
+    ) WITHOUT ROWID
+"""
+
+
+def _año(fila: str) -> str:
+    return f"COALESCE(CAST({fila}.\"año_publicacion\" AS TEXT), '')"
+
+
+def _ajuste(metrica: str, grupo: str, delta: str) -> str:
+    """Sentencia que suma `delta` al contador `(metrica, grupo)`, creándolo si no existe."""
+    return (
+        f"INSERT INTO estadistica (metrica, grupo, valor) VALUES ('{metrica}', {grupo}, {delta}) "
+        "ON CONFLICT (metrica, grupo) DO UPDATE SET valor = valor + excluded.valor;"
+    )
+
+
+# Nombre del trigger -> (evento, sentencias del cuerpo).
+_TRIGGERS = {
+    "estadistica_libro_ai": ("AFTER INSERT ON libro", [
+        _ajuste("libros", "''", "1"),
+        _ajuste("libros_por_año", _año("new"), "1"),
+        _ajuste("copias_disponibles", "''", "new.copias_disponibles"),
+    ]),
+    "estadistica_libro_ad": ("AFTER DELETE ON libro", [
+        _ajuste("libros", "''", "-1"),
+        _ajuste("libros_por_año", _año("old"), "-1"),
+        _ajuste("copias_disponibles", "''", "-old.copias_disponibles"),
+    ]),
+    "estadistica_libro_au_año": (
+        'AFTER UPDATE OF "año_publicacion" ON libro WHEN old."año_publicacion" IS NOT new."año_publicacion"',
+        [_ajuste("libros_por_año", _año("old"), "-1"), _ajuste("libros_por_año", _año("new"), "1")],
+    ),
+    "estadistica_libro_au_copias": (
+        "AFTER UPDATE OF copias_disponibles ON libro",
+        [_ajuste("copias_disponibles", "''", "new.copias_disponibles - old.copias_disponibles")],
+    ),
+    "estadistica_autor_ai": ("AFTER INSERT ON autor", [
+        _ajuste("autores", "''", "1"),
+        _ajuste("autores_por_pais", "new.pais_origen", "1"),
+    ]),
+    "estadistica_autor_ad": ("AFTER DELETE ON autor", [
+        _ajuste("autores", "''", "-1"),
+        _ajuste("autores_por_pais", "old.pais_origen", "-1"),
+    ]),
+    "estadistica_autor_au_pais": (
+        "AFTER UPDATE OF pais_origen ON autor WHEN old.pais_origen IS NOT new.pais_origen",
+        [_ajuste("autores_por_pais", "old.pais_origen", "-1"), _ajuste("autores_por_pais", "new.pais_origen", "1")],
+    ),
+    "estadistica_depositolibro_ai": ("AFTER INSERT ON depositolibro", [_ajuste("deposito_libros", "''", "1")]),
+    "estadistica_depositolibro_ad": ("AFTER DELETE ON depositolibro", [_ajuste("deposito_libros", "''", "-1")]),
+    "estadistica_depositoautores_ai": ("AFTER INSERT ON depositoautores", [_ajuste("deposito_autores", "''", "1")]),
+    "estadistica_depositoautores_ad": ("AFTER DELETE ON depositoautores", [_ajuste("deposito_autores", "''", "-1")]),
+}
+
+# Cálculo completo de cada métrica: pares (grupo, valor).
+_CONSULTAS = {
+    "libros": "SELECT '', COUNT(*) FROM libro",
+    "libros_por_año": f"SELECT {_año('libro')}, COUNT(*) FROM libro GROUP BY 1",
+    "copias_disponibles": "SELECT '', COALESCE(SUM(copias_disponibles), 0) FROM libro",
+    "autores": "SELECT '', COUNT(*) FROM autor",
+    "autores_por_pais": "SELECT pais_origen, COUNT(*) FROM autor GROUP BY 1",
+    "deposito_libros": "SELECT '', COUNT(*) FROM depositolibro",
+    "deposito_autores": "SELECT '', COUNT(*) FROM depositoautores",
+}
+
+
+def crear_estadisticas(conexion):
+    """
+    Crea la tabla de estadísticas y sus triggers si no existen.
+
+    Si la tabla es nueva (base creada antes de esta función), se llena con
+    el cálculo completo.
+
+    Args:
+        conexion (Connection): Conexión dentro de una transacción abierta.
+    """
+    existia = conexion.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'estadistica'")
+    ).first() is not None
+    conexion.execute(text(_DDL_ESTADISTICAS))
+    for nombre, (evento, sentencias) in _TRIGGERS.items():
+        conexion.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {nombre} {evento} BEGIN\n" + "\n".join(sentencias) + "\nEND"
+        ))
+    if not existia:
+        reparar(conexion)
+
+
+def calcular(conexion) -> dict[tuple[str, str], int]:
+    """Recalcula todas las métricas con `GROUP BY` sobre las tablas completas."""
+    valores = {}
+    for metrica, consulta in _CONSULTAS.items():
+        for grupo, valor in conexion.execute(text(consulta)):
+            valores[(metrica, grupo)] = valor
+    return valores
+
+
+def _almacenadas(conexion) -> dict[tuple[str, str], int]:
+    filas = conexion.execute(text("SELECT metrica, grupo, valor FROM estadistica"))
+    return {(metrica, grupo): valor for metrica, grupo, valor in filas}
+
+
+def desviaciones(conexion) -> list[dict]:
+    """
+    Compara la tabla de estadísticas con el cálculo completo.
+
+    Args:
+        conexion (Connection): Conexión a la base de datos.
+
+    Returns:
+        list[dict]: Una entrada por contador distinto, con `metrica`, `grupo`,
+        el valor `almacenado` y el `esperado`. Los contadores en 0 equivalen a
+        grupos ausentes.
+    """
+    esperadas = calcular(conexion)
+    almacenadas = _almacenadas(conexion)
+    diferencias = []
+    for metrica, grupo in sorted(esperadas.keys() | almacenadas.keys()):
+        almacenado = almacenadas.get((metrica, grupo), 0)
+        esperado = esperadas.get((metrica, grupo), 0)
+        if almacenado != esperado:
+            diferencias.append({"metrica": metrica, "grupo": grupo, "almacenado": almacenado, "esperado": esperado})
+    return diferencias
+
+
+def reparar(conexion):
+    """
+    Reemplaza el contenido de la tabla de estadísticas por el cálculo completo.
+
+    Args:
+        conexion (Connection): Conexión dentro de una transacción abierta.
+    """
+    valores = calcular(conexion)
+    conexion.execute(text("DELETE FROM estadistica"))
+    if valores:
+        conexion.execute(
+            text("INSERT INTO estadistica (metrica, grupo, valor) VALUES (:metrica, :grupo, :valor)"),
+            [{"metrica": metrica, "grupo": grupo, "valor": valor} for (metrica, grupo), valor in valores.items()],
+        )
+
+
+def contador(session, metrica: str, grupo: str = "") -> int:
+    """
+    Lee un único contador (búsqueda por clave primaria, sin recorrer la tabla contada).
+
+    Args:
+        session (Session): Sesión activa.
+        metrica (str): Nombre de la métrica (por ejemplo `libros`).
+        grupo (str): Grupo dentro de la métrica; `''` para los totales.
+
+    Returns:
+        int: Valor del contador, 0 si no existe.
+    """
+    valor = session.exec(
+        text("SELECT valor FROM estadistica WHERE metrica = :metrica AND grupo = :grupo")
+        .bindparams(metrica=metrica, grupo=grupo)
+    ).scalar()
+    return valor or 0
+
+
+def leer(session) -> dict:
+    """
+    Lee las estadísticas desde la tabla resumen.
+
+    Args:
+        session (Session): Sesión activa.
+
+    Returns:
+        dict: Totales de libros, autores y copias disponibles, libros por año
+        (`sin_año` para los que no lo tienen), autores por país y tamaño del
+        depósito.
+    """
+    resultado = {
+        "libros": 0,
+        "autores": 0,
+        "copias_disponibles": 0,
+        "libros_por_año": {},
+        "autores_por_pais": {},
+        "deposito": {"libros": 0, "autores": 0},
+    }
+    filas = session.exec(text(
+        "SELECT metrica, grupo, valor FROM estadistica WHERE valor != 0 ORDER BY metrica, grupo"
+    ))
+    for metrica, grupo, valor in filas:
+        if metrica == "libros_por_año":
+            resultado[metrica][grupo or "sin_año"] = valor
+        elif metrica == "autores_por_pais":
+            resultado[metrica][grupo] = valor
+        elif metrica.startswith("deposito_"):
+            resultado["deposito"][metrica.removeprefix("deposito_")] = valor
+        else:
+            resultado[metrica] = valor
+    return resultado
@@ -0,0 +1,187 @@
+"""
+metricas.py
+-----------
+Instrumentación de peticiones y de SQL, expuesta en formato de texto de
+Prometheus (`GET /metrics`) y en la cabecera `Server-Timing`.
+
+- `MiddlewareMetricas` (ASGI) mide la duración de cada petición, las que
+  están en curso y los códigos de estado, por método y plantilla de ruta.
+- `instrumentar_motor` engancha `before/after_cursor_execute` en un motor y
+  suma a la petición en curso las sentencias ejecutadas y el tiempo pasado en
+  la base de datos. La petición en curso se guarda en una `ContextVar`, que
+  llega también a las consultas hechas dentro de `run_sync` y en el threadpool.
+"""
+
+import bisect
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+# Límites superiores (en segundos) de los buckets del histograma de duración.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class MedicionSQL:
+    """Sentencias y tiempo en la base de datos acumulados por una petición."""
+    sentencias: int = 0
+    segundos: float = 0.0
+
+
+_medicion_actual: ContextVar[MedicionSQL | None] = ContextVar("medicion_sql", default=None)
+
+
+class Histograma:
+    def __init__(self):
+        self.conteos = [0] * (len(BUCKETS) + 1)  # el último es +Inf
+        self.suma = 0.0
+        self.cuenta = 0
+
+    def observar(self, valor: float):
+        self.conteos[bisect.bisect_left(BUCKETS, valor)] += 1
+        self.suma += valor
+        self.cuenta += 1
+
+
+class Registro:
+    """Métricas acumuladas desde que arrancó el proceso."""
+
+    def __init__(self):
+        self.en_vuelo = 0
+        self.duraciones = defaultdict(Histograma)  # (metodo, ruta) -> Histograma
+        self.respuestas = defaultdict(int)         # (metodo, ruta, estado) -> cantidad
+        self.sentencias = defaultdict(int)         # (metodo, ruta) -> sentencias SQL
+        self.segundos_sql = defaultdict(float)     # (metodo, ruta) -> segundos en la base
+
+    def observar(self, metodo: str, ruta: str, estado: int, segundos: float, sql: MedicionSQL):
+        self.duraciones[(metodo, ruta)].observar(segundos)
+        self.respuestas[(metodo, ruta, estado)] += 1
+        self.sentencias[(metodo, ruta)] += sql.sentencias
+        self.segundos_sql[(metodo, ruta)] += sql.segundos
+
+    def exportar(self) -> str:
+        """Devuelve las métricas en el formato de texto de Prometheus 0.0.4."""
+        lineas = [
+            "# HELP catalogo_http_peticiones_en_vuelo Peticiones HTTP en curso.",
+            "# TYPE catalogo_http_peticiones_en_vuelo gauge",
+            f"catalogo_http_peticiones_en_vuelo {self.en_vuelo}",
+            "# HELP catalogo_http_duracion_segundos Duración de las peticiones HTTP.",
+            "# TYPE catalogo_http_duracion_segundos histogram",
+        ]
+        for (metodo, ruta), histograma in sorted(self.duraciones.items()):
+            etiquetas = _etiquetas(metodo=metodo, ruta=ruta)
+            acumulado = 0
+            for limite, conteo in zip(BUCKETS + (float("inf"),), histograma.conteos):
+                acumulado += conteo
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                lineas.append(f"catalogo_http_duracion_segundos_bucket{{{etiquetas},le=\"{le}\"}} {acumulado}")
+            lineas.append(f"catalogo_http_duracion_segundos_sum{{{etiquetas}}} {histograma.suma}")
+            lineas.append(f"catalogo_http_duracion_segundos_count{{{etiquetas}}} {histograma.cuenta}")
+
+        lineas += [
+            "# HELP catalogo_http_respuestas_total Respuestas HTTP por código de estado.",
+            "# TYPE catalogo_http_respuestas_total counter",
+        ]
+        for (metodo, ruta, estado), cantidad in sorted(self.respuestas.items()):
+            lineas.append(f"catalogo_http_respuestas_total{{{_etiquetas(metodo=metodo, ruta=ruta, estado=estado)}}} {cantidad}")
+
+        lineas += [
+            "# HELP catalogo_sql_sentencias_total Sentencias SQL ejecutadas por las peticiones.",
+            "# TYPE catalogo_sql_sentencias_total counter",
+        ]
+        for (metodo, ruta), cantidad in sorted(self.sentencias.items()):
+            lineas.append(f"catalogo_sql_sentencias_total{{{_etiquetas(metodo=metodo, ruta=ruta)}}} {cantidad}")
+
+        lineas += [
+            "# HELP catalogo_sql_segundos_total Tiempo de las peticiones pasado en la base de datos.",
+            "# TYPE catalogo_sql_segundos_total counter",
+        ]
+        for (metodo, ruta), segundos in sorted(self.segundos_sql.items()):
+            lineas.append(f"catalogo_sql_segundos_total{{{_etiquetas(metodo=metodo, ruta=ruta)}}} {segundos}")
+
+        return "\n".join(lineas) + "\n"
+
+
+def _etiquetas(**valores) -> str:
+    def escapar(valor) -> str:
+        return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{nombre}="{escapar(valor)}"' for nombre, valor in valores.items())
+
+
+registro = Registro()
+
+
+def instrumentar_motor(motor):
+    """
+    Cuenta las sentencias y el tiempo de SQL de la petición en curso.
+
+    El inicio se guarda en el contexto de ejecución de cada sentencia (no en
+    la conexión): si la sentencia falla y no llega `after_cursor_execute`, el
+    valor se descarta con el contexto y no desplaza las mediciones siguientes.
+
+    Args:
+        motor (Engine): Motor síncrono (para uno asíncrono, su `sync_engine`).
+    """
+    @event.listens_for(motor, "before_cursor_execute")
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        context._inicio_sentencia = time.perf_counter()
+
+    @event.listens_for(motor, "after_cursor_execute")
+    def despues(conn, cursor, statement, parameters, context, executemany):
+        inicio = context._inicio_sentencia
+        medicion = _medicion_actual.get()
+        if medicion is not None:
+            medicion.sentencias += 1
+            medicion.segundos += time.perf_counter() - inicio
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que registra cada petición HTTP en `registro` y agrega la
+    cabecera `Server-Timing` (tiempo total y tiempo en la base de datos).
+
+    La ruta se etiqueta con su plantilla (`/libros/{titulo}`), no con la URL,
+    para que la cantidad de series no crezca con los datos.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicion = MedicionSQL()
+        token = _medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        estado = 500
+        registro.en_vuelo += 1
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                total = (time.perf_counter() - inicio) * 1000
+                MutableHeaders(scope=mensaje).append(
+                    "Server-Timing",
+                    f'app;dur={total:.2f}, db;dur={medicion.segundos * 1000:.2f};desc="sentencias={medicion.sentencias}"',
+                )
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            registro.en_vuelo -= 1
+            ruta = scope.get("route")
+            registro.observar(
+                scope["method"],
+                ruta.path if ruta is not None else "sin_ruta",
+                estado,
+                time.perf_counter() - inicio,
+                medicion,
+            )
+            _medicion_actual.reset(token)
@@ -0,0 +1,89 @@
+"""
+migraciones.py
+--------------
+Migraciones en caliente para bases de datos creadas con versiones anteriores
+del esquema.
+
+`SQLModel.metadata.create_all` solo crea tablas que no existen: no agrega
+columnas ni índices a tablas ya creadas. Este módulo completa esas
+diferencias de forma idempotente al iniciar la aplicación.
+"""
+
+from sqlalchemy import text
+from sqlmodel import SQLModel
+from db.normalizacion import normalizar
+
+# (tabla, columna clave, columna de origen)
+CLAVES_NORMALIZADAS = [
+    ("autor", "clave_nombre", "nombre_apellidos"),
+    ("libro", "clave_titulo", "titulo"),
+    ("depositoautores", "clave_nombre", "nombre_apellidos"),
+    ("depositolibro", "clave_titulo", "titulo"),
+]
+
+
+def _columnas(conexion, tabla: str) -> set[str]:
+    return {fila[1] for fila in conexion.execute(text(f"PRAGMA table_info({tabla})"))}
+
+
+def agregar_claves_normalizadas(conexion):
+    """
+    Agrega y rellena las columnas de clave normalizada que falten.
+
+    Para cada tabla sin su columna clave se ejecuta `ALTER TABLE ADD COLUMN`,
+    se calcula la clave de las filas existentes y se crea el índice único.
+
+    Args:
+        conexion (Connection): Conexión dentro de una transacción abierta.
+
+    Raises:
+        RuntimeError: Si dos filas existentes producen la misma clave.
+    """
+    for tabla, columna, origen in CLAVES_NORMALIZADAS:
+        if columna in _columnas(conexion, tabla):
+            continue
+
+        conexion.execute(text(f"ALTER TABLE {tabla} ADD COLUMN {columna} VARCHAR"))
+        filas = conexion.execute(text(f"SELECT id, {origen} FROM {tabla}")).all()
+        claves = [{"id": id_fila, "clave": normalizar(valor)} for id_fila, valor in filas]
+
+        repetidas = len(claves) - len({c["clave"] for c in claves})
+        if repetidas:
+            raise RuntimeError(
+                f"No se puede crear la clave única {tabla}.{columna}: "
+                f"{repetidas} filas tienen un {origen} equivalente a otra"
+            )
+
+        if claves:
+            conexion.execute(text(f"UPDATE {tabla} SET {columna} = :clave WHERE id = :id"), claves)
+        conexion.execute(text(f"CREATE UNIQUE INDEX ix_{tabla}_{columna} ON {tabla} ({columna})"))
+
+
+def crear_indices_faltantes(conexion):
+    """
+    Crea los índices declarados en los modelos que aún no existen.
+
+    Recorre todos los índices de `SQLModel.metadata` y emite
+    `CREATE INDEX` solo para los que falten en la base de datos. Se compara
+    por nombre con `sqlite_master` porque la reflexión de SQLAlchemy omite
+    los índices sobre expresiones.
+
+    Args:
+        conexion (Connection): Conexión dentro de una transacción abierta.
+    """
+    existentes = set(conexion.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    for tabla in SQLModel.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            if indice.name not in existentes:
+                indice.create(conexion)
+
+
+def migrar(conexion):
+    """
+    Aplica todas las migraciones pendientes.
+
+    Args:
+        conexion (Connection): Conexión dentro de una transacción abierta.
+    """
+    agregar_claves_normalizadas(conexion)
+    crear_indices_faltantes(conexion)
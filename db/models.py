@@ -9,7 +9,9 @@ establecen relaciones N:M entre autores y libros.
 
 from datetime import datetime, UTC
 from typing import Optional, List
+from sqlalchemy import Index, Integer, cast
 from sqlmodel import SQLModel, Field, Relationship
+from db.normalizacion import clave_de
 
 
 class LinkAutorLibroDeposito(SQLModel, table=True):
@@ -18,7 +20,10 @@ class LinkAutorLibroDeposito(SQLModel, table=True):
     Guarda el historial de las asociaciones originales.
     """
     id_libro_deposito: Optional[int] = Field(default=None, foreign_key="depositolibro.id", primary_key=True)
-    id_autor_deposito: Optional[int] = Field(default=None, foreign_key="depositoautores.id", primary_key=True)
+    # Índice propio para recorrer los vínculos desde el autor (la PK empieza por el libro).
+    id_autor_deposito: Optional[int] = Field(
+        default=None, foreign_key="depositoautores.id", primary_key=True, index=True
+    )
     timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
 
 
@@ -27,7 +32,8 @@ class LinkAutorLibro(SQLModel, table=True):
     Tabla intermedia que relaciona autores con libros activos (catálogo).
     """
     id_libros: Optional[int] = Field(default=None, foreign_key="libro.id", primary_key=True)
-    id_autor: Optional[int] = Field(default=None, foreign_key="autor.id", primary_key=True)
+    # La clave primaria empieza por el libro; este índice cubre las búsquedas por autor.
+    id_autor: Optional[int] = Field(default=None, foreign_key="autor.id", primary_key=True, index=True)
 
 
 class Autor(SQLModel, table=True):
@@ -36,7 +42,11 @@ class Autor(SQLModel, table=True):
     """
     id: Optional[int] = Field(default=None, primary_key=True)
     nombre_apellidos: str = Field(index=True, unique=True)
-    pais_origen: str
+    clave_nombre: Optional[str] = Field(
+        default=None, index=True, unique=True,
+        sa_column_kwargs={"default": clave_de("nombre_apellidos")}
+    )
+    pais_origen: str = Field(index=True)
     descripcion: str
     año_nacimiento: str
     año_muerte: Optional[str] = None
@@ -53,10 +63,14 @@ class Libro(SQLModel, table=True):
     """
     id: Optional[int] = Field(default=None, primary_key=True)
     titulo: str = Field(unique=True)
+    clave_titulo: Optional[str] = Field(
+        default=None, index=True, unique=True,
+        sa_column_kwargs={"default": clave_de("titulo")}
+    )
     resumen: Optional[str] = None
-    numero_paginas: Optional[int] = None
-    editorial: Optional[str] = None
-    año_publicacion: Optional[int] = None
+    numero_paginas: Optional[int] = Field(default=None, index=True)
+    editorial: Optional[str] = Field(default=None, index=True)
+    año_publicacion: Optional[int] = Field(default=None, index=True)
     copias_disponibles: int = Field(default=0)
     ISBN: str = Field(unique=True, index=True)
 
@@ -74,7 +88,11 @@ class DepositoAutores(SQLModel, table=True):
     timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
     id_autor_original: int
     nombre_apellidos: str
-    pais_origen: str
+    clave_nombre: Optional[str] = Field(
+        default=None, index=True, unique=True,
+        sa_column_kwargs={"default": clave_de("nombre_apellidos")}
+    )
+    pais_origen: str = Field(index=True)
     descripcion: str
     año_nacimiento: str
     año_muerte: Optional[str] = None
@@ -93,14 +111,27 @@ class DepositoLibro(SQLModel, table=True):
     timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
     id_libro_original: int
     titulo: str
+    clave_titulo: Optional[str] = Field(
+        default=None, index=True, unique=True,
+        sa_column_kwargs={"default": clave_de("titulo")}
+    )
     resumen: Optional[str] = None
     numero_paginas: Optional[int] = None
     editorial: Optional[str] = None
     año_publicacion: Optional[int] = None
     copias_disponibles: int
-    ISBN: str
+    ISBN: str = Field(index=True)
 
     autores: List["DepositoAutores"] = Relationship(
         back_populates="libros",
         link_model=LinkAutorLibroDeposito
-    )
\ No newline at end of file
+    )
+
+# Índices compuestos de los listados (filtro por igualdad + orden, ver `db/paginacion.py`).
+# El año de nacimiento se guarda como texto; los rangos y el orden usan su valor numérico,
+# y SQLite solo usa un índice sobre una expresión si la consulta repite la misma expresión.
+año_nacimiento_numerico = cast(Autor.__table__.c["año_nacimiento"], Integer)
+
+Index("ix_libro_editorial_año_publicacion", Libro.__table__.c.editorial, Libro.__table__.c["año_publicacion"])
+Index("ix_autor_año_nacimiento", año_nacimiento_numerico)
+Index("ix_autor_pais_origen_año_nacimiento", Autor.__table__.c.pais_origen, año_nacimiento_numerico)
@@ -0,0 +1,50 @@
+"""
+normalizacion.py
+----------------
+Normalización de nombres y títulos para búsquedas insensibles a mayúsculas,
+tildes y espacios repetidos.
+
+Cada modelo guarda, junto al texto original, una columna clave con el texto
+normalizado y un índice único sobre ella. Las rutas buscan siempre por esa
+clave, de modo que "gabriel garcia marquez" encuentra a "Gabriel García
+Márquez" con una búsqueda por índice en lugar de aplicar `lower()` a toda la
+columna.
+"""
+
+import unicodedata
+
+
+def normalizar(texto: str) -> str:
+    """
+    Devuelve la forma normalizada de un texto.
+
+    Descompone los caracteres (NFKD), elimina las marcas diacríticas, aplica
+    `casefold()` y colapsa los espacios.
+
+    Args:
+        texto (str): Nombre o título original.
+
+    Returns:
+        str: Clave normalizada.
+    """
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(sin_tildes.casefold().split())
+
+
+def clave_de(campo: str):
+    """
+    Crea un valor por defecto de columna que normaliza otro campo de la fila.
+
+    Se usa como `default` de SQLAlchemy, por lo que se calcula en cada INSERT,
+    tanto desde el ORM como en inserciones masivas con executemany.
+
+    Args:
+        campo (str): Nombre de la columna de origen.
+
+    Returns:
+        Callable: Función que recibe el contexto de ejecución y devuelve la clave.
+    """
+    def calcular(contexto):
+        return normalizar(contexto.get_current_parameters()[campo])
+    return calcular
@@ -0,0 +1,200 @@
+"""
+paginacion.py
+-------------
+Utilidades de paginación por cursor (keyset) compartidas por los módulos de
+autores y libros.
+
+En lugar de `OFFSET`, cada página se obtiene con `WHERE id > :after ORDER BY id
+LIMIT :limit`, de modo que la consulta usa el índice de la clave primaria y su
+costo no depende de la profundidad de la página.
+
+Las consultas seleccionan columnas (ver `db/proyeccion.py`), no entidades:
+cada registro se devuelve como un diccionario con las columnas pedidas.
+
+El total (`X-Total-Count`) es opcional y se calcula aparte con `COUNT(*)`
+bajo los mismos filtros, o se lee de `db/estadisticas.py` si no hay filtros.
+
+Con `sort=campo` (o `-campo`, descendente) la página se ordena por
+`(campo, id)` y el cursor pasa a ser una cadena opaca con el valor del campo
+y el id del último registro: la siguiente página empieza con
+`WHERE (campo, id) > (:valor, :id)`, que SQLite resuelve como un rango sobre
+un índice que empiece por `campo` (su clave incluye el id), sin ordenar en
+una tabla temporal. Los registros con el campo en `NULL` forman un tramo
+aparte, recorrido por id: primero en orden ascendente y al final en
+descendente, igual que el orden de SQLite.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from typing import Annotated, Optional, Union
+from fastapi import HTTPException, Query
+from sqlalchemy import tuple_
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 500
+# Máximo de claves por lista en una consulta en bloque (`/libros/lookup`, `/autores/lookup`).
+MAXIMO_CONSULTA_LOTE = 500
+
+limitQuery = Annotated[
+    int,
+    Query(ge=1, le=LIMITE_MAXIMO, description="Cantidad máxima de registros por página"),
+]
+afterQuery = Annotated[
+    Optional[int],
+    Query(description="Cursor: devuelve los registros con id mayor a este valor"),
+]
+
+
+cursorQuery = Annotated[
+    Optional[str],
+    Query(description="Cursor: id del último registro, o el `next_cursor` de la página anterior si se usa `sort`"),
+]
+sortQuery = Annotated[
+    Optional[str],
+    Query(description="Campo por el que ordenar; con prefijo `-` en orden descendente (por ejemplo `-año_publicacion`)"),
+]
+
+countQuery = Annotated[
+    bool,
+    Query(description="Agregar en la cabecera `X-Total-Count` el total de registros que cumplen los filtros"),
+]
+
+# Cabecera con el total de registros (en GET con `count=true` y en HEAD).
+CABECERA_TOTAL = "X-Total-Count"
+
+
+@dataclass(frozen=True)
+class Orden:
+    """
+    Orden de una página distinto del id.
+
+    Attributes:
+        nombre (str): Campo pedido en `sort` (sin el prefijo `-`).
+        expresion (ColumnElement): Columna o expresión indexada por la que se ordena.
+        descendente (bool): Si el orden es descendente.
+        admite_nulos (bool): Si la expresión puede ser `NULL`.
+    """
+    nombre: str
+    expresion: object
+    descendente: bool = False
+    admite_nulos: bool = True
+
+
+def orden(campos: dict, sort: Optional[str]) -> Optional[Orden]:
+    """
+    Traduce el parámetro `sort` a un `Orden`.
+
+    Args:
+        campos (dict): Campo ordenable -> (expresión, admite nulos). Solo se
+            ofrecen campos con un índice que empiece por la expresión.
+        sort (Optional[str]): Valor del parámetro; `None`, vacío o `id`
+            mantienen el orden por id.
+
+    Returns:
+        Optional[Orden]: `None` para el orden por id.
+
+    Raises:
+        HTTPException: Si el campo no es ordenable.
+    """
+    if not sort or sort == "id":
+        return None
+    nombre = sort.removeprefix("-")
+    if nombre not in campos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No se puede ordenar por '{nombre}'. Disponibles: id, {', '.join(campos)}",
+        )
+    expresion, admite_nulos = campos[nombre]
+    return Orden(nombre, expresion, sort.startswith("-"), admite_nulos)
+
+
+def _codificar(orden: Orden, valor, id_fila: int) -> str:
+    texto = json.dumps([orden.nombre, valor, id_fila], ensure_ascii=False, default=str)
+    return base64.urlsafe_b64encode(texto.encode()).decode()
+
+
+def _decodificar(orden: Orden, cursor) -> tuple:
+    try:
+        nombre, valor, id_fila = json.loads(base64.urlsafe_b64decode(str(cursor).encode()))
+    except (ValueError, TypeError):
+        nombre = None
+    if nombre != orden.nombre:
+        raise HTTPException(status_code=400, detail=f"Cursor inválido para sort={orden.nombre}")
+    return valor, id_fila
+
+
+def _paginar_ordenado(session, query, columna_id, limit: int, after, orden: Orden):
+    """Página ordenada por `(orden.expresion, id)`; ver la descripción del módulo."""
+    expresion, desc = orden.expresion, orden.descendente
+    query = query.add_columns(expresion.label("_orden"))
+    valor, id_fila = _decodificar(orden, after) if after is not None else (None, None)
+
+    def tramo_valores():
+        q = query.where(expresion.isnot(None)) if orden.admite_nulos else query
+        if id_fila is not None and valor is not None:
+            actual, cursor = tuple_(expresion, columna_id), tuple_(valor, id_fila)
+            q = q.where(actual < cursor if desc else actual > cursor)
+        return q.order_by(*((expresion.desc(), columna_id.desc()) if desc else (expresion, columna_id)))
+
+    def tramo_nulos():
+        q = query.where(expresion.is_(None))
+        if id_fila is not None and valor is None:
+            q = q.where(columna_id < id_fila if desc else columna_id > id_fila)
+        return q.order_by(columna_id.desc() if desc else columna_id)
+
+    # Tramos en el orden en que se recorren; si el cursor ya está en el segundo, se omite el primero.
+    tramos = [tramo_valores]
+    if orden.admite_nulos:
+        tramos = [tramo_valores, tramo_nulos] if desc else [tramo_nulos, tramo_valores]
+        if after is not None and (valor is None) == desc:
+            tramos = tramos[1:]
+
+    filas = []
+    for tramo in tramos:
+        filas += session.exec(tramo().limit(limit + 1 - len(filas))).all()
+        if len(filas) > limit:
+            break
+
+    items = [dict(fila._mapping) for fila in filas[:limit]]
+    valores = [item.pop("_orden") for item in items]
+    next_cursor = _codificar(orden, valores[-1], items[-1]["id"]) if len(filas) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def paginar(session, query, columna_id, limit: int = LIMITE_POR_DEFECTO,
+            after: Optional[Union[int, str]] = None, orden: Optional[Orden] = None):
+    """
+    Ejecuta una consulta paginada por clave primaria o por `(orden, id)`.
+
+    Args:
+        session (Session): Sesión activa de la base de datos.
+        query (Select): Consulta de columnas (que incluya `id`) con los filtros ya aplicados.
+        columna_id (Column): Columna de la clave primaria por la que se ordena.
+        limit (int): Cantidad máxima de registros a devolver.
+        after (Optional[Union[int, str]]): Último id recibido en la página
+            anterior, o el cursor opaco si se ordena por otro campo.
+        orden (Optional[Orden]): Orden distinto del id (ver `orden`).
+
+    Returns:
+        dict: Registros de la página (`items`, diccionarios) y el cursor de la siguiente
+        página (`next_cursor`), que es `None` cuando no hay más resultados.
+
+    Raises:
+        HTTPException: Si el cursor no corresponde al orden pedido.
+    """
+    if orden is not None:
+        return _paginar_ordenado(session, query, columna_id, limit, after, orden)
+    if after is not None:
+        try:
+            after = int(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Cursor inválido: sin sort, after es el id del último registro")
+        query = query.where(columna_id > after)
+
+    # Se pide un registro extra solo para saber si existe otra página.
+    filas = session.exec(query.order_by(columna_id).limit(limit + 1)).all()
+    items = [dict(fila._mapping) for fila in filas[:limit]]
+    next_cursor = items[-1]["id"] if len(filas) > limit else None
+
+    return {"items": items, "next_cursor": next_cursor}
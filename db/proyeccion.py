@@ -0,0 +1,67 @@
+"""
+proyeccion.py
+-------------
+Selección de columnas (`fields=`) para los listados y las exportaciones.
+
+`fields=id,titulo` se traduce a `SELECT libro.id, libro.titulo ...`: solo se
+leen, construyen y serializan las columnas pedidas, sin hidratar entidades
+completas. La columna `id` se incluye siempre porque es el cursor de la
+paginación. Las columnas internas (`COLUMNAS_INTERNAS`, las claves
+normalizadas de `db/normalizacion.py`) no se devuelven ni se pueden pedir;
+`publico` las quita también de las instancias que devuelven los CRUD.
+"""
+
+from typing import Annotated, Iterable, Optional
+from fastapi import HTTPException, Query
+
+fieldsQuery = Annotated[
+    Optional[str],
+    Query(description="Campos a devolver separados por coma (por ejemplo `id,titulo`); por defecto todos"),
+]
+
+# Columnas de uso interno que no forman parte de las respuestas.
+COLUMNAS_INTERNAS = {"clave_nombre", "clave_titulo"}
+
+
+def _publicas(tabla) -> dict:
+    return {columna.name: columna for columna in tabla.columns if columna.name not in COLUMNAS_INTERNAS}
+
+
+def columnas(modelo, fields: Optional[str], adicionales: Iterable[str] = ()) -> tuple[list, set[str]]:
+    """
+    Traduce el parámetro `fields` a columnas de la tabla del modelo.
+
+    Args:
+        modelo (SQLModel): Modelo de tabla consultado.
+        fields (Optional[str]): Nombres separados por coma; `None` o vacío
+            selecciona todas las columnas públicas y todos los `adicionales`.
+        adicionales (Iterable[str]): Campos válidos que no son columnas de la
+            tabla (por ejemplo los vínculos que agrega una exportación).
+
+    Returns:
+        tuple[list, set[str]]: Columnas a seleccionar (empezando por `id`) y
+        los campos adicionales pedidos.
+
+    Raises:
+        HTTPException: Si algún campo no existe en el modelo.
+    """
+    publicas = _publicas(modelo.__table__)
+    if not fields:
+        return list(publicas.values()), set(adicionales)
+
+    nombres = list(dict.fromkeys(nombre.strip() for nombre in fields.split(",") if nombre.strip()))
+    desconocidos = [n for n in nombres if n not in publicas and n not in adicionales]
+    if desconocidos:
+        disponibles = ", ".join(list(publicas) + list(adicionales))
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos desconocidos: {', '.join(desconocidos)}. Disponibles: {disponibles}",
+        )
+
+    seleccion = [publicas["id"]] + [publicas[n] for n in nombres if n in publicas and n != "id"]
+    return seleccion, {n for n in nombres if n in adicionales}
+
+
+def publico(instancia) -> dict:
+    """Columnas públicas de una instancia de modelo, sin `COLUMNAS_INTERNAS`."""
+    return instancia.model_dump(exclude=COLUMNAS_INTERNAS)
@@ -0,0 +1,75 @@
+"""
+versiones.py
+------------
+Contadores de versión por tabla, guardados en la propia base de datos.
+
+La tabla `version_tabla` tiene una fila por cada tabla del catálogo y del
+depósito. Triggers AFTER INSERT/UPDATE/DELETE incrementan su contador, de modo
+que cualquier escritura (individual, en lote o por conjuntos desde
+`db/deposito.py`) cambia la versión sin código adicional en los CRUD y todos
+los workers ven el mismo valor.
+
+Con esas versiones se construyen los `ETag` de las rutas GET.
+"""
+
+from sqlalchemy import bindparam, text
+
+TABLAS_VERSIONADAS = [
+    "autor",
+    "libro",
+    "linkautorlibro",
+    "depositoautores",
+    "depositolibro",
+    "linkautorlibrodeposito",
+]
+
+_DDL_VERSIONES = """
+    CREATE TABLE IF NOT EXISTS version_tabla (
+        tabla TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+"""
+
+_DDL_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS version_{tabla}_{sufijo} AFTER {evento} ON {tabla} BEGIN
+        UPDATE version_tabla SET version = version + 1 WHERE tabla = '{tabla}';
+    END
+"""
+
+_EVENTOS = {"ai": "INSERT", "au": "UPDATE", "ad": "DELETE"}
+
+
+def crear_contadores(conexion):
+    """
+    Crea la tabla de versiones, sus filas iniciales y los triggers si no existen.
+
+    Args:
+        conexion (Connection): Conexión dentro de una transacción abierta.
+    """
+    conexion.execute(text(_DDL_VERSIONES))
+    for tabla in TABLAS_VERSIONADAS:
+        conexion.execute(
+            text("INSERT OR IGNORE INTO version_tabla (tabla, version) VALUES (:tabla, 0)"),
+            {"tabla": tabla},
+        )
+        for sufijo, evento in _EVENTOS.items():
+            conexion.execute(text(_DDL_TRIGGER.format(tabla=tabla, sufijo=sufijo, evento=evento)))
+
+
+def etag(session, tablas: tuple[str, ...]) -> str:
+    """
+    Construye un ETag débil a partir de las versiones de las tablas indicadas.
+
+    Args:
+        session (Session): Sesión activa.
+        tablas (tuple[str]): Tablas de las que depende la respuesta.
+
+    Returns:
+        str: ETag como `W/"autor.4-libro.9"`.
+    """
+    versiones = dict(session.exec(
+        text("SELECT tabla, version FROM version_tabla WHERE tabla IN :tablas")
+        .bindparams(bindparam("tablas", expanding=True)),
+        params={"tablas": list(tablas)},
+    ).all())
+    return 'W/"' + "-".join(f"{tabla}.{versiones.get(tabla, 0)}" for tabla in tablas) + '"'
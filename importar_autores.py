@@ -0,0 +1,105 @@
+"""Importación masiva de autores desde un archivo CSV o JSON-lines.
+
+Lee el archivo fila por fila (sin cargarlo completo en memoria), valida cada
+fila con el esquema `CrearAutor` y delega la inserción por lotes en
+`ingresar_autores_en_lote`. Al terminar informa las filas inválidas y el
+rendimiento obtenido en filas por segundo.
+
+Uso:
+    python importar_autores.py autores.csv
+    python importar_autores.py autores.jsonl --actualizar
+"""
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+from pydantic import ValidationError
+from sqlmodel import Session
+
+from db.database import engine, create_database
+from autores.crud import ingresar_autores_en_lote
+from autores.schemas import CrearAutor
+
+
+def leer_filas(ruta: Path, formato: str, errores: list):
+    """Produce pares `(numero_linea, fila)` a partir del archivo indicado.
+
+    Las líneas JSON mal formadas se registran en `errores`, igual que las
+    filas que no pasan la validación, y se omiten.
+
+    Args:
+        ruta (Path): Archivo a leer.
+        formato (str): `csv` o `jsonl`.
+        errores (list): Lista donde se registran las líneas ilegibles.
+
+    Yields:
+        tuple[int, dict]: Número de línea y contenido de la fila.
+    """
+    with ruta.open(encoding="utf-8", newline="") as archivo:
+        if formato == "csv":
+            for numero, fila in enumerate(csv.DictReader(archivo), start=2):
+                # Las celdas vacías se omiten para que apliquen los valores por defecto.
+                yield numero, {k: v for k, v in fila.items() if v not in ("", None)}
+        else:
+            for numero, linea in enumerate(archivo, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except json.JSONDecodeError as error:
+                    errores.append({"linea": numero, "errores": [
+                        {"type": "json_invalid", "loc": (), "msg": f"JSON inválido: {error.msg} (columna {error.colno})"},
+                    ]})
+                    continue
+                yield numero, fila
+
+
+def validar(filas, errores: list):
+    """Valida cada fila contra `CrearAutor`, acumulando las inválidas en `errores`.
+
+    Args:
+        filas (Iterable[tuple[int, dict]]): Filas numeradas.
+        errores (list): Lista donde se registran las filas rechazadas.
+
+    Yields:
+        CrearAutor: Autores válidos.
+    """
+    for numero, fila in filas:
+        try:
+            yield CrearAutor.model_validate(fila)
+        except ValidationError as error:
+            errores.append({"linea": numero, "errores": error.errors(include_url=False)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa autores desde un archivo CSV o JSON-lines.")
+    parser.add_argument("archivo", type=Path, help="Ruta del archivo a importar")
+    parser.add_argument("--formato", choices=["csv", "jsonl"], help="Formato del archivo (por defecto, según la extensión)")
+    parser.add_argument("--actualizar", action="store_true", help="Actualizar los autores existentes en lugar de omitirlos")
+    args = parser.parse_args()
+
+    formato = args.formato or ("csv" if args.archivo.suffix.lower() == ".csv" else "jsonl")
+    errores = []
+
+    create_database()
+    with Session(engine) as session:
+        resultado = ingresar_autores_en_lote(
+            validar(leer_filas(args.archivo, formato, errores), errores),
+            session,
+            args.actualizar,
+        )
+
+    for error in errores:
+        print(f"Línea {error['linea']} inválida: {error['errores']}", file=sys.stderr)
+
+    print(
+        f"{resultado['procesados']} autores procesados "
+        f"({resultado['escritos']} escritos, {resultado['omitidos']} omitidos, {len(errores)} inválidos) "
+        f"en {resultado['segundos']} s -> {resultado['filas_por_segundo']} filas/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,28 @@
-from typing import Optional
+import logging
+from typing import Optional, List, Union
 from fastapi import HTTPException
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from sqlmodel import select
 from db.models import (
     Libro, Autor,
     DepositoLibro, DepositoAutores,
     LinkAutorLibro, LinkAutorLibroDeposito
 )
-from db.database import sessionDep
-from .schemas import CrearLibro, ActualizarLibro
+from db.database import sessionDep, version_asincrona
+from db import paginacion
+from db.paginacion import paginar, LIMITE_POR_DEFECTO
+from db import proyeccion
+from db.exportacion import exportar, Formato
+from db import busqueda
+from db.normalizacion import normalizar
+from db import deposito
+from db import cache
+from db import estadisticas
+from .schemas import CrearLibro, ActualizarLibro, ConsultarLibros, FiltrarLibros
+
+logger = logging.getLogger(__name__)
 
 
 def ingresar_libro(datos: CrearLibro, session: sessionDep):
@@ -18,15 +33,21 @@ def ingresar_libro(datos: CrearLibro, session: sessionDep):
         session (sessionDep): Sesión activa de la base de datos.
 
     Raises:
-        HTTPException: Si ya existe un libro con el mismo ISBN.
+        HTTPException: Si ya existe un libro con el mismo ISBN o un título equivalente.
         HTTPException: Si alguno de los autores no está registrado en la biblioteca.
 
     Returns:
         dict: Mensaje de confirmación con la información del libro creado y los autores asociados.
     """
-    existente = session.exec(select(Libro).where(Libro.ISBN == datos.ISBN)).first()
+    existente = session.exec(
+        select(Libro).where((Libro.ISBN == datos.ISBN) | (Libro.clave_titulo == normalizar(datos.titulo)))
+    ).first()
     if existente:
-        raise HTTPException(status_code=400, detail="Ya existe un libro con ese ISBN")
+        detalle = (
+            "Ya existe un libro con ese ISBN" if existente.ISBN == datos.ISBN
+            else f"Ya existe un libro con el título '{existente.titulo}'"
+        )
+        raise HTTPException(status_code=400, detail=detalle)
 
     nuevo_libro = Libro(
         titulo=datos.titulo,
@@ -43,7 +64,7 @@ def ingresar_libro(datos: CrearLibro, session: sessionDep):
 
     if datos.nombre_autores:
         for nombre in datos.nombre_autores:
-            autor = session.exec(select(Autor).where(Autor.nombre_apellidos == nombre)).first()
+            autor = session.exec(select(Autor).where(Autor.clave_nombre == normalizar(nombre))).first()
             if not autor:
                 raise HTTPException(
                     status_code=404,
@@ -55,44 +76,242 @@ def ingresar_libro(datos: CrearLibro, session: sessionDep):
 
         session.commit()
 
+    cache.invalidar(
+        libros=[nuevo_libro.clave_titulo],
+        autores=[normalizar(nombre) for nombre in datos.nombre_autores or []],
+    )
+
     return {
         "mensaje": "Libro creado correctamente",
-        "libro": nuevo_libro,
+        "libro": proyeccion.publico(nuevo_libro),
         "autores_vinculados": datos.nombre_autores,
     }
 
 
-def ver_libros(session: sessionDep, año_publicacion: Optional[int] = None):
-    """Obtiene todos los libros o filtra por año de publicación.
+TAMANO_LOTE_INGRESO = 1000
+
+
+def ingresar_libros_en_lote(datos: List[CrearLibro], session: sessionDep):
+    """Crea muchos libros a la vez resolviendo conflictos y autores por conjuntos.
+
+    Los libros se procesan en lotes de `TAMANO_LOTE_INGRESO`. Por cada lote se
+    consultan con un solo `IN` los ISBN y títulos ya registrados y los autores
+    mencionados; luego se insertan libros y vínculos con `executemany` y se
+    confirma una sola vez. Los libros inválidos se rechazan individualmente sin
+    afectar al resto del lote.
+
+    Args:
+        datos (List[CrearLibro]): Libros a registrar.
+        session (sessionDep): Sesión activa de la base de datos.
+
+    Returns:
+        dict: Cantidad de libros creados y detalle de los rechazados
+              (posición en la lista, ISBN y motivo).
+    """
+    creados = 0
+    rechazados = []
+    isbn_vistos = set()
+    titulos_vistos = set()
+
+    for inicio in range(0, len(datos), TAMANO_LOTE_INGRESO):
+        lote = datos[inicio:inicio + TAMANO_LOTE_INGRESO]
+
+        isbn_existentes = set(session.exec(
+            select(Libro.ISBN).where(Libro.ISBN.in_({d.ISBN for d in lote}))
+        ).all())
+        titulos_existentes = set(session.exec(
+            select(Libro.clave_titulo).where(Libro.clave_titulo.in_({normalizar(d.titulo) for d in lote}))
+        ).all())
+        claves_autores = {normalizar(nombre) for d in lote for nombre in (d.nombre_autores or [])}
+        ids_autores = dict(session.exec(
+            select(Autor.clave_nombre, Autor.id).where(Autor.clave_nombre.in_(claves_autores))
+        ).all()) if claves_autores else {}
+
+        aceptados = []
+        for posicion, libro in enumerate(lote, start=inicio):
+            clave_titulo = normalizar(libro.titulo)
+            faltantes = [n for n in (libro.nombre_autores or []) if normalizar(n) not in ids_autores]
+            if libro.ISBN in isbn_existentes or libro.ISBN in isbn_vistos:
+                motivo = "Ya existe un libro con ese ISBN"
+            elif clave_titulo in titulos_existentes or clave_titulo in titulos_vistos:
+                motivo = f"Ya existe un libro con el título '{libro.titulo}'"
+            elif faltantes:
+                motivo = f"Autores no registrados en la biblioteca: {', '.join(faltantes)}"
+            else:
+                isbn_vistos.add(libro.ISBN)
+                titulos_vistos.add(clave_titulo)
+                aceptados.append(libro)
+                continue
+            rechazados.append({"posicion": posicion, "ISBN": libro.ISBN, "motivo": motivo})
+
+        if not aceptados:
+            continue
+
+        filas = [libro.model_dump(exclude={"nombre_autores"}) for libro in aceptados]
+        ids_libros = dict(session.exec(
+            insert(Libro).returning(Libro.ISBN, Libro.id), params=filas
+        ).all())
+
+        vinculos = [
+            {"id_libros": ids_libros[libro.ISBN], "id_autor": id_autor}
+            for libro in aceptados
+            for id_autor in {ids_autores[normalizar(n)] for n in (libro.nombre_autores or [])}
+        ]
+        if vinculos:
+            session.exec(insert(LinkAutorLibro), params=vinculos)
+
+        session.commit()
+        creados += len(aceptados)
+        cache.invalidar(
+            libros=[normalizar(libro.titulo) for libro in aceptados],
+            autores={normalizar(n) for libro in aceptados for n in (libro.nombre_autores or [])},
+        )
+
+    return {
+        "mensaje": f"{creados} libros creados correctamente",
+        "creados": creados,
+        "rechazados": rechazados,
+    }
+
+
+# Campos de `sort=`: cada uno tiene un índice que empieza por su expresión.
+ORDEN_LIBROS = {
+    "titulo": (Libro.clave_titulo, False),
+    "año_publicacion": (Libro.año_publicacion, True),
+    "numero_paginas": (Libro.numero_paginas, True),
+    "editorial": (Libro.editorial, True),
+}
+
+
+def filtrar_libros(query, filtros: Optional[FiltrarLibros]):
+    """Agrega a la consulta las condiciones de los filtros indicados."""
+    if filtros is None:
+        return query
+    if filtros.año_publicacion is not None:
+        query = query.where(Libro.año_publicacion == filtros.año_publicacion)
+    if filtros.año_desde is not None:
+        query = query.where(Libro.año_publicacion >= filtros.año_desde)
+    if filtros.año_hasta is not None:
+        query = query.where(Libro.año_publicacion <= filtros.año_hasta)
+    if filtros.paginas_min is not None:
+        query = query.where(Libro.numero_paginas >= filtros.paginas_min)
+    if filtros.paginas_max is not None:
+        query = query.where(Libro.numero_paginas <= filtros.paginas_max)
+    if filtros.editorial is not None:
+        query = query.where(Libro.editorial == filtros.editorial)
+    if filtros.disponible is not None:
+        query = query.where(Libro.copias_disponibles > 0 if filtros.disponible else Libro.copias_disponibles == 0)
+    if filtros.pais_autor is not None:
+        query = query.where(Libro.id.in_(
+            select(LinkAutorLibro.id_libros)
+            .join(Autor, Autor.id == LinkAutorLibro.id_autor)
+            .where(Autor.pais_origen == filtros.pais_autor)
+        ))
+    return query
+
+
+def ver_libros(
+    session: sessionDep,
+    filtros: Optional[FiltrarLibros] = None,
+    limit: int = LIMITE_POR_DEFECTO,
+    after: Optional[Union[int, str]] = None,
+    fields: Optional[str] = None,
+    sort: Optional[str] = None
+):
+    """Obtiene los libros paginados, filtrados y ordenados en SQL.
 
     Args:
         session (sessionDep): Sesión activa de la base de datos.
-        año_publicacion (Optional[int], optional): Año específico de publicación. Por defecto None.
+        filtros (Optional[FiltrarLibros], optional): Años, páginas, editorial,
+            disponibilidad y país de algún autor. Por defecto sin filtros.
+        limit (int, optional): Cantidad máxima de libros por página.
+        after (Optional[Union[int, str]], optional): Cursor devuelto por la página anterior.
+        fields (Optional[str], optional): Columnas a devolver separadas por coma. Por defecto todas.
+        sort (Optional[str], optional): Campo de `ORDEN_LIBROS`, con `-` para descendente. Por defecto el id.
 
     Raises:
-        HTTPException: Si no se encuentran libros para el año indicado.
+        HTTPException: Si algún campo, el orden o el cursor no son válidos, o no se encuentran libros.
+
+    Returns:
+        dict: Libros de la página (`items`) y cursor de la siguiente (`next_cursor`).
+    """
+    orden = paginacion.orden(ORDEN_LIBROS, sort)
+    query = filtrar_libros(select(*proyeccion.columnas(Libro, fields)[0]), filtros)
+
+    pagina = paginar(session, query, Libro.id, limit, after, orden)
+
+    if not pagina["items"]:
+        raise HTTPException(status_code=404, detail="No se encontraron libros con esos filtros")
+
+    return pagina
+
+
+def contar_libros(session: sessionDep, filtros: Optional[FiltrarLibros] = None) -> int:
+    """Cuenta los libros que cumplen los filtros, sin leer sus filas.
+
+    Sin filtros (o solo con `año_publicacion`) el total sale de los contadores
+    que mantienen los triggers de `db/estadisticas.py`, con un costo que no
+    depende del tamaño de la tabla; con otros filtros se usa `COUNT(*)` con las
+    mismas condiciones que el listado.
+
+    Args:
+        session (sessionDep): Sesión activa de la base de datos.
+        filtros (Optional[FiltrarLibros], optional): Los mismos filtros del listado.
 
     Returns:
-        list[Libro]: Lista de libros encontrados.
+        int: Cantidad de libros.
     """
-    query = select(Libro)
-    if año_publicacion:
-        query = query.where(Libro.año_publicacion == año_publicacion)
+    indicados = filtros.model_dump(exclude_none=True) if filtros else {}
+    if not indicados:
+        return estadisticas.contador(session, "libros")
+    if indicados.keys() == {"año_publicacion"}:
+        return estadisticas.contador(session, "libros_por_año", str(filtros.año_publicacion))
+    return session.exec(filtrar_libros(select(func.count()).select_from(Libro), filtros)).one()
+
 
-    libros = session.exec(query).all()
+def buscar_libros(q: str, session: sessionDep, limit: int = LIMITE_POR_DEFECTO, offset: int = 0):
+    """Busca libros por palabras en el título, el resumen o la editorial.
 
-    if not libros:
-        raise HTTPException(status_code=404, detail="No se encontraron libros para ese año")
+    Usa el índice FTS5 `libro_fts` y ordena los resultados por relevancia (bm25).
 
-    return libros
+    Args:
+        q (str): Texto a buscar.
+        session (sessionDep): Sesión activa de la base de datos.
+        limit (int, optional): Cantidad máxima de resultados por página.
+        offset (int, optional): Cantidad de resultados a omitir.
 
+    Raises:
+        HTTPException: Si la búsqueda no contiene palabras o no hay coincidencias.
 
-def ver_libro_titulo(titulo: str, session: sessionDep):
+    Returns:
+        dict: Resultados de la página (`items`) y el `offset` de la siguiente
+              (`next_offset`), que es `None` cuando no hay más resultados.
+    """
+    expresion = busqueda.expresion_fts(q)
+    if not expresion:
+        raise HTTPException(status_code=400, detail="La búsqueda debe contener al menos una palabra")
+
+    filas = busqueda.buscar(session, expresion, limit + 1, offset)
+    if not filas:
+        raise HTTPException(status_code=404, detail=f"No se encontraron libros para '{q}'")
+
+    return {
+        "items": [dict(fila._mapping) for fila in filas[:limit]],
+        "next_offset": offset + limit if len(filas) > limit else None,
+    }
+
+
+def ver_libro_titulo(titulo: str, session: sessionDep, version: Optional[str] = None):
     """Busca un libro por su título y muestra su información junto a los autores.
 
+    La respuesta se sirve desde `cache.detalles` mientras ninguna escritura
+    afecte al libro o a sus autores y la versión del catálogo no cambie.
+
     Args:
         titulo (str): Título del libro a consultar.
         session (sessionDep): Sesión activa de la base de datos.
+        version (Optional[str], optional): ETag de la petición; una entrada
+            en caché calculada con otra versión no se reutiliza.
 
     Raises:
         HTTPException: Si el libro no existe.
@@ -100,10 +319,23 @@ def ver_libro_titulo(titulo: str, session: sessionDep):
     Returns:
         dict: Información detallada del libro y sus autores.
     """
-    libro = session.exec(select(Libro).where(Libro.titulo == titulo)).first()
+    clave = normalizar(titulo)
+    return cache.detalles.obtener_o_calcular(
+        cache.clave_libro(clave), lambda: _detalle_libro(clave, titulo, session), version
+    )
+
+
+def _detalle_libro(clave: str, titulo: str, session: sessionDep):
+    libro = session.exec(
+        select(Libro).options(selectinload(Libro.autores)).where(Libro.clave_titulo == clave)
+    ).first()
     if not libro:
         raise HTTPException(status_code=404, detail=f"El libro '{titulo}' no existe")
 
+    return _serializar_libro(libro)
+
+
+def _serializar_libro(libro: Libro) -> dict:
     autores = libro.autores
     return {
         "titulo": libro.titulo,
@@ -113,11 +345,48 @@ def ver_libro_titulo(titulo: str, session: sessionDep):
         "editorial": libro.editorial,
         "año_publicacion": libro.año_publicacion,
         "copias_disponibles": libro.copias_disponibles,
-        f"Auto{'res' if len(autores) > 1 else 'r'}": autores,
+        f"Auto{'res' if len(autores) > 1 else 'r'}": [proyeccion.publico(a) for a in autores],
         "ISBN": libro.ISBN
     }
 
 
+def consultar_libros(datos: ConsultarLibros, session: sessionDep):
+    """Busca en bloque varios libros por ISBN y por título.
+
+    Todos los libros se resuelven con un solo `IN` sobre `ISBN` y
+    `clave_titulo`, y sus autores con una única carga `selectinload`, en lugar
+    de una consulta de detalle por libro.
+
+    Args:
+        datos (ConsultarLibros): ISBN y títulos a buscar.
+        session (sessionDep): Sesión activa de la base de datos.
+
+    Returns:
+        dict: Por cada ISBN (`ISBN`) y título (`titulos`) pedido, el detalle del
+              libro como en `ver_libro_titulo`, o `None` si no existe; y en
+              `no_encontrados` los ISBN y títulos sin resultado.
+    """
+    claves = {titulo: normalizar(titulo) for titulo in datos.titulos}
+    libros = session.exec(
+        select(Libro)
+        .options(selectinload(Libro.autores))
+        .where(Libro.ISBN.in_(set(datos.ISBN)) | Libro.clave_titulo.in_(set(claves.values())))
+    ).all() if datos.ISBN or claves else []
+
+    detalles = {libro.id: _serializar_libro(libro) for libro in libros}
+    por_isbn = {libro.ISBN: detalles[libro.id] for libro in libros}
+    por_clave = {libro.clave_titulo: detalles[libro.id] for libro in libros}
+
+    return {
+        "ISBN": {isbn: por_isbn.get(isbn) for isbn in datos.ISBN},
+        "titulos": {titulo: por_clave.get(clave) for titulo, clave in claves.items()},
+        "no_encontrados": {
+            "ISBN": [isbn for isbn in dict.fromkeys(datos.ISBN) if isbn not in por_isbn],
+            "titulos": [titulo for titulo, clave in claves.items() if clave not in por_clave],
+        },
+    }
+
+
 def actualizar_libro_existente(session: sessionDep, data: ActualizarLibro, titulo: str):
     """Actualiza los datos de un libro existente.
 
@@ -132,7 +401,7 @@ def actualizar_libro_existente(session: sessionDep, data: ActualizarLibro, titul
     Returns:
         dict: Mensaje confirmando la actualización.
     """
-    libro = session.exec(select(Libro).where(Libro.titulo == titulo)).first()
+    libro = session.exec(select(Libro).where(Libro.clave_titulo == normalizar(titulo))).first()
     if not libro:
         raise HTTPException(status_code=404, detail=f"El libro '{titulo}' no existe")
 
@@ -141,19 +410,97 @@ def actualizar_libro_existente(session: sessionDep, data: ActualizarLibro, titul
 
     session.add(libro)
     session.commit()
+    _, autores = cache.vinculados(session, LinkAutorLibro.id_libros == libro.id)
+    cache.invalidar(libros=[libro.clave_titulo], autores=autores)
     return {"message": f"El libro '{titulo}' fue actualizado correctamente"}
 
 
+def prestar_libro(isbn: str, session: sessionDep):
+    """Presta una copia de un libro descontándola de `copias_disponibles`.
+
+    El descuento es un único `UPDATE ... WHERE copias_disponibles > 0`, sin
+    leer antes el libro: SQLite serializa las escrituras y cada una ve el valor
+    confirmado por la anterior, así que los préstamos simultáneos de un mismo
+    título no se pisan ni dejan el inventario en negativo. Solo cuando no se
+    actualiza ninguna fila se consulta si el libro existe.
+
+    Args:
+        isbn (str): ISBN del libro a prestar.
+        session (sessionDep): Sesión activa de la base de datos.
+
+    Raises:
+        HTTPException: Si el libro no existe (404) o no le quedan copias (400).
+
+    Returns:
+        dict: Mensaje de confirmación y copias que quedan disponibles.
+    """
+    libro = session.exec(
+        update(Libro)
+        .where(Libro.ISBN == isbn, Libro.copias_disponibles > 0)
+        .values(copias_disponibles=Libro.copias_disponibles - 1)
+        .returning(Libro.titulo, Libro.clave_titulo, Libro.copias_disponibles)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if not libro:
+        existe = session.exec(select(Libro.id).where(Libro.ISBN == isbn)).first()
+        if existe is None:
+            raise HTTPException(status_code=404, detail=f"No existe un libro con ISBN '{isbn}'")
+        raise HTTPException(status_code=400, detail="No quedan copias disponibles de ese libro")
+
+    session.commit()
+    cache.invalidar(libros=[libro.clave_titulo])
+    return {
+        "message": f"Se prestó una copia de '{libro.titulo}'",
+        "copias_disponibles": libro.copias_disponibles,
+    }
+
+
+def devolver_libro(isbn: str, session: sessionDep):
+    """Registra la devolución de una copia de un libro.
+
+    Como el préstamo, es un único `UPDATE` condicional que suma la copia sin
+    leer antes el libro.
+
+    Args:
+        isbn (str): ISBN del libro devuelto.
+        session (sessionDep): Sesión activa de la base de datos.
+
+    Raises:
+        HTTPException: Si el libro no existe.
+
+    Returns:
+        dict: Mensaje de confirmación y copias disponibles tras la devolución.
+    """
+    libro = session.exec(
+        update(Libro)
+        .where(Libro.ISBN == isbn)
+        .values(copias_disponibles=Libro.copias_disponibles + 1)
+        .returning(Libro.titulo, Libro.clave_titulo, Libro.copias_disponibles)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if not libro:
+        raise HTTPException(status_code=404, detail=f"No existe un libro con ISBN '{isbn}'")
+
+    session.commit()
+    cache.invalidar(libros=[libro.clave_titulo])
+    return {
+        "message": f"Se devolvió una copia de '{libro.titulo}'",
+        "copias_disponibles": libro.copias_disponibles,
+    }
+
+
 def mover_a_deposito_libro(titulo: str, session: sessionDep):
     """Mueve un libro y sus autores al depósito, manteniendo sus relaciones.
 
-    Esta función crea una copia del libro y sus autores en las tablas de depósito.
+    Todo el traslado es una sola unidad de trabajo con sentencias por conjuntos:
+    - El libro y sus autores se copian con `INSERT ... SELECT`.
     - Si el autor ya existe en el depósito, se reutiliza.
-    - Si el libro ya está en el depósito, se evita la duplicación.
     - La relación entre libro y autor se conserva en `LinkAutorLibroDeposito`.
+    - El libro y sus vínculos se eliminan del catálogo con `DELETE`.
 
-    Si ocurre un error en la transacción, se revierte la sesión para evitar corrupción
-    de datos y se lanza una excepción HTTP con un mensaje descriptivo.
+    Las validaciones se hacen antes de escribir y se confirma una sola vez; si
+    ocurre un error en la transacción, se revierte la sesión para evitar
+    corrupción de datos y se lanza una excepción HTTP con un mensaje descriptivo.
 
     Args:
         titulo (str): Título del libro que se desea mover al depósito.
@@ -162,103 +509,100 @@ def mover_a_deposito_libro(titulo: str, session: sessionDep):
     Raises:
         HTTPException:
             - 404: Si el libro no se encuentra en el catálogo activo.
-            - 400: Si el libro ya existe en el depósito.
-            - 500: Si ocurre un error inesperado durante el proceso.
+            - 400: Si el libro ya existe en el depósito o no tiene autores.
+            - 409: Si el traslado viola una restricción del depósito.
+            - 500: Si ocurre un error inesperado durante el proceso (se registra en el log).
 
     Returns:
         dict: Mensaje de confirmación indicando que el libro y sus autores
               fueron movidos correctamente al depósito.
     """
-    libro = session.exec(select(Libro).where(Libro.titulo == titulo)).first()
+    libro = session.exec(
+        select(Libro.id, Libro.ISBN).where(Libro.clave_titulo == normalizar(titulo))
+    ).first()
     if not libro:
         raise HTTPException(status_code=404, detail="Libro no encontrado en el catálogo activo")
 
     existente = session.exec(
-        select(DepositoLibro).where(DepositoLibro.ISBN == libro.ISBN)
+        select(DepositoLibro.id).where(DepositoLibro.ISBN == libro.ISBN)
     ).first()
     if existente:
         raise HTTPException(status_code=400, detail="El libro ya está en el depósito")
 
-    libro_deposito = DepositoLibro(
-        id_libro_original=libro.id,
-        titulo=libro.titulo,
-        resumen=libro.resumen,
-        numero_paginas=libro.numero_paginas,
-        editorial=libro.editorial,
-        año_publicacion=libro.año_publicacion,
-        copias_disponibles=libro.copias_disponibles,
-        ISBN=libro.ISBN,
-    )
-    session.add(libro_deposito)
-    session.commit()
-    session.refresh(libro_deposito)
-
-    if not libro.autores:
+    tiene_autores = session.exec(
+        select(LinkAutorLibro.id_autor).where(LinkAutorLibro.id_libros == libro.id).limit(1)
+    ).first()
+    if tiene_autores is None:
         raise HTTPException(
             status_code=400,
             detail=f"El libro '{titulo}' no tiene autores asociados en el catálogo.",
         )
 
-    for autor in libro.autores:
-        autor_deposito = session.exec(
-            select(DepositoAutores).where(DepositoAutores.nombre_apellidos == autor.nombre_apellidos)
-        ).first()
-
-        if not autor_deposito:
-            autor_deposito = DepositoAutores(
-                id_autor_original=autor.id,
-                nombre_apellidos=autor.nombre_apellidos,
-                pais_origen=autor.pais_origen,
-                descripcion=autor.descripcion,
-                año_nacimiento=autor.año_nacimiento,
-                año_muerte=autor.año_muerte,
-            )
-            session.add(autor_deposito)
-            session.commit()
-            session.refresh(autor_deposito)
-
-
-        relacion_existente = session.exec(
-            select(LinkAutorLibroDeposito).where(
-                (LinkAutorLibroDeposito.id_autor_deposito == autor_deposito.id)
-                & (LinkAutorLibroDeposito.id_libro_deposito == libro_deposito.id)
-            )
-        ).first()
-
-        if not relacion_existente:
-            session.add(
-                LinkAutorLibroDeposito(
-                    id_autor_deposito=autor_deposito.id,
-                    id_libro_deposito=libro_deposito.id,
-                 )
-            )
+    autores_del_libro = select(LinkAutorLibro.id_autor).where(LinkAutorLibro.id_libros == libro.id)
+    _, autores_afectados = cache.vinculados(session, LinkAutorLibro.id_libros == libro.id)
+    try:
+        deposito.copiar_libros_a_deposito(session, Libro.id == libro.id)
+        deposito.copiar_autores_a_deposito(session, Autor.id.in_(autores_del_libro))
+        deposito.vincular_en_deposito(session, LinkAutorLibro.id_libros == libro.id)
+        deposito.eliminar_del_catalogo(session, Libro, LinkAutorLibro.id_libros == libro.id, Libro.id == libro.id)
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail=f"El traslado del libro '{titulo}' choca con el contenido actual del depósito; vuelva a intentarlo",
+        )
+    except Exception:
+        session.rollback()
+        logger.exception("Falló el traslado al depósito del libro '%s'", titulo)
+        raise HTTPException(status_code=500, detail=f"No se pudo mover el libro '{titulo}' al depósito")
 
-    session.delete(libro)
-    session.commit()
+    cache.invalidar(libros=[normalizar(titulo)], autores=autores_afectados)
 
     return {
             "message": f"El libro '{titulo}' y sus autores fueron movidos correctamente al depósito."
         }
 
 
-def ver_deposito_libros(session: sessionDep):
-    """Muestra todos los libros que se encuentran actualmente en el depósito.
+def ver_deposito_libros(
+    session: sessionDep,
+    limit: int = LIMITE_POR_DEFECTO,
+    after: Optional[int] = None,
+    fields: Optional[str] = None
+):
+    """Muestra los libros que se encuentran en el depósito, paginados por id.
 
     Args:
         session (sessionDep): Sesión activa de la base de datos.
+        limit (int, optional): Cantidad máxima de libros por página.
+        after (Optional[int], optional): Cursor devuelto por la página anterior.
+        fields (Optional[str], optional): Columnas a devolver separadas por coma. Por defecto todas.
 
     Raises:
-        HTTPException: Si no hay libros en el depósito.
+        HTTPException: Si algún campo no existe o no hay libros en el depósito.
 
     Returns:
-        list[DepositoLibro]: Lista de libros en el depósito.
+        dict: Libros del depósito (`items`) y cursor de la siguiente página (`next_cursor`).
     """
-    libros = session.exec(select(DepositoLibro)).all()
+    query = select(*proyeccion.columnas(DepositoLibro, fields)[0])
+    pagina = paginar(session, query, DepositoLibro.id, limit, after)
 
-    if not libros:
+    if not pagina["items"]:
         raise HTTPException(status_code=404, detail=f"No se encontraron libros")
 
-    return libros
+    return pagina
+
+
+def contar_deposito_libros(session: sessionDep) -> int:
+    """Devuelve la cantidad de libros en el depósito desde su contador mantenido.
+
+    Args:
+        session (sessionDep): Sesión activa de la base de datos.
+
+    Returns:
+        int: Cantidad de libros en el depósito.
+    """
+    return estadisticas.contador(session, "deposito_libros")
 
 
 def buscar_libro_en_deposito(titulo: str, session: sessionDep):
@@ -274,7 +618,11 @@ def buscar_libro_en_deposito(titulo: str, session: sessionDep):
     Returns:
         dict: Información del libro y sus autores asociados en el depósito.
     """
-    libro = session.exec(select(DepositoLibro).where(DepositoLibro.titulo == titulo)).first()
+    libro = session.exec(
+        select(DepositoLibro)
+        .options(selectinload(DepositoLibro.autores))
+        .where(DepositoLibro.clave_titulo == normalizar(titulo))
+    ).first()
     if not libro:
         raise HTTPException(status_code=404, detail=f"El libro '{titulo}' no está en el depósito")
 
@@ -287,63 +635,174 @@ def buscar_libro_en_deposito(titulo: str, session: sessionDep):
     }
 
 
+def _restaurar_desde_deposito(ids: List[int], session: sessionDep):
+    """Restaura al catálogo los libros del depósito indicados y sus autores.
+
+    Libros, autores y vínculos se insertan con `INSERT ... SELECT`; los autores
+    que ya están en el catálogo se reutilizan. No confirma la transacción.
+    """
+    vinculos = LinkAutorLibroDeposito.id_libro_deposito.in_(ids)
+    # Sin DISTINCT: solo alimenta un IN, y deduplicar los vínculos del lote en Python
+    # evita ordenarlos en una tabla temporal.
+    ids_autores = set(session.exec(select(LinkAutorLibroDeposito.id_autor_deposito).where(vinculos)).all())
+
+    deposito.restaurar_libros(session, DepositoLibro.id.in_(ids))
+    deposito.restaurar_autores(session, DepositoAutores.id.in_(ids_autores))
+    deposito.vincular_en_catalogo(session, vinculos)
+    deposito.eliminar_del_deposito(session, DepositoLibro, vinculos, DepositoLibro.id.in_(ids))
+    deposito.limpiar_autores_huerfanos(session, ids_autores)
+
+
+def _invalidar_restaurados(session: sessionDep, claves: List[str]):
+    """Invalida en caché los libros restaurados y los autores con los que quedaron vinculados."""
+    _, autores = cache.vinculados(session, Libro.clave_titulo.in_(claves))
+    cache.invalidar(libros=claves, autores=autores)
+
+
 def sacar_libro_de_deposito(titulo: str, session: sessionDep):
     """Restaura un libro y sus autores desde el depósito al catálogo principal.
 
+    Todo se hace en una única transacción con sentencias por conjuntos.
+
     Args:
         titulo (str): Título del libro a restaurar.
         session (sessionDep): Sesión activa de la base de datos.
 
     Raises:
-        HTTPException: Si el libro no se encuentra en el depósito.
+        HTTPException: Si el libro no se encuentra en el depósito, si ya existe
+            en el catálogo un libro con su ISBN o título, o si falla la restauración.
 
     Returns:
         dict: Mensaje de confirmación indicando que el libro fue restaurado.
     """
-    libro_deposito = session.exec(select(DepositoLibro).where(DepositoLibro.titulo == titulo)).first()
+    libro_deposito = session.exec(
+        select(DepositoLibro.id, DepositoLibro.ISBN, DepositoLibro.clave_titulo)
+        .where(DepositoLibro.clave_titulo == normalizar(titulo))
+    ).first()
     if not libro_deposito:
         raise HTTPException(status_code=404, detail=f"El libro '{titulo}' no está en el depósito")
 
-    nuevo_libro = Libro(
-        titulo=libro_deposito.titulo,
-        resumen=libro_deposito.resumen,
-        numero_paginas=libro_deposito.numero_paginas,
-        editorial=libro_deposito.editorial,
-        año_publicacion=libro_deposito.año_publicacion,
-        copias_disponibles=libro_deposito.copias_disponibles,
-        ISBN=libro_deposito.ISBN
-    )
-    session.add(nuevo_libro)
-    session.commit()
-    session.refresh(nuevo_libro)
+    en_catalogo = session.exec(
+        select(Libro.id).where(
+            (Libro.ISBN == libro_deposito.ISBN) | (Libro.clave_titulo == libro_deposito.clave_titulo)
+        )
+    ).first()
+    if en_catalogo is not None:
+        raise HTTPException(status_code=400, detail=f"El libro '{titulo}' ya existe en el catálogo")
+
+    try:
+        _restaurar_desde_deposito([libro_deposito.id], session)
+        session.commit()
+    except Exception as error:
+        session.rollback()
+        raise HTTPException(status_code=500, detail=f"No se pudo restaurar el libro '{titulo}': {error}")
+
+    _invalidar_restaurados(session, [libro_deposito.clave_titulo])
 
-    relaciones = session.exec(
-        select(LinkAutorLibroDeposito).where(LinkAutorLibroDeposito.id_libro_deposito == libro_deposito.id)
+    return {"message": f"El libro '{titulo}' fue restaurado al catálogo correctamente"}
+
+
+def sacar_libros_de_deposito_en_lote(titulos: List[str], session: sessionDep):
+    """Restaura varios libros (y sus autores) desde el depósito en una sola transacción.
+
+    Args:
+        titulos (List[str]): Títulos de los libros a restaurar.
+        session (sessionDep): Sesión activa de la base de datos.
+
+    Raises:
+        HTTPException: Si falla la restauración (no se aplica ningún cambio).
+
+    Returns:
+        dict: Libros restaurados, títulos que no están en el depósito y libros
+              rechazados porque su ISBN o título ya existe en el catálogo.
+    """
+    claves = {normalizar(titulo): titulo for titulo in titulos}
+    encontrados = session.exec(
+        select(DepositoLibro.id, DepositoLibro.titulo, DepositoLibro.ISBN, DepositoLibro.clave_titulo)
+        .where(DepositoLibro.clave_titulo.in_(claves))
     ).all()
+    no_encontrados = [claves[c] for c in claves.keys() - {fila.clave_titulo for fila in encontrados}]
 
-    for rel in relaciones:
-        autor_deposito = session.exec(
-            select(DepositoAutores).where(DepositoAutores.id == rel.id_autor_deposito)
-        ).first()
-        if autor_deposito:
-            autor_catalogo = session.exec(
-                select(Autor).where(Autor.nombre_apellidos == autor_deposito.nombre_apellidos)
-            ).first()
-            if not autor_catalogo:
-                autor_catalogo = Autor(
-                    nombre_apellidos=autor_deposito.nombre_apellidos,
-                    pais_origen=autor_deposito.pais_origen,
-                    descripcion=autor_deposito.descripcion,
-                    año_nacimiento=autor_deposito.año_nacimiento,
-                    año_muerte=autor_deposito.año_muerte,
-                )
-                session.add(autor_catalogo)
-                session.commit()
-                session.refresh(autor_catalogo)
+    en_catalogo = session.exec(
+        select(Libro.ISBN, Libro.clave_titulo).where(
+            Libro.ISBN.in_([fila.ISBN for fila in encontrados])
+            | Libro.clave_titulo.in_([fila.clave_titulo for fila in encontrados])
+        )
+    ).all() if encontrados else []
+    isbn_catalogo = {fila.ISBN for fila in en_catalogo}
+    claves_catalogo = {fila.clave_titulo for fila in en_catalogo}
+
+    restaurables = [
+        fila for fila in encontrados
+        if fila.ISBN not in isbn_catalogo and fila.clave_titulo not in claves_catalogo
+    ]
+    rechazados = [fila.titulo for fila in encontrados if fila not in restaurables]
+
+    if restaurables:
+        try:
+            _restaurar_desde_deposito([fila.id for fila in restaurables], session)
+            session.commit()
+        except Exception as error:
+            session.rollback()
+            raise HTTPException(status_code=500, detail=f"No se pudo restaurar los libros: {error}")
 
-            session.add(LinkAutorLibro(id_libros=nuevo_libro.id, id_autor=autor_catalogo.id))
+        _invalidar_restaurados(session, [fila.clave_titulo for fila in restaurables])
 
-    session.delete(libro_deposito)
-    session.commit()
+    return {
+        "message": f"{len(restaurables)} libros restaurados al catálogo",
+        "restaurados": [fila.titulo for fila in restaurables],
+        "no_encontrados": no_encontrados,
+        "ya_en_catalogo": rechazados,
+    }
 
-    return {"message": f"El libro '{titulo}' fue restaurado al catálogo correctamente"}
\ No newline at end of file
+
+def exportar_libros(formato: Formato = "ndjson", deposito: bool = False, fields: Optional[str] = None):
+    """Exporta en streaming todos los libros del catálogo o del depósito.
+
+    Cada fila incluye los nombres de sus autores, resueltos por lotes a
+    partir de `LinkAutorLibro` (o `LinkAutorLibroDeposito` en el depósito).
+
+    Args:
+        formato (Formato, optional): `ndjson` o `csv`. Por defecto `ndjson`.
+        deposito (bool, optional): Si es True exporta los libros del depósito.
+        fields (Optional[str], optional): Campos a exportar separados por coma
+            (columnas y/o `autores`). Por defecto todos.
+
+    Returns:
+        StreamingResponse: Respuesta que emite los libros lote por lote.
+    """
+    if deposito:
+        def autores_de(ids):
+            return (
+                select(LinkAutorLibroDeposito.id_libro_deposito, DepositoAutores.nombre_apellidos)
+                .join(DepositoAutores, DepositoAutores.id == LinkAutorLibroDeposito.id_autor_deposito)
+                .where(LinkAutorLibroDeposito.id_libro_deposito.in_(ids))
+            )
+        return exportar(DepositoLibro, autores_de, "autores", formato, "deposito_libros", fields)
+
+    def autores_de(ids):
+        return (
+            select(LinkAutorLibro.id_libros, Autor.nombre_apellidos)
+            .join(Autor, Autor.id == LinkAutorLibro.id_autor)
+            .where(LinkAutorLibro.id_libros.in_(ids))
+        )
+    return exportar(Libro, autores_de, "autores", formato, "libros", fields)
+
+
+# Versiones asíncronas (AsyncSession) usadas por las rutas.
+ingresar_libro_async = version_asincrona(ingresar_libro)
+ingresar_libros_en_lote_async = version_asincrona(ingresar_libros_en_lote)
+ver_libros_async = version_asincrona(ver_libros)
+contar_libros_async = version_asincrona(contar_libros)
+buscar_libros_async = version_asincrona(buscar_libros)
+ver_libro_titulo_async = version_asincrona(ver_libro_titulo)
+consultar_libros_async = version_asincrona(consultar_libros)
+actualizar_libro_existente_async = version_asincrona(actualizar_libro_existente)
+prestar_libro_async = version_asincrona(prestar_libro)
+devolver_libro_async = version_asincrona(devolver_libro)
+mover_a_deposito_libro_async = version_asincrona(mover_a_deposito_libro)
+ver_deposito_libros_async = version_asincrona(ver_deposito_libros)
+contar_deposito_libros_async = version_asincrona(contar_deposito_libros)
+buscar_libro_en_deposito_async = version_asincrona(buscar_libro_en_deposito)
+sacar_libro_de_deposito_async = version_asincrona(sacar_libro_de_deposito)
+sacar_libros_de_deposito_en_lote_async = version_asincrona(sacar_libros_de_deposito_en_lote)
@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Query
-from typing import Optional
-from db.database import sessionDep
-from .schemas import CrearLibro, ActualizarLibro
+from fastapi import APIRouter, Depends, Query, Request, Response
+from typing import Annotated, Optional, List
+from db.database import asyncSessionDep, readSessionDep
+from db.paginacion import limitQuery, afterQuery, cursorQuery, sortQuery, countQuery, CABECERA_TOTAL, LIMITE_POR_DEFECTO
+from db.exportacion import formatoQuery
+from db.proyeccion import fieldsQuery
+from db.condicional import condicional, TABLAS_CATALOGO, TABLAS_DEPOSITO
+from .schemas import CrearLibro, ActualizarLibro, ConsultarLibros, FiltrarLibros
 from .crud import (
-    ingresar_libro,
-    ver_libro_titulo,
-    ver_libros,
-    actualizar_libro_existente,
-    mover_a_deposito_libro,
-    ver_deposito_libros,
-    buscar_libro_en_deposito,
-    sacar_libro_de_deposito
+    ingresar_libro_async,
+    ingresar_libros_en_lote_async,
+    buscar_libros_async,
+    ver_libro_titulo_async,
+    consultar_libros_async,
+    ver_libros_async,
+    contar_libros_async,
+    actualizar_libro_existente_async,
+    prestar_libro_async,
+    devolver_libro_async,
+    mover_a_deposito_libro_async,
+    ver_deposito_libros_async,
+    contar_deposito_libros_async,
+    buscar_libro_en_deposito_async,
+    sacar_libro_de_deposito_async,
+    sacar_libros_de_deposito_en_lote_async,
+    exportar_libros
 )
 
 router = APIRouter(
@@ -19,35 +32,126 @@ router = APIRouter(
     responses={404: {"description": "No encontrado"}},
 )
 
+
+def filtros_libros(
+    año_publicacion: Optional[int] = Query(None, description="Año de publicación exacto"),
+    año_desde: Optional[int] = Query(None, description="Publicados desde este año (inclusive)"),
+    año_hasta: Optional[int] = Query(None, description="Publicados hasta este año (inclusive)"),
+    paginas_min: Optional[int] = Query(None, ge=0, description="Mínimo de páginas"),
+    paginas_max: Optional[int] = Query(None, ge=0, description="Máximo de páginas"),
+    editorial: Optional[str] = Query(None, description="Editorial exacta"),
+    disponible: Optional[bool] = Query(None, description="true: con copias disponibles; false: sin copias"),
+    pais_autor: Optional[str] = Query(None, description="Con al menos un autor de este país"),
+) -> FiltrarLibros:
+    return FiltrarLibros(
+        año_publicacion=año_publicacion, año_desde=año_desde, año_hasta=año_hasta,
+        paginas_min=paginas_min, paginas_max=paginas_max, editorial=editorial,
+        disponible=disponible, pais_autor=pais_autor,
+    )
+
+
+filtrosLibrosDep = Annotated[FiltrarLibros, Depends(filtros_libros)]
+
+
 @router.post("/", summary="Crear nuevo libro")
-def crear_libro(data: CrearLibro, session: sessionDep):
-    return ingresar_libro(data, session)
+async def crear_libro(data: CrearLibro, session: asyncSessionDep):
+    return await ingresar_libro_async(data, session)
+
+@router.post("/bulk", summary="Crear muchos libros en una sola petición")
+async def crear_libros_en_lote(data: List[CrearLibro], session: asyncSessionDep):
+    return await ingresar_libros_en_lote_async(data, session)
+
+# `pais_autor` lee `autor` y `linkautorlibro`: el ETag depende de las tres tablas.
+@router.get("/", summary="Listar libros, filtrar por año, páginas, editorial, disponibilidad o país del autor y ordenar",
+            dependencies=[condicional(*TABLAS_CATALOGO)])
+async def listar_libros(session: readSessionDep,
+                  response: Response,
+                  filtros: filtrosLibrosDep,
+                  limit: limitQuery = LIMITE_POR_DEFECTO,
+                  after: cursorQuery = None,
+                  fields: fieldsQuery = None,
+                  sort: sortQuery = None,
+                  count: countQuery = False):
+    pagina = await ver_libros_async(session, filtros, limit, after, fields, sort)
+    if count:
+        response.headers[CABECERA_TOTAL] = str(await contar_libros_async(session, filtros))
+    return pagina
+
+@router.head("/", summary="Total de libros que cumplen los filtros (X-Total-Count), sin cuerpo",
+             dependencies=[condicional(*TABLAS_CATALOGO)])
+async def contar_libros(request: Request, session: readSessionDep, filtros: filtrosLibrosDep):
+    total = await contar_libros_async(session, filtros)
+    return Response(headers={CABECERA_TOTAL: str(total), "ETag": request.state.etag})
 
-@router.get("/", summary="Listar libros y/o filtrar por año")
-def listar_libros(session: sessionDep,
-                  año_publicacion: Optional[int] = Query(None, description="Filtrar por eaño")):
-    return ver_libros(session, año_publicacion)
+@router.get("/export", summary="Exportar todos los libros en NDJSON o CSV", dependencies=[condicional(*TABLAS_CATALOGO)])
+def exportar_catalogo_libros(request: Request, formato: formatoQuery = "ndjson", fields: fieldsQuery = None):
+    respuesta = exportar_libros(formato, fields=fields)
+    respuesta.headers["ETag"] = request.state.etag
+    return respuesta
 
-@router.get("/{titulo}", summary="Buscar un libro por el titulo")
-def obtener_libro(titulo: str, session: sessionDep):
-    return ver_libro_titulo(titulo, session)
+@router.get("/buscar", summary="Buscar libros por palabras en título, resumen o editorial", dependencies=[condicional("libro")])
+async def buscar_libros_texto(session: readSessionDep,
+                        q: str = Query(..., min_length=1, description="Palabras a buscar"),
+                        limit: limitQuery = LIMITE_POR_DEFECTO,
+                        offset: int = Query(0, ge=0, description="Resultados a omitir")):
+    return await buscar_libros_async(q, session, limit, offset)
+
+@router.post("/lookup", summary="Buscar varios libros por ISBN o título en una sola petición")
+async def consultar_varios_libros(data: ConsultarLibros, session: readSessionDep):
+    return await consultar_libros_async(data, session)
+
+@router.get("/{titulo}", summary="Buscar un libro por el titulo", dependencies=[condicional(*TABLAS_CATALOGO)])
+async def obtener_libro(titulo: str, request: Request, session: readSessionDep):
+    return await ver_libro_titulo_async(titulo, session, request.state.etag)
 
 @router.put("/{titulo}", summary="Actualizar información de un libro")
-def actualizar_libro(titulo: str, data: ActualizarLibro, session: sessionDep):
-    return actualizar_libro_existente(session, data, titulo)
+async def actualizar_libro(titulo: str, data: ActualizarLibro, session: asyncSessionDep):
+    return await actualizar_libro_existente_async(session, data, titulo)
+
+@router.post("/{isbn}/prestar", summary="Prestar una copia de un libro")
+async def prestar(isbn: str, session: asyncSessionDep):
+    return await prestar_libro_async(isbn, session)
+
+@router.post("/{isbn}/devolver", summary="Devolver una copia de un libro")
+async def devolver(isbn: str, session: asyncSessionDep):
+    return await devolver_libro_async(isbn, session)
 
 @router.delete("/deposito/{titulo}", summary="Mover libro al depósito")
-def eliminar_libro(titulo: str, session: sessionDep):
-    return mover_a_deposito_libro(titulo, session)
+async def eliminar_libro(titulo: str, session: asyncSessionDep):
+    return await mover_a_deposito_libro_async(titulo, session)
+
+@router.get("/deposito/", summary="Listar libros en el depósito", dependencies=[condicional("depositolibro")])
+async def listar_libros_deposito(session: readSessionDep,
+                           response: Response,
+                           limit: limitQuery = LIMITE_POR_DEFECTO,
+                           after: afterQuery = None,
+                           fields: fieldsQuery = None,
+                           count: countQuery = False):
+    pagina = await ver_deposito_libros_async(session, limit, after, fields)
+    if count:
+        response.headers[CABECERA_TOTAL] = str(await contar_deposito_libros_async(session))
+    return pagina
+
+@router.head("/deposito/", summary="Total de libros en el depósito (X-Total-Count), sin cuerpo",
+             dependencies=[condicional("depositolibro")])
+async def contar_libros_deposito(request: Request, session: readSessionDep):
+    total = await contar_deposito_libros_async(session)
+    return Response(headers={CABECERA_TOTAL: str(total), "ETag": request.state.etag})
+
+@router.get("/deposito/export", summary="Exportar los libros del depósito en NDJSON o CSV", dependencies=[condicional(*TABLAS_DEPOSITO)])
+def exportar_deposito_libros(request: Request, formato: formatoQuery = "ndjson", fields: fieldsQuery = None):
+    respuesta = exportar_libros(formato, deposito=True, fields=fields)
+    respuesta.headers["ETag"] = request.state.etag
+    return respuesta
 
-@router.get("/deposito/", summary="Listar libros en el depósito")
-def listar_libros_deposito(session: sessionDep):
-    return ver_deposito_libros(session)
+@router.get("/deposito/{titulo}", summary="Buscar libro en el depósito", dependencies=[condicional(*TABLAS_DEPOSITO)])
+async def buscar_libro_deposito(titulo: str, session: readSessionDep):
+    return await buscar_libro_en_deposito_async(titulo, session)
 
-@router.get("/deposito/{titulo}", summary="Buscar libro en el depósito")
-def buscar_libro_deposito(titulo: str, session: sessionDep):
-    return buscar_libro_en_deposito(titulo, session)
+@router.post("/deposito/restaurar", summary="Restaurar varios libros al catálogo")
+async def restaurar_libros(titulos: List[str], session: asyncSessionDep):
+    return await sacar_libros_de_deposito_en_lote_async(titulos, session)
 
 @router.post("/deposito/sacar/{titulo}", summary="Restaurar libro al catálogo")
-def restaurar_libro(titulo: str, session: sessionDep):
-    return sacar_libro_de_deposito(titulo, session)
\ No newline at end of file
+async def restaurar_libro(titulo: str, session: asyncSessionDep):
+    return await sacar_libro_de_deposito_async(titulo, session)
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import Optional, List
 from sqlmodel import SQLModel, Field
+from db.paginacion import MAXIMO_CONSULTA_LOTE
 
 
 class CrearLibro(SQLModel):
@@ -19,3 +20,20 @@ class ActualizarLibro(SQLModel):
     editorial: Optional[str] = None
     año_publicacion: Optional[int] = None
     copias_disponibles: Optional[int] = None
+
+
+class ConsultarLibros(SQLModel):
+    ISBN: List[str] = Field(default_factory=list, max_length=MAXIMO_CONSULTA_LOTE)
+    titulos: List[str] = Field(default_factory=list, max_length=MAXIMO_CONSULTA_LOTE)
+
+
+class FiltrarLibros(SQLModel):
+    """Filtros del listado de libros; se combinan con AND y se resuelven en SQL."""
+    año_publicacion: Optional[int] = None
+    año_desde: Optional[int] = None
+    año_hasta: Optional[int] = None
+    paginas_min: Optional[int] = None
+    paginas_max: Optional[int] = None
+    editorial: Optional[str] = None
+    disponible: Optional[bool] = None
+    pais_autor: Optional[str] = None
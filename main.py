@@ -5,9 +5,17 @@ y define el ciclo de vida de la aplicación utilizando un contexto asíncrono.
 También incluye los routers correspondientes a los módulos de autores y libros.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from db.database import create_database
+from typing import Annotated, Optional
+from fastapi import FastAPI, Header, HTTPException, WebSocket
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from db.database import create_database, engine, async_engine, async_read_engine, readSessionDep
+from db import cache, cambios, estadisticas
+from db.difusion import difusor, formato_sse, Filtro, isbnStreamQuery, autorStreamQuery, tipoStreamQuery
+from db.condicional import condicional, TABLAS_CATALOGO, TABLAS_DEPOSITO
+from db.paginacion import limitQuery, afterQuery, LIMITE_POR_DEFECTO
+from db.metricas import MiddlewareMetricas, registro
 from autores import autor
 from libros import libro
 
@@ -26,14 +34,117 @@ async def lifespan(app: FastAPI):
         None: Control temporal del flujo para ejecutar el servidor.
     """
     create_database()
+    mantenimiento = asyncio.create_task(cambios.mantener_periodicamente(engine))
+    difusion = asyncio.create_task(difusor.ejecutar())
     print("Base de datos en línea")
     yield
+    mantenimiento.cancel()
+    difusion.cancel()
+    await async_engine.dispose()
+    await async_read_engine.dispose()
     print("Catálogo cerrado correctamente")
 
 
 # Inicialización de la aplicación principal
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(MiddlewareMetricas)
 
 # Inclusión de los routers de los módulos
 app.include_router(autor.router)
-app.include_router(libro.router)
\ No newline at end of file
+app.include_router(libro.router)
+
+
+@app.get(
+    "/estadisticas",
+    tags=["Estadísticas"],
+    summary="Totales del catálogo, libros por año, autores por país y tamaño del depósito",
+    dependencies=[condicional("autor", "libro", "depositoautores", "depositolibro")],
+)
+async def obtener_estadisticas(session: readSessionDep):
+    return await session.run_sync(estadisticas.leer)
+
+
+@app.get(
+    "/cambios",
+    tags=["Cambios"],
+    summary="Eventos de cambio posteriores a un cursor, para sincronización incremental",
+    dependencies=[condicional(*TABLAS_CATALOGO, *TABLAS_DEPOSITO)],
+)
+async def listar_cambios(session: readSessionDep,
+                         limit: limitQuery = LIMITE_POR_DEFECTO,
+                         after: afterQuery = None):
+    return await session.run_sync(lambda sesion: cambios.ver_cambios(sesion, limit, after))
+
+
+@app.get(
+    "/stream",
+    tags=["Cambios"],
+    summary="Eventos de cambio en vivo (Server-Sent Events)",
+    response_class=StreamingResponse,
+)
+async def stream(isbn: isbnStreamQuery = [],
+                 autor: autorStreamQuery = [],
+                 tipo: tipoStreamQuery = [],
+                 after: afterQuery = None,
+                 last_event_id: Annotated[Optional[int], Header()] = None):
+    # EventSource reenvía el último id recibido al reconectar: tiene prioridad sobre `after`.
+    desde = last_event_id if last_event_id is not None else after
+    await difusor.verificar(desde)
+    filtro = Filtro.crear(isbn, autor, tipo)
+
+    async def mensajes():
+        yield "retry: 1000\n\n"
+        async for evento in difusor.eventos(filtro, desde):
+            yield ": latido\n\n" if evento is None else formato_sse(evento)
+        # Cliente demasiado lento: se cierra y EventSource reconecta con Last-Event-ID.
+        yield "event: descartado\ndata: {}\n\n"
+
+    return StreamingResponse(
+        mensajes(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/stream/ws")
+async def stream_ws(websocket: WebSocket,
+                    isbn: isbnStreamQuery = [],
+                    autor: autorStreamQuery = [],
+                    tipo: tipoStreamQuery = [],
+                    after: afterQuery = None):
+    await websocket.accept()
+    try:
+        await difusor.verificar(after)
+    except HTTPException:
+        await websocket.close(code=4410, reason="Cursor purgado: sincronice desde las exportaciones")
+        return
+
+    async def enviar():
+        async for evento in difusor.eventos(Filtro.crear(isbn, autor, tipo), after):
+            if evento is not None:
+                await websocket.send_json(evento)
+        await websocket.close(code=1013, reason="Cliente lento: reconecte con after=<último id>")
+
+    async def recibir():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tareas = [asyncio.create_task(enviar()), asyncio.create_task(recibir())]
+    _, pendientes = await asyncio.wait(tareas, return_when=asyncio.FIRST_COMPLETED)
+    for tarea in pendientes:
+        tarea.cancel()
+
+
+@app.get("/stream/estado", tags=["Diagnóstico"], summary="Suscriptores conectados y eventos descartados")
+def estado_stream():
+    return difusor.estadisticas()
+
+
+@app.get("/cache", tags=["Diagnóstico"], summary="Estadísticas de la caché de detalles")
+def estadisticas_cache():
+    return cache.detalles.estadisticas()
+
+
+@app.get("/metrics", tags=["Diagnóstico"], summary="Métricas en formato Prometheus")
+def metricas():
+    return PlainTextResponse(registro.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
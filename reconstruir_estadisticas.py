@@ -0,0 +1,46 @@
+"""Verifica y repara la tabla de estadísticas del catálogo.
+
+Recalcula todas las métricas con `GROUP BY` sobre las tablas completas y las
+compara con la tabla `estadistica` que mantienen los triggers. Informa cada
+contador desviado y, con `--reparar`, reemplaza la tabla por el cálculo
+completo en una sola transacción.
+
+Termina con código 1 si hay desviaciones y no se pidió repararlas.
+
+Uso:
+    python reconstruir_estadisticas.py
+    python reconstruir_estadisticas.py --reparar
+"""
+
+import argparse
+import sys
+
+from db.database import engine, create_database
+from db import estadisticas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reparar", action="store_true", help="Reemplazar la tabla por el cálculo completo")
+    args = parser.parse_args()
+
+    create_database()
+    with engine.begin() as conexion:
+        diferencias = estadisticas.desviaciones(conexion)
+        for d in diferencias:
+            grupo = f"[{d['grupo']}]" if d["grupo"] else ""
+            print(f"{d['metrica']}{grupo}: almacenado {d['almacenado']}, esperado {d['esperado']}")
+        if diferencias and args.reparar:
+            estadisticas.reparar(conexion)
+
+    if not diferencias:
+        print("Las estadísticas coinciden con las tablas.")
+    elif args.reparar:
+        print(f"{len(diferencias)} contadores reparados.")
+    else:
+        print(f"{len(diferencias)} contadores desviados (use --reparar para corregirlos).")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
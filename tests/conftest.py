@@ -0,0 +1,42 @@
+"""Configuración común de las pruebas.
+
+El motor lee la ruta del archivo al importarse: la base temporal se fija aquí,
+antes de que cualquier módulo de pruebas importe la aplicación. La fixture
+`cliente` entrega a cada módulo un catálogo vacío, con la app dentro de su
+`lifespan`.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DIRECTORIO = tempfile.TemporaryDirectory(prefix="test_catalogo_")
+os.environ["CATALOGO_DB_ARCHIVO"] = str(Path(DIRECTORIO.name) / "catalogo.db")
+os.environ["CATALOGO_SQL_ECHO"] = "false"
+
+from fastapi.testclient import TestClient
+
+from db import cache, database
+import main
+
+
+def _borrar_base():
+    """Cierra las conexiones síncronas y elimina la base y su WAL."""
+    for motor in (database.engine, database.read_engine):
+        motor.dispose()
+    archivo = Path(database.perfil.archivo)
+    for sufijo in ("", "-wal", "-shm"):
+        Path(f"{archivo}{sufijo}").unlink(missing_ok=True)
+    cache.detalles.limpiar()
+
+
+@pytest.fixture(scope="module")
+def cliente():
+    _borrar_base()
+    with TestClient(main.app) as cliente:
+        yield cliente
@@ -0,0 +1,45 @@
+"""Búsqueda de texto completo en libros (`GET /libros/buscar`) y su orden por relevancia."""
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def cliente(cliente):
+    libros = [
+        {"titulo": "Manual de jardinería", "ISBN": "1", "resumen": "Incluye un capítulo sobre el dragón de Komodo.",
+         "nombre_autores": []},
+        {"titulo": "El Dragón Rojo", "ISBN": "2", "resumen": "Novela policial.", "nombre_autores": []},
+        {"titulo": "Cocina", "ISBN": "3", "resumen": "Recetas.", "editorial": "Dragón Ediciones", "nombre_autores": []},
+        {"titulo": "Sin coincidencias", "ISBN": "4", "resumen": "Nada que ver.", "nombre_autores": []},
+    ]
+    assert cliente.post("/libros/bulk", json=libros).json()["creados"] == 4
+    return cliente
+
+
+def _titulos(respuesta) -> list[str]:
+    assert respuesta.status_code == 200, respuesta.text
+    return [item["titulo"] for item in respuesta.json()["items"]]
+
+
+def test_titulo_pesa_mas_que_editorial_y_resumen(cliente):
+    titulos = _titulos(cliente.get("/libros/buscar", params={"q": "dragon"}))
+    assert titulos == ["El Dragón Rojo", "Cocina", "Manual de jardinería"]
+
+
+def test_paginacion_por_offset(cliente):
+    respuesta = cliente.get("/libros/buscar", params={"q": "dragón", "limit": 2})
+    assert _titulos(respuesta) == ["El Dragón Rojo", "Cocina"]
+    assert respuesta.json()["next_offset"] == 2
+    respuesta = cliente.get("/libros/buscar", params={"q": "dragón", "limit": 2, "offset": 2})
+    assert _titulos(respuesta) == ["Manual de jardinería"]
+    assert respuesta.json()["next_offset"] is None
+
+
+def test_fragmento_resaltado(cliente):
+    item = cliente.get("/libros/buscar", params={"q": "komodo"}).json()["items"][0]
+    assert "[Komodo]" in item["fragmento"]
+
+
+@pytest.mark.parametrize("q, estado", [("zzz", 404), ('"*-:', 400)])
+def test_sin_resultados_o_sin_palabras(cliente, q, estado):
+    assert cliente.get("/libros/buscar", params={"q": q}).status_code == estado
@@ -0,0 +1,80 @@
+"""Registro de cambios (`GET /cambios`) tras una purga, y filtrado y repetición de `/stream`."""
+
+import asyncio
+import time
+from contextlib import aclosing
+
+import pytest
+
+from db import cambios, database
+from db.difusion import difusor, Filtro
+
+
+@pytest.fixture(scope="module")
+def cliente(cliente):
+    for nombre in ("Ana Autora", "Beto Autor"):
+        respuesta = cliente.post("/autores/", json={
+            "nombre_apellidos": nombre, "pais_origen": "Chile", "año_nacimiento": "1950",
+        })
+        assert respuesta.status_code == 200, respuesta.text
+    libros = [
+        {"titulo": "Uno", "ISBN": "1", "copias_disponibles": 2, "nombre_autores": ["Ana Autora"]},
+        {"titulo": "Dos", "ISBN": "2", "copias_disponibles": 2, "nombre_autores": ["Beto Autor"]},
+    ]
+    assert cliente.post("/libros/bulk", json=libros).json()["creados"] == 2
+    return cliente
+
+
+def _recibir(filtro: Filtro, after, cantidad: int):
+    """Corrutina que junta `cantidad` eventos de `difusor.eventos`, sin latidos."""
+    async def recibir():
+        recibidos = []
+        async with aclosing(difusor.eventos(filtro, after)) as eventos:
+            async for evento in eventos:
+                if evento is not None:
+                    recibidos.append(evento)
+                if len(recibidos) == cantidad:
+                    return recibidos
+    return lambda: asyncio.wait_for(recibir(), 5)
+
+
+def test_stream_repite_desde_el_cursor_con_filtro(cliente):
+    eventos = cliente.portal.call(_recibir(Filtro.crear(isbn=["1"]), 0, 1))
+    assert [(e["tipo"], e["isbn"], e["titulo"], e["autores"]) for e in eventos] == [
+        ("libro.insercion", "1", "Uno", ["Ana Autora"]),
+    ]
+
+    eventos = cliente.portal.call(_recibir(Filtro.crear(autores=["beto autor"], tipos=["autor"]), 0, 1))
+    assert [(e["tipo"], e["autor"]) for e in eventos] == [("autor.insercion", "Beto Autor")]
+
+
+def test_stream_en_vivo_filtra_por_autor(cliente):
+    ultimo = cliente.get("/cambios", params={"limit": 1}).json()["ultimo"]
+    futuro = cliente.portal.start_task_soon(_recibir(Filtro.crear(autores=["Ana Autora"]), None, 1))
+    limite = time.monotonic() + 5
+    while difusor.estadisticas()["suscriptores"] == 0 and time.monotonic() < limite:
+        time.sleep(0.01)
+
+    assert cliente.post("/libros/2/prestar").status_code == 200
+    assert cliente.post("/libros/1/prestar").status_code == 200
+
+    evento, = futuro.result(timeout=5)
+    assert evento["id"] > ultimo
+    assert (evento["tipo"], evento["isbn"], evento["copias_disponibles"]) == ("libro.actualizacion", "1", 1)
+
+
+def test_cambios_410_tras_purga(cliente):
+    assert cliente.get("/cambios", params={"after": 1}).status_code == 200
+    ultimo = cliente.get("/cambios").json()["ultimo"]
+
+    time.sleep(0.01)
+    with database.engine.begin() as conexion:
+        assert cambios.mantener(conexion, retencion=0)["purgados"] > 0
+
+    respuesta = cliente.get("/cambios", params={"after": 1})
+    assert respuesta.status_code == 410
+    assert cliente.get("/stream", params={"after": 1}).status_code == 410
+
+    respuesta = cliente.get("/cambios", params={"after": ultimo})
+    assert respuesta.status_code == 200
+    assert respuesta.json()["items"] == []
@@ -0,0 +1,93 @@
+"""Traslado al depósito y restauración por conjuntos, de autores y de libros."""
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from db import deposito
+
+
+@pytest.fixture(scope="module")
+def cliente(cliente):
+    for nombre in ("Ana Autora", "Beto Coautor"):
+        respuesta = cliente.post("/autores/", json={
+            "nombre_apellidos": nombre, "pais_origen": "Chile", "año_nacimiento": "1950",
+        })
+        assert respuesta.status_code == 200, respuesta.text
+    libros = [
+        {"titulo": "Primero", "ISBN": "1", "nombre_autores": ["Ana Autora"]},
+        {"titulo": "Segundo", "ISBN": "2", "nombre_autores": ["Ana Autora", "Beto Coautor"]},
+        {"titulo": "Tercero", "ISBN": "3", "nombre_autores": ["Beto Coautor"]},
+    ]
+    assert cliente.post("/libros/bulk", json=libros).json()["creados"] == 3
+    return cliente
+
+
+def _estadisticas(cliente) -> dict:
+    return cliente.get("/estadisticas").json()
+
+
+def test_mover_y_restaurar_autor(cliente):
+    assert cliente.delete("/autores/deposito/ana autora").status_code == 200
+
+    assert cliente.get("/autores/Ana Autora").status_code == 404
+    # Sus libros se copian al depósito y siguen en el catálogo, sin el vínculo.
+    assert cliente.get("/libros/Primero").json()["autores"] == []
+    assert cliente.get("/libros/Segundo").json()["autores"] == [{"nombre": "Beto Coautor", "pais": "Chile"}]
+
+    en_deposito = cliente.get("/autores/deposito/buscar/Ana Autora").json()
+    assert sorted(en_deposito["libros_asociados"]) == ["Primero", "Segundo"]
+    assert cliente.get("/libros/deposito/Segundo").json()["autores_asociados"] == ["Ana Autora"]
+    estadisticas = _estadisticas(cliente)
+    assert (estadisticas["libros"], estadisticas["autores"]) == (3, 1)
+    assert estadisticas["deposito"] == {"libros": 2, "autores": 1}
+
+    assert cliente.post("/autores/deposito/restaurar/Ana Autora").status_code == 200
+
+    assert cliente.get("/autores/deposito/buscar/Ana Autora").status_code == 404
+    assert cliente.get("/libros/deposito/Segundo").status_code == 404
+    autora = cliente.get("/autores/Ana Autora").json()
+    assert sorted(libro["titulo"] for libro in autora["libros"]) == ["Primero", "Segundo"]
+    autores_segundo = cliente.get("/libros/Segundo").json()["autores"]
+    assert sorted(autor["nombre"] for autor in autores_segundo) == ["Ana Autora", "Beto Coautor"]
+    estadisticas = _estadisticas(cliente)
+    assert (estadisticas["libros"], estadisticas["autores"]) == (3, 2)
+    assert estadisticas["deposito"] == {"libros": 0, "autores": 0}
+
+
+def test_mover_libro_dos_veces(cliente):
+    assert cliente.delete("/libros/deposito/Tercero").status_code == 200
+    assert cliente.delete("/libros/deposito/Tercero").status_code == 404
+    assert cliente.get("/libros/deposito/Tercero").json()["autores_asociados"] == ["Beto Coautor"]
+
+
+def test_restaurar_libros_en_lote(cliente):
+    assert cliente.delete("/libros/deposito/Primero").status_code == 200
+
+    respuesta = cliente.post("/libros/deposito/restaurar", json=["primero", "TERCERO", "No existe"])
+    assert respuesta.status_code == 200, respuesta.text
+    resultado = respuesta.json()
+    assert sorted(resultado["restaurados"]) == ["Primero", "Tercero"]
+    assert resultado["no_encontrados"] == ["No existe"]
+
+    for titulo in ("Primero", "Tercero"):
+        assert cliente.get(f"/libros/{titulo}").status_code == 200
+    assert cliente.get("/libros/deposito/", params={"count": "true"}).status_code == 404
+    assert _estadisticas(cliente)["libros"] == 3
+
+
+@pytest.mark.parametrize("error, estado", [
+    (IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed: depositolibro.ISBN")), 409),
+    (OperationalError("INSERT", {}, Exception("database is locked")), 500),
+])
+def test_error_al_mover_no_expone_la_base(cliente, monkeypatch, caplog, error, estado):
+    def fallar(*args):
+        raise error
+    monkeypatch.setattr(deposito, "copiar_libros_a_deposito", fallar)
+
+    for url in ("/libros/deposito/Primero", "/autores/deposito/Beto Coautor"):
+        respuesta = cliente.delete(url)
+        assert respuesta.status_code == estado
+        assert "constraint" not in respuesta.text and "locked" not in respuesta.text
+    assert cliente.get("/libros/Primero").status_code == 200
+    assert cliente.get("/autores/Beto Coautor").status_code == 200
+    assert ("Falló el traslado" in caplog.text) == (estado == 500)
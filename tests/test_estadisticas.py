@@ -0,0 +1,61 @@
+"""Contadores de `estadistica` mantenidos por triggers, y su reparación tras una desviación."""
+
+import pytest
+from sqlalchemy import text
+
+from db import database, estadisticas
+
+
+@pytest.fixture(scope="module")
+def cliente(cliente):
+    for i, pais in enumerate(("Chile", "Chile", "Perú")):
+        respuesta = cliente.post("/autores/", json={
+            "nombre_apellidos": f"Autor {i}", "pais_origen": pais, "año_nacimiento": "1950",
+        })
+        assert respuesta.status_code == 200, respuesta.text
+    libros = [
+        {"titulo": "Uno", "ISBN": "1", "año_publicacion": 2001, "copias_disponibles": 2, "nombre_autores": ["Autor 0"]},
+        {"titulo": "Dos", "ISBN": "2", "año_publicacion": 2001, "copias_disponibles": 1, "nombre_autores": ["Autor 1"]},
+        {"titulo": "Tres", "ISBN": "3", "copias_disponibles": 3, "nombre_autores": ["Autor 2"]},
+    ]
+    assert cliente.post("/libros/bulk", json=libros).json()["creados"] == 3
+    return cliente
+
+
+ESPERADO = {
+    "libros": 3,
+    "autores": 3,
+    "copias_disponibles": 6,
+    "libros_por_año": {"2001": 2, "sin_año": 1},
+    "autores_por_pais": {"Chile": 2, "Perú": 1},
+    "deposito": {"libros": 0, "autores": 0},
+}
+
+
+def test_triggers_mantienen_los_contadores(cliente):
+    assert cliente.get("/estadisticas").json() == ESPERADO
+    assert cliente.post("/libros/1/prestar").status_code == 200
+    assert cliente.get("/estadisticas").json()["copias_disponibles"] == 5
+    assert cliente.post("/libros/1/devolver").status_code == 200
+    with database.engine.connect() as conexion:
+        assert estadisticas.desviaciones(conexion) == []
+
+
+def test_reparar_desviacion(cliente):
+    with database.engine.begin() as conexion:
+        conexion.execute(text("UPDATE estadistica SET valor = valor + 5 WHERE metrica = 'libros' AND grupo = ''"))
+        conexion.execute(text("DELETE FROM estadistica WHERE metrica = 'autores_por_pais' AND grupo = 'Perú'"))
+
+    with database.engine.connect() as conexion:
+        assert estadisticas.desviaciones(conexion) == [
+            {"metrica": "autores_por_pais", "grupo": "Perú", "almacenado": 0, "esperado": 1},
+            {"metrica": "libros", "grupo": "", "almacenado": 8, "esperado": 3},
+        ]
+    assert cliente.get("/estadisticas").json()["libros"] == 8
+
+    with database.engine.begin() as conexion:
+        estadisticas.reparar(conexion)
+
+    with database.engine.connect() as conexion:
+        assert estadisticas.desviaciones(conexion) == []
+    assert cliente.get("/estadisticas").json() == ESPERADO
@@ -0,0 +1,32 @@
+"""Importación masiva de autores con líneas JSON mal formadas o inválidas."""
+
+from sqlmodel import Session
+
+from autores.crud import ingresar_autores_en_lote
+from db import database
+from importar_autores import leer_filas, validar
+
+LINEAS = [
+    '{"nombre_apellidos": "Ana Uno", "pais_origen": "Chile", "año_nacimiento": "1950"}',
+    '{"nombre_apellidos": "Beto Dos", "pais_origen": "Perú"',
+    '',
+    '{"nombre_apellidos": "Sin País", "año_nacimiento": "1960"}',
+    'no es json',
+    '{"nombre_apellidos": "Carla Tres", "pais_origen": "México", "año_nacimiento": "1970"}',
+]
+
+
+def test_lineas_invalidas_se_omiten(cliente, tmp_path):
+    ruta = tmp_path / "autores.jsonl"
+    ruta.write_text("\n".join(LINEAS) + "\n", encoding="utf-8")
+    errores = []
+
+    with Session(database.engine) as session:
+        resultado = ingresar_autores_en_lote(validar(leer_filas(ruta, "jsonl", errores), errores), session)
+
+    assert (resultado["procesados"], resultado["escritos"]) == (2, 2)
+    assert [(error["linea"], error["errores"][0]["type"]) for error in errores] == [
+        (2, "json_invalid"), (4, "missing"), (5, "json_invalid"),
+    ]
+    for nombre in ("Ana Uno", "Carla Tres"):
+        assert cliente.get(f"/autores/{nombre}").status_code == 200
@@ -0,0 +1,64 @@
+"""Búsqueda por clave normalizada y detección de duplicados de autores y libros."""
+
+import pytest
+
+from db.normalizacion import normalizar
+
+
+@pytest.fixture(scope="module")
+def cliente(cliente):
+    respuesta = cliente.post("/autores/", json={
+        "nombre_apellidos": "Gabriel García Márquez", "pais_origen": "Colombia", "año_nacimiento": "1927",
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    respuesta = cliente.post("/libros/", json={
+        "titulo": "Cien Años de Soledad", "ISBN": "9780000000001", "nombre_autores": ["gabriel garcia marquez"],
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    return cliente
+
+
+def test_normalizar():
+    assert normalizar("  Gabriel   GARCÍA  Márquez ") == "gabriel garcia marquez"
+    assert normalizar("Straße") == "strasse"
+
+
+def test_detalle_por_clave_normalizada(cliente):
+    respuesta = cliente.get("/autores/GABRIEL  garcia marquez")
+    assert respuesta.status_code == 200
+    assert respuesta.json()["libros"] == [{"titulo": "Cien Años de Soledad", "ISBN": "9780000000001"}]
+
+    respuesta = cliente.get("/libros/cien años de soledad")
+    assert respuesta.status_code == 200
+    assert respuesta.json()["autores"] == [{"nombre": "Gabriel García Márquez", "pais": "Colombia"}]
+
+
+def test_respuestas_sin_claves_internas(cliente):
+    assert "clave_" not in cliente.get("/libros/Cien Años de Soledad").text
+    assert "clave_" not in cliente.get("/autores/?limit=10").text
+
+
+def test_autor_duplicado(cliente):
+    respuesta = cliente.post("/autores/", json={
+        "nombre_apellidos": "gabriel garcia  MARQUEZ", "pais_origen": "Colombia", "año_nacimiento": "1927",
+    })
+    assert respuesta.status_code == 400
+
+
+@pytest.mark.parametrize("titulo, isbn", [("CIEN AÑOS DE SOLEDAD", "9780000000002"), ("Otro", "9780000000001")])
+def test_libro_duplicado(cliente, titulo, isbn):
+    respuesta = cliente.post("/libros/", json={"titulo": titulo, "ISBN": isbn, "nombre_autores": []})
+    assert respuesta.status_code == 400
+
+
+def test_libros_duplicados_en_lote(cliente):
+    respuesta = cliente.post("/libros/bulk", json=[
+        {"titulo": "El Otoño del Patriarca", "ISBN": "9780000000003", "nombre_autores": ["Gabriel García Márquez"]},
+        {"titulo": "el otono del patriarca", "ISBN": "9780000000004", "nombre_autores": []},
+        {"titulo": "cien años de soledad", "ISBN": "9780000000005", "nombre_autores": []},
+        {"titulo": "Sin Autor Registrado", "ISBN": "9780000000006", "nombre_autores": ["Nadie"]},
+    ])
+    assert respuesta.status_code == 200, respuesta.text
+    resultado = respuesta.json()
+    assert resultado["creados"] == 1
+    assert [rechazo["posicion"] for rechazo in resultado["rechazados"]] == [1, 2, 3]
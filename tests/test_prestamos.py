@@ -0,0 +1,65 @@
+"""Préstamos y devoluciones simultáneos de un mismo libro: el inventario nunca sale de [0, copias]."""
+
+import asyncio
+from collections import Counter
+
+import httpx
+import pytest
+
+import main
+
+ISBN = "9780000000001"
+COPIAS = 3
+CLIENTES = 40
+RONDAS = 5
+
+
+@pytest.fixture(scope="module")
+def cliente(cliente):
+    respuesta = cliente.post("/libros/", json={
+        "titulo": "Libro muy solicitado", "ISBN": ISBN, "copias_disponibles": COPIAS, "nombre_autores": [],
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    return cliente
+
+
+async def _prestar_y_devolver() -> tuple[Counter, list[int]]:
+    """Cada cliente presta una copia y, si la obtuvo, la devuelve, `RONDAS` veces."""
+    estados = Counter()
+    observadas = []
+    transporte = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://prueba", timeout=None) as http:
+        async def un_cliente():
+            for _ in range(RONDAS):
+                respuesta = await http.post(f"/libros/{ISBN}/prestar")
+                estados[("prestar", respuesta.status_code)] += 1
+                if respuesta.status_code != 200:
+                    continue
+                observadas.append(respuesta.json()["copias_disponibles"])
+                respuesta = await http.post(f"/libros/{ISBN}/devolver")
+                estados[("devolver", respuesta.status_code)] += 1
+                observadas.append(respuesta.json()["copias_disponibles"])
+
+        await asyncio.gather(*(un_cliente() for _ in range(CLIENTES)))
+    return estados, observadas
+
+
+def test_inventario_acotado_bajo_concurrencia(cliente):
+    estados, observadas = cliente.portal.call(_prestar_y_devolver)
+
+    assert not [estado for estado in estados if estado[1] >= 500], estados
+    prestamos = estados[("prestar", 200)]
+    assert prestamos > 0
+    assert estados[("devolver", 200)] == prestamos
+    assert estados[("prestar", 200)] + estados[("prestar", 400)] == CLIENTES * RONDAS
+    assert min(observadas) >= 0 and max(observadas) <= COPIAS
+    assert cliente.get("/libros/Libro muy solicitado").json()["copias_disponibles"] == COPIAS
+
+
+def test_sin_copias_no_baja_de_cero(cliente):
+    for restantes in range(COPIAS - 1, -1, -1):
+        assert cliente.post(f"/libros/{ISBN}/prestar").json()["copias_disponibles"] == restantes
+    assert cliente.post(f"/libros/{ISBN}/prestar").status_code == 400
+    assert cliente.get("/libros/Libro muy solicitado").json()["copias_disponibles"] == 0
+    for _ in range(COPIAS):
+        assert cliente.post(f"/libros/{ISBN}/devolver").status_code == 200
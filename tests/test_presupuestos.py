@@ -0,0 +1,85 @@
+"""Verifica que cada ruta de `PRESUPUESTOS` respeta su presupuesto de consultas.
+
+Crea un catálogo pequeño en una base temporal (con libros sin año, autores de
+varios países y elementos en el depósito) y ejecuta una petición por entrada,
+eligiendo la variante más costosa de la ruta: filtros que requieren `COUNT(*)`,
+`sort` que cruza al tramo NULL y caché de detalle vacía.
+
+Uso:
+    python -m pytest -q tests
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from db import cache
+from db.consultas import PRESUPUESTOS, verificar_presupuesto
+
+PAISES = ("Chile", "Perú", "México")
+
+# (método, ruta) -> (URL concreta, cuerpo JSON o None).
+PETICIONES = {
+    ("GET", "/autores/{nombre_apellidos}"): ("/autores/Autor Numero1", None),
+    ("GET", "/autores/id/{id_autor}"): ("/autores/id/1", None),
+    ("GET", "/autores/deposito/buscar/{nombre_apellidos}"): ("/autores/deposito/buscar/Autor Numero9", None),
+    ("GET", "/libros/{titulo}"): ("/libros/Libro 1", None),
+    ("GET", "/libros/deposito/{titulo}"): ("/libros/deposito/Libro 19", None),
+    ("GET", "/autores/"): ("/autores/?nacimiento_desde=1900&sort=-año_nacimiento&limit=500&count=true", None),
+    ("GET", "/libros/"): ("/libros/?pais_autor=Chile&sort=-año_publicacion&limit=500&count=true", None),
+    ("GET", "/autores/deposito/"): ("/autores/deposito/?pais=Chile&count=true", None),
+    ("GET", "/libros/deposito/"): ("/libros/deposito/?count=true", None),
+    ("HEAD", "/autores/"): ("/autores/?nacimiento_desde=1900", None),
+    ("HEAD", "/libros/"): ("/libros/?pais_autor=Chile&disponible=true", None),
+    ("HEAD", "/autores/deposito/"): ("/autores/deposito/?pais=Chile", None),
+    ("HEAD", "/libros/deposito/"): ("/libros/deposito/", None),
+    ("GET", "/estadisticas"): ("/estadisticas", None),
+    ("GET", "/cambios"): ("/cambios?after=1&limit=500", None),
+    ("POST", "/autores/lookup"): ("/autores/lookup", {
+        "nombres": [f"Autor Numero{i}" for i in range(5)] + ["No existe"], "ids": [1, 2, 999],
+    }),
+    ("POST", "/libros/lookup"): ("/libros/lookup", {
+        "ISBN": [f"97800000000{i:02d}" for i in range(5)], "titulos": ["Libro 6", "No existe"],
+    }),
+    ("POST", "/libros/{isbn}/prestar"): ("/libros/9780000000001/prestar", None),
+    ("POST", "/libros/{isbn}/devolver"): ("/libros/9780000000001/devolver", None),
+}
+
+
+def _sembrar(cliente: TestClient):
+    for i in range(10):
+        respuesta = cliente.post("/autores/", json={
+            "nombre_apellidos": f"Autor Numero{i}",
+            "pais_origen": PAISES[i % len(PAISES)],
+            "año_nacimiento": str(1900 + i),
+        })
+        assert respuesta.status_code < 300, respuesta.text
+    for i in range(20):
+        respuesta = cliente.post("/libros/", json={
+            "titulo": f"Libro {i}",
+            "ISBN": f"97800000000{i:02d}",
+            "año_publicacion": None if i % 3 == 0 else 2000 + i % 5,
+            "editorial": f"Editorial {i % 2}",
+            "copias_disponibles": 1 + i % 2,
+            "nombre_autores": [f"Autor Numero{i % 9}", f"Autor Numero{(i + 1) % 9}"],
+        })
+        assert respuesta.status_code < 300, respuesta.text
+    for url in ("/libros/deposito/Libro 19", "/autores/deposito/Autor Numero9"):
+        assert cliente.delete(url).status_code < 300
+
+
+@pytest.fixture(scope="module")
+def cliente(cliente):
+    _sembrar(cliente)
+    return cliente
+
+
+def test_todas_las_rutas_tienen_peticion():
+    assert PETICIONES.keys() == PRESUPUESTOS.keys()
+
+
+@pytest.mark.parametrize("metodo, ruta", list(PRESUPUESTOS), ids=lambda valor: valor)
+def test_presupuesto(cliente, metodo, ruta):
+    url, cuerpo = PETICIONES[(metodo, ruta)]
+    cache.detalles.limpiar()
+    respuesta = verificar_presupuesto(cliente, metodo, ruta, url, json=cuerpo)
+    assert respuesta.status_code == 200, respuesta.text